@@ -0,0 +1,317 @@
+# asgi.py - ASGI serving mode for the CollabSphere API
+#
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+#
+# Connections and response writes are owned by the event loop, but only the
+# handlers registered with @async_route are coroutines: /api/health and the
+# two Server-Sent Events streams (/api/analytics/stream and
+# /api/notifications/stream), so an idle stream costs a parked coroutine
+# instead of a thread. Every other route - login, register and password
+# changes (bcrypt), projects, notifications, analytics, imports - is the
+# unchanged Flask view running through a2wsgi on a pool of ASGI_THREADS
+# threads, with the same routes and JSON shapes as `python main.py`; each
+# request holds one of those threads while it runs. Blocking work inside
+# async handlers (SQLite, revocation checks) must go through run_blocking().
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+
+from main import (app as flask_app, CORS_ORIGINS, DATABASE, NOTIFICATION_STREAM_BATCH, SSE_HEADERS, STREAM_SCOPE,
+                  init_db, latest_notification_id, load_analytics, load_new_notifications,
+                  notification_resume_id, resource_version, sse_event)
+from utils import events
+from utils import revocation
+from utils.db import connect
+from utils.migrations import LATEST_VERSION, schema_version
+
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', '32'))
+ASGI_MAX_BODY = int(os.getenv('ASGI_MAX_BODY', str(16 * 1024 * 1024)))
+
+# One bounded pool for Flask routes and run_blocking(); a2wsgi reads request
+# bodies as Flask consumes them and sends each chunk the app yields. Bodies
+# past ASGI_MAX_BODY get the 413 from main.py's error handler.
+flask_app.config['MAX_CONTENT_LENGTH'] = ASGI_MAX_BODY
+_wsgi = WSGIMiddleware(flask_app, workers=ASGI_THREADS)
+_async_routes = {}
+
+
+def async_route(path, methods=('GET',)):
+    """Register a coroutine handler(scope, receive, send) for a path"""
+    def decorator(handler):
+        for method in methods:
+            _async_routes[(method, path)] = handler
+        return handler
+    return decorator
+
+
+async def run_blocking(func, *args):
+    """Run blocking work (SQLite, bcrypt) on the bounded handler pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_wsgi.executor, func, *args)
+
+
+def _header(scope, name):
+    name = name.lower().encode('latin-1')
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _query_param(scope, name):
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name)
+    return values[0] if values else None
+
+
+def authenticate(scope, allow_query=False):
+    """JWT identity for an async handler, or None when missing/invalid/revoked
+
+    Reads the revocation list, so call it through run_blocking(). Stream
+    routes pass allow_query: EventSource cannot send headers, so they also
+    take a stream token in ?stream_token=, and only a stream token (the
+    same rules as stream_jwt_required in main.py).
+    """
+    auth = _header(scope, 'authorization') or ''
+    from_query = False
+    if auth.startswith('Bearer '):
+        token = auth[len('Bearer '):]
+    elif allow_query:
+        token = _query_param(scope, flask_app.config['JWT_QUERY_STRING_NAME'])
+        from_query = True
+    else:
+        token = None
+    if not token:
+        return None
+    try:
+        with flask_app.app_context():
+            payload = decode_token(token)
+            is_stream_token = payload.get('scope') == STREAM_SCOPE
+            if from_query and not is_stream_token:
+                return None
+            if is_stream_token and not allow_query:
+                return None
+            if revocation.is_revoked(payload):
+                return None
+            return payload['sub']
+    except Exception:
+        return None
+
+
+def in_app_context(func, *args):
+    """Call a main.py helper that uses get_db() from a handler thread"""
+    with flask_app.app_context():
+        return func(*args)
+
+
+def cors_headers(scope):
+    """CORS response headers matching the Flask-CORS setup in main.py"""
+    origin = _header(scope, 'origin')
+    if origin not in CORS_ORIGINS:
+        return []
+    return [
+        (b'access-control-allow-origin', origin.encode('latin-1')),
+        (b'access-control-allow-credentials', b'true'),
+        (b'vary', b'Origin')
+    ]
+
+
+async def send_json(send, payload, status=200, headers=()):
+    """Send a complete JSON response"""
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('latin-1')),
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# ==================== NATIVE ASYNC ROUTES ====================
+@async_route('/api/health')
+async def health_check(scope, receive, send):
+    """Health check endpoint served without touching the thread pool"""
+    await send_json(send, {
+        'success': True,
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat()
+    }, headers=cors_headers(scope))
+
+
+@async_route('/api/analytics/stream')
+async def analytics_stream(scope, receive, send):
+    """Server-Sent Events analytics stream; an idle client is one parked coroutine"""
+    user_id = await run_blocking(authenticate, scope, True)
+    if user_id is None:
+        await send_json(send, {'success': False, 'error': 'Authentication required'},
+                        status=401, headers=cors_headers(scope))
+        return
+
+    last_event_id = _header(scope, 'last-event-id') or _query_param(scope, 'lastEventId')
+    heartbeat = flask_app.config['STREAM_HEARTBEAT_SECONDS']
+    loop = asyncio.get_running_loop()
+    updates = asyncio.Queue()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        updates.put_nowait(None)
+
+    version = await run_blocking(in_app_context, resource_version, user_id, 'projects')
+    subscription = events.subscribe(
+        'projects', user_id, version,
+        lambda new_version: loop.call_soon_threadsafe(updates.put_nowait, new_version)
+    )
+    disconnect = asyncio.ensure_future(watch_disconnect())
+
+    async def push(text):
+        await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                *[(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in SSE_HEADERS.items()],
+                *cors_headers(scope)
+            ]
+        })
+        await push('retry: 3000\n\n')
+        sent = last_event_id
+        current = version
+        while True:
+            if str(current) != sent:
+                snapshot = await run_blocking(in_app_context, load_analytics, user_id)
+                await push(sse_event(snapshot, 'analytics', current))
+                sent = str(current)
+            try:
+                update = await asyncio.wait_for(updates.get(), heartbeat)
+            except asyncio.TimeoutError:
+                await push(': heartbeat\n\n')
+                continue
+            if update is None:
+                return
+            current = update
+            while not updates.empty():
+                update = updates.get_nowait()
+                if update is None:
+                    return
+                current = update
+    finally:
+        events.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+@async_route('/api/notifications/stream')
+async def notifications_stream(scope, receive, send):
+    """Server-Sent Events notification stream; an idle client is one parked coroutine"""
+    user_id = await run_blocking(authenticate, scope, True)
+    if user_id is None:
+        await send_json(send, {'success': False, 'error': 'Authentication required'},
+                        status=401, headers=cors_headers(scope))
+        return
+    try:
+        after = notification_resume_id(_header(scope, 'last-event-id'), _query_param(scope, 'after'))
+    except ValueError:
+        await send_json(send, {'success': False, 'error': 'Invalid notification id'},
+                        status=400, headers=cors_headers(scope))
+        return
+
+    heartbeat = flask_app.config['STREAM_HEARTBEAT_SECONDS']
+    loop = asyncio.get_running_loop()
+    updates = asyncio.Queue()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        updates.put_nowait(None)
+
+    # Version first: anything inserted after this read wakes the subscription
+    version = await run_blocking(in_app_context, resource_version, user_id, 'notifications')
+    if after is None:
+        after = await run_blocking(in_app_context, latest_notification_id, user_id)
+    subscription = events.subscribe(
+        'notifications', user_id, version,
+        lambda new_version: loop.call_soon_threadsafe(updates.put_nowait, new_version)
+    )
+    disconnect = asyncio.ensure_future(watch_disconnect())
+
+    async def push(text):
+        await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                *[(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in SSE_HEADERS.items()],
+                *cors_headers(scope)
+            ]
+        })
+        await push('retry: 3000\n\n')
+        last_id = after
+        while True:
+            batch = await run_blocking(in_app_context, load_new_notifications, user_id, last_id)
+            for notification in batch:
+                await push(sse_event(notification, 'notification', notification['id']))
+                last_id = notification['id']
+            if len(batch) == NOTIFICATION_STREAM_BATCH:
+                continue
+            # Idle streams only send heartbeats; the database is read on wake-ups
+            while True:
+                try:
+                    update = await asyncio.wait_for(updates.get(), heartbeat)
+                    break
+                except asyncio.TimeoutError:
+                    await push(': heartbeat\n\n')
+            if update is None:
+                return
+            while not updates.empty():
+                if updates.get_nowait() is None:
+                    return
+    finally:
+        events.unsubscribe(subscription)
+        disconnect.cancel()
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Same single user_version read as `python main.py`
+            db = connect(DATABASE, flask_app.config['DB_PROFILE'])
+            version = schema_version(db)
+            db.close()
+            if version < LATEST_VERSION:
+                await run_blocking(init_db)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            _wsgi.executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    handler = _async_routes.get((scope['method'], scope['path']))
+    if handler is not None:
+        await handler(scope, receive, send)
+    else:
+        await _wsgi(scope, receive, send)
@@ -0,0 +1,168 @@
+# bench_collaboration_requests.py - Legacy vs single-transaction collaboration requests
+#
+#   python bench_collaboration_requests.py --requests 2000 --profile durable
+#
+# "legacy" replays the old send_collaboration_request flow: three SELECTs,
+# INSERT request, COMMIT, INSERT notification, COMMIT. "single" runs
+# create_collaboration_request() from main.py in one BEGIN IMMEDIATE ...
+# COMMIT. "queued" submits the same job from several threads through the
+# WriteQueue so concurrent requests share commits. Each commit is one WAL
+# fsync under synchronous=FULL and one write-lock acquisition.
+#
+# create_collaboration_request() only enqueues the notification, so
+# "single" and "queued" also drain notification_jobs inside the timed
+# section, in batches as the notification worker would; every mode ends
+# with the same notifications delivered (the "notified" column).
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from main import create_collaboration_request
+from utils.db import STORAGE_PROFILES, WriteQueue, connect
+from utils.migrations import migrate
+from utils.notification_queue import DEFAULT_BATCH, process_job
+
+
+def build_dataset(path, users, projects):
+    """Create users and projects to send requests between"""
+    conn = connect(path, 'durable')
+    migrate(conn, verbose=False)
+    conn.executemany(
+        '''INSERT INTO users (id, full_name, email, password, institution, department, year)
+           VALUES (?, ?, ?, 'x', 'Bench University', 'Computer Science', '1st Year')''',
+        [(uid, f'User {uid}', f'user{uid}@bench.edu') for uid in range(1, users + 1)]
+    )
+    conn.executemany(
+        'INSERT INTO projects (id, user_id, title, status) VALUES (?, ?, ?, ?)',
+        [(pid, (pid % users) + 1, f'Project {pid}', 'todo') for pid in range(1, projects + 1)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def workload(n, users, projects):
+    """Distinct (sender, recipient, project) triples so no request is a duplicate"""
+    return [
+        ((i % users) + 1, ((i + 1) % users) + 1, (i // users) % projects + 1, f'Request {i}')
+        for i in range(n)
+    ]
+
+
+def run_legacy(conn, jobs):
+    commits = 0
+    for sender_id, teammate_id, project_id, message in jobs:
+        sender = conn.execute('SELECT full_name, email FROM users WHERE id = ?', (sender_id,)).fetchone()
+        project = conn.execute('SELECT title FROM projects WHERE id = ?', (project_id,)).fetchone()
+        existing = conn.execute(
+            '''SELECT id FROM collaboration_requests
+               WHERE sender_id = ? AND recipient_id = ? AND project_id = ? AND status = 'pending' ''',
+            (sender_id, teammate_id, project_id)
+        ).fetchone()
+        if not sender or not project or existing:
+            continue
+        conn.execute(
+            '''INSERT INTO collaboration_requests
+               (sender_id, recipient_id, project_id, message, status, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (sender_id, teammate_id, project_id, message, 'pending', datetime.now().isoformat())
+        )
+        conn.commit()
+        conn.execute(
+            '''INSERT INTO notifications
+               (user_id, type, message, sender_name, project_title, is_read, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (teammate_id, 'incoming_request', f"{sender['full_name']} wants to collaborate on '{project['title']}'",
+             sender['full_name'], project['title'], 0, datetime.now().isoformat())
+        )
+        conn.commit()
+        commits += 2
+    return commits
+
+
+def run_single(conn, jobs):
+    conn.isolation_level = None
+    commits = 0
+    for sender_id, teammate_id, project_id, message in jobs:
+        conn.execute('BEGIN IMMEDIATE')
+        create_collaboration_request(conn, sender_id, teammate_id, project_id, message)
+        conn.execute('COMMIT')
+        commits += 1
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        delivered = process_job(conn, DEFAULT_BATCH)['jobs']
+        conn.execute('COMMIT')
+        if not delivered:
+            return commits
+        commits += 1
+
+
+def run_queued(path, profile, jobs, threads):
+    writer = WriteQueue(path, profile=profile)
+    chunks = [jobs[i::threads] for i in range(threads)]
+
+    def client(chunk):
+        for sender_id, teammate_id, project_id, message in chunk:
+            writer.run(lambda conn: create_collaboration_request(conn, sender_id, teammate_id, project_id, message))
+
+    workers = [threading.Thread(target=client, args=(chunk,)) for chunk in chunks]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    while writer.run(lambda conn: process_job(conn, DEFAULT_BATCH))['jobs']:
+        pass
+    return writer.stats()['batches'] - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the collaboration request write path')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--profile', default='durable', choices=list(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='collab-bench-')
+    base = os.path.join(workdir, 'base.db')
+    jobs = workload(args.requests, args.users, args.projects)
+
+    print("=" * 60)
+    print("COLLABORATION REQUEST WRITE PATH BENCHMARK")
+    print("=" * 60)
+    print(f"\n📨 {args.requests} requests, profile '{args.profile}'")
+
+    try:
+        build_dataset(base, args.users, args.projects)
+        print(f"\n{'mode':<10} {'req/s':>10} {'commits':>10} {'commits/req':>12} {'notified':>10}")
+        print("-" * 57)
+
+        for mode in ('legacy', 'single', 'queued'):
+            path = os.path.join(workdir, f'{mode}.db')
+            shutil.copyfile(base, path)
+            started = time.perf_counter()
+            if mode == 'queued':
+                commits = run_queued(path, args.profile, jobs, args.threads)
+            else:
+                conn = connect(path, args.profile)
+                commits = run_legacy(conn, jobs) if mode == 'legacy' else run_single(conn, jobs)
+                conn.close()
+            elapsed = time.perf_counter() - started
+            conn = connect(path, args.profile)
+            notified = conn.execute('SELECT COUNT(*) FROM notifications').fetchone()[0]
+            conn.close()
+            print(f"{mode:<10} {args.requests / elapsed:>10.0f} {commits:>10} "
+                  f"{commits / args.requests:>12.2f} {notified:>10}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
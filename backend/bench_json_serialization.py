@@ -0,0 +1,132 @@
+# bench_json_serialization.py - Python dict building vs SQLite-built JSON for list routes
+#
+#   python bench_json_serialization.py --rows 5000 --iterations 50
+#
+# Runs the real Flask routes against a synthetic database in a temporary
+# directory, once with SQL_JSON_RESPONSES off (sqlite3.Row -> dict ->
+# jsonify) and once with it on (json_group_array string passed straight to
+# the response). Both payloads are parsed and compared before timing.
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ROUTES = [
+    '/api/projects',
+    '/api/notifications',
+    '/api/requests/received',
+    '/api/reviews/received',
+    '/api/reviews/given'
+]
+
+
+def build_dataset(conn, rows):
+    """One heavy user (id 1) with `rows` projects, requests and reviews each way"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+
+    def stamp():
+        return (start + timedelta(minutes=rng.randint(0, 525600))).isoformat()
+
+    conn.executemany(
+        '''INSERT INTO users (id, full_name, email, password, institution, department, year, skills)
+           VALUES (?, ?, ?, 'x', 'Bench University', 'Computer Science', '2nd Year', 'Python,SQL')''',
+        [(uid, f'User {uid}', f'user{uid}@bench.edu') for uid in range(1, 101)]
+    )
+    conn.executemany(
+        'INSERT INTO projects (user_id, title, description, status, assignee, created_at) VALUES (1, ?, ?, ?, ?, ?)',
+        [(f'Project {n}', 'Benchmark project with a "quoted" word', rng.choice(['todo', 'inProgress', 'completed']),
+          'You', stamp()) for n in range(rows)]
+    )
+    conn.executemany(
+        '''INSERT INTO notifications (user_id, type, message, sender_name, project_title, is_read, created_at)
+           VALUES (1, 'incoming_request', ?, ?, ?, ?, ?)''',
+        [(f'Notification {n}', f'User {n % 100 + 1}', f'Project {n}', rng.randint(0, 1), stamp()) for n in range(rows)]
+    )
+    conn.executemany(
+        '''INSERT INTO collaboration_requests (sender_id, recipient_id, project_id, message, status, created_at)
+           VALUES (?, 1, ?, ?, 'pending', ?)''',
+        [(n % 99 + 2, n + 1, f'Request {n}', stamp()) for n in range(rows)]
+    )
+    conn.executemany(
+        '''INSERT INTO reviews (reviewer_id, reviewee_id, project_id, rating, comment, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        [((n % 99 + 2, 1) if n % 2 else (1, n % 99 + 2)) + (n + 1, rng.randint(1, 5), f'Review {n}', stamp())
+         for n in range(rows * 2)]
+    )
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQL-side JSON serialization')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    # main.py opens database.db relative to the working directory
+    workdir = tempfile.mkdtemp(prefix='collab-bench-')
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+
+    from flask_jwt_extended import create_access_token
+    import main as backend
+    from utils.db import connect
+    from utils.migrations import migrate
+
+    conn = connect(backend.DATABASE)
+    migrate(conn, verbose=False)
+    build_dataset(conn, args.rows)
+    conn.close()
+
+    app = backend.app
+    with app.app_context():
+        token = create_access_token(identity=1)
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    print("=" * 60)
+    print("SQL-SIDE JSON SERIALIZATION BENCHMARK")
+    print("=" * 60)
+    print(f"\n📦 {args.rows} rows per list, {args.iterations} iterations per route")
+    print(f"\n{'route':<26} {'python ms':>10} {'sql ms':>10} {'speedup':>8}")
+    print("-" * 58)
+
+    # Silence the per-request logging in main.py while timing
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    try:
+        for route in ROUTES:
+            timings = {}
+            payloads = {}
+            for mode in (False, True):
+                app.config['SQL_JSON_RESPONSES'] = mode
+                sys.stdout = devnull
+                payloads[mode] = client.get(route, headers=headers).get_json()
+                started = time.perf_counter()
+                for _ in range(args.iterations):
+                    client.get(route, headers=headers).get_data()
+                timings[mode] = (time.perf_counter() - started) * 1000 / args.iterations
+                sys.stdout = stdout
+
+            if payloads[False] != payloads[True]:
+                print(f"❌ {route}: SQL JSON payload differs from the Python payload")
+                continue
+            print(f"{route:<26} {timings[False]:>10.2f} {timings[True]:>10.2f} "
+                  f"{timings[False] / timings[True]:>7.1f}x")
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# bench_project_batch.py - N single project updates vs one batch update
+#
+#   python bench_project_batch.py --projects 2000 --changes 50 --rounds 20
+#
+# Runs the real Flask routes against a synthetic database in a temporary
+# directory. "single" sends one PUT /api/projects/<id> per change, the way
+# the board does when several cards are dragged; "batch" sends the same
+# changes in one PUT /api/projects/batch. Each round moves the changed cards
+# to a new status so every UPDATE really writes. Writer commits are read
+# from the writer counters: each one is a WAL fsync and a write-lock
+# acquisition.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATUSES = ('todo', 'inProgress', 'completed')
+
+
+def build_dataset(conn, projects):
+    """One user (id 1) owning `projects` projects"""
+    conn.execute(
+        '''INSERT INTO users (id, full_name, email, password, institution, department, year)
+           VALUES (1, 'User 1', 'user1@bench.edu', 'x', 'Bench University', 'Computer Science', '2nd Year')'''
+    )
+    conn.executemany(
+        'INSERT INTO projects (id, user_id, title, status) VALUES (?, 1, ?, ?)',
+        [(pid, f'Project {pid}', 'todo') for pid in range(1, projects + 1)]
+    )
+    conn.executemany(
+        '''INSERT INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+           SELECT user_id, id, 'owner', created_at, created_at, status FROM projects WHERE id = ?''',
+        [(pid,) for pid in range(1, projects + 1)]
+    )
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch project status updates')
+    parser.add_argument('--projects', type=int, default=2000)
+    parser.add_argument('--changes', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--profile', default=None, help='DB_PROFILE for the writer (e.g. durable)')
+    args = parser.parse_args()
+
+    # main.py opens database.db relative to the working directory
+    workdir = tempfile.mkdtemp(prefix='collab-bench-')
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    if args.profile:
+        os.environ['DB_PROFILE'] = args.profile
+
+    from flask_jwt_extended import create_access_token
+    import main as backend
+    from utils.db import connect, writer_stats
+    from utils.migrations import migrate
+
+    conn = connect(backend.DATABASE)
+    migrate(conn, verbose=False)
+    build_dataset(conn, args.projects)
+
+    app = backend.app
+    with app.app_context():
+        token = create_access_token(identity=1)
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    def changes_for(round_no, offset):
+        status = STATUSES[(round_no + 1) % len(STATUSES)]
+        first = offset + round_no * args.changes % (args.projects // 2 - args.changes)
+        return [{'id': pid, 'status': status} for pid in range(first + 1, first + args.changes + 1)]
+
+    def run_single(round_no):
+        for change in changes_for(round_no, 0):
+            client.put(f"/api/projects/{change['id']}", json={'status': change['status']}, headers=headers)
+
+    def run_batch(round_no):
+        response = client.put('/api/projects/batch', json=changes_for(round_no, args.projects // 2),
+                              headers=headers)
+        if response.get_json()['updated'] != args.changes:
+            raise RuntimeError(f'batch round {round_no} did not apply every change')
+
+    print("=" * 60)
+    print("BATCH PROJECT UPDATE BENCHMARK")
+    print("=" * 60)
+    print(f"\n📦 {args.projects} projects, {args.changes} changes per round, {args.rounds} rounds")
+    print(f"\n{'mode':<8} {'ms/round':>10} {'ms/change':>10} {'commits':>9} {'requests':>9}")
+    print("-" * 50)
+
+    # Silence the per-request logging in main.py while timing
+    devnull = open(os.devnull, 'w')
+    stdout = sys.stdout
+    timings = {}
+    try:
+        for mode, run, requests_per_round in (('single', run_single, args.changes), ('batch', run_batch, 1)):
+            before = writer_stats().get('batches', 0)
+            sys.stdout = devnull
+            started = time.perf_counter()
+            for round_no in range(args.rounds):
+                run(round_no)
+            elapsed = (time.perf_counter() - started) * 1000 / args.rounds
+            sys.stdout = stdout
+            commits = writer_stats()['batches'] - before
+            timings[mode] = elapsed
+            print(f"{mode:<8} {elapsed:>10.2f} {elapsed / args.changes:>10.3f} "
+                  f"{commits:>9} {requests_per_round * args.rounds:>9}")
+
+        # Both halves of the table must have seen the same status changes
+        mismatched = conn.execute(
+            '''SELECT COUNT(*) FROM projects a JOIN projects b ON b.id = a.id + ?
+               WHERE a.id <= ? AND a.status != b.status''',
+            (args.projects // 2, args.projects // 2)
+        ).fetchone()[0]
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+        conn.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("-" * 50)
+    if mismatched:
+        print(f"❌ {mismatched} projects differ between the single and batch halves")
+    print(f"⚡ batch is {timings['single'] / timings['batch']:.1f}x faster per round")
+    print("\n" + "=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+# bench_storage_profiles.py - Compare SQLite storage profiles on the same dataset
+#
+#   python bench_storage_profiles.py --users 2000 --seconds 5
+#
+# Builds one synthetic database, copies it once per profile and replays the
+# read-heavy route queries (/api/projects, /api/notifications,
+# /api/teammates/search) mixed with a small share of notification inserts.
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.db import STORAGE_PROFILES, connect
+from utils.migrations import migrate
+
+SKILLS = ['React', 'Python', 'Node.js', 'Java', 'SQL', 'Docker', 'ML', 'Figma']
+YEARS = ['1st Year', '2nd Year', '3rd Year', '4th Year']
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Data Science']
+STATUSES = ['todo', 'inProgress', 'completed']
+
+READ_QUERIES = {
+    'projects': (
+        '''SELECT p.* FROM user_projects up
+           JOIN projects p ON p.id = up.project_id
+           WHERE up.user_id = ?
+           ORDER BY up.project_created_at DESC, up.project_id DESC''',
+        lambda uid: (uid,)
+    ),
+    'notifications': (
+        '''SELECT * FROM notifications
+           WHERE user_id = ?
+           ORDER BY created_at DESC
+           LIMIT 50''',
+        lambda uid: (uid,)
+    ),
+    'search': (
+        '''SELECT id, full_name, email, institution, department, year, skills
+           FROM users WHERE 1=1 AND (skills LIKE ?) AND (year = ?)''',
+        lambda uid: (f'%{SKILLS[uid % len(SKILLS)]}%', YEARS[uid % len(YEARS)])
+    )
+}
+
+
+def build_dataset(path, users, projects_per_user, notifications_per_user):
+    """Create the shared benchmark database"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    conn = connect(path, 'durable')
+    migrate(conn, verbose=False)
+
+    conn.executemany(
+        '''INSERT INTO users (id, full_name, email, password, institution, department, year, skills, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        [
+            (
+                uid,
+                f'User {uid}',
+                f'user{uid}@bench.edu',
+                'x',
+                'Bench University',
+                rng.choice(DEPARTMENTS),
+                rng.choice(YEARS),
+                ','.join(rng.sample(SKILLS, 3)),
+                (start + timedelta(minutes=uid)).isoformat()
+            )
+            for uid in range(1, users + 1)
+        ]
+    )
+    conn.executemany(
+        '''INSERT INTO projects (user_id, title, description, status, assignee, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)''',
+        [
+            (
+                uid,
+                f'Project {uid}-{n}',
+                'Benchmark project',
+                rng.choice(STATUSES),
+                'You',
+                (start + timedelta(hours=rng.randint(0, 8760))).isoformat()
+            )
+            for uid in range(1, users + 1)
+            for n in range(projects_per_user)
+        ]
+    )
+    total_projects = users * projects_per_user
+    conn.executemany(
+        'INSERT INTO project_members (project_id, user_id, role) VALUES (?, ?, ?)',
+        [
+            (rng.randint(1, total_projects), uid, 'member')
+            for uid in range(1, users + 1)
+            for _ in range(2)
+        ]
+    )
+    # The materialized list get_projects reads (see migrations/0007_user_projects.sql)
+    conn.execute(
+        '''INSERT OR IGNORE INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+           SELECT user_id, id, 'owner', created_at, created_at, status FROM projects'''
+    )
+    conn.execute(
+        '''INSERT OR IGNORE INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+           SELECT m.user_id, m.project_id, COALESCE(m.role, 'member'), m.joined_at, p.created_at, p.status
+           FROM project_members m JOIN projects p ON p.id = m.project_id'''
+    )
+    conn.executemany(
+        '''INSERT INTO notifications (user_id, type, message, sender_name, project_title, is_read, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        [
+            (
+                uid,
+                'incoming_request',
+                'Benchmark notification',
+                'Bench',
+                'Project',
+                rng.randint(0, 1),
+                (start + timedelta(minutes=rng.randint(0, 525600))).isoformat()
+            )
+            for uid in range(1, users + 1)
+            for _ in range(notifications_per_user)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_profile(path, profile, users, seconds, write_ratio):
+    """Replay the route workload against one profile and return counters"""
+    rng = random.Random(7)
+    conn = connect(path, profile)
+    names = list(READ_QUERIES)
+    reads = writes = 0
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        uid = rng.randint(1, users)
+        if rng.random() < write_ratio:
+            conn.execute(
+                '''INSERT INTO notifications (user_id, type, message, sender_name, project_title, is_read, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (uid, 'incoming_request', 'Bench write', 'Bench', 'Project', 0, datetime.now().isoformat())
+            )
+            conn.commit()
+            writes += 1
+        else:
+            sql, params = READ_QUERIES[names[reads % len(names)]]
+            conn.execute(sql, params(uid)).fetchall()
+            reads += 1
+
+    conn.close()
+    return reads, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SQLite storage profiles')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--projects-per-user', type=int, default=10)
+    parser.add_argument('--notifications-per-user', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.05)
+    parser.add_argument('--profiles', nargs='*', default=list(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='collab-bench-')
+    base = os.path.join(workdir, 'base.db')
+
+    print("=" * 60)
+    print("STORAGE PROFILE BENCHMARK")
+    print("=" * 60)
+    print(f"\n🏗️  Building dataset: {args.users} users, "
+          f"{args.users * args.projects_per_user} projects, "
+          f"{args.users * args.notifications_per_user} notifications")
+
+    try:
+        build_dataset(base, args.users, args.projects_per_user, args.notifications_per_user)
+
+        print(f"\n{'profile':<12} {'reads/s':>10} {'writes/s':>10} {'total ops/s':>12}")
+        print("-" * 48)
+        for profile in args.profiles:
+            path = os.path.join(workdir, f'{profile}.db')
+            shutil.copyfile(base, path)
+            reads, writes = run_profile(path, profile, args.users, args.seconds, args.write_ratio)
+            print(f"{profile:<12} {reads / args.seconds:>10.0f} {writes / args.seconds:>10.0f} "
+                  f"{(reads + writes) / args.seconds:>12.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 60 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# check_org_analytics.py - Verify that the org analytics engines agree
+#
+#   python check_org_analytics.py            # exit code 1 if any engine disagrees
+#   python check_org_analytics.py --users 5000
+#
+# Builds a synthetic in-memory database with fractional review ratings and
+# small chunks (so sums cross chunk boundaries), runs build_snapshot with
+# every available engine and compares the rows. Each institution's review
+# count and rating sum are also checked against a plain SQL aggregate.
+# build_org_snapshot.py --compare does the same on a real database.
+
+import argparse
+import random
+import sqlite3
+import sys
+from datetime import date
+
+from utils.migrations import migrate
+from utils.org_analytics import available_engines, build_snapshot
+
+INSTITUTIONS = ['Tech University', 'City College', ' ']
+DEPARTMENTS = ['Computer Science', 'Data Science', '']
+SKILLS = ['React', 'Python', 'Machine Learning', 'SQL', 'Figma']
+RATINGS = [1, 2.5, 3.3, 3.7, 4, 4.25, 4.9, 5]
+
+EXPECTED = '''
+    SELECT coalesce(nullif(trim(u.institution), ''), 'Unknown') AS institution,
+           COUNT(*) AS reviews, SUM(r.rating) AS rating_sum
+    FROM reviews r JOIN users u ON u.id = r.reviewee_id
+    WHERE r.rating IS NOT NULL
+    GROUP BY 1'''
+
+
+def build_dataset(conn, users, seed=42):
+    """Users across institutions and departments with fractional ratings"""
+    rng = random.Random(seed)
+    conn.executemany(
+        '''INSERT INTO users (id, full_name, email, password, institution, department, year, skills)
+           VALUES (?, ?, ?, 'x', ?, ?, '1st Year', ?)''',
+        [(uid, f'User {uid}', f'user{uid}@check.edu', rng.choice(INSTITUTIONS), rng.choice(DEPARTMENTS),
+          ', '.join(rng.sample(SKILLS, 2)))
+         for uid in range(1, users + 1)]
+    )
+    conn.executemany(
+        'INSERT INTO projects (user_id, title, status) VALUES (?, ?, ?)',
+        [(rng.randint(1, users), f'Project {n}', rng.choice(['todo', 'completed']))
+         for n in range(users)]
+    )
+    conn.executemany(
+        'INSERT INTO reviews (reviewer_id, reviewee_id, rating) VALUES (?, ?, ?)',
+        [(rng.randint(1, users), rng.randint(1, users), rng.choice(RATINGS + [None]))
+         for _ in range(users * 3)]
+    )
+    conn.commit()
+
+
+def check_org_analytics(users, chunk_size):
+    """Compare every engine on the synthetic dataset; returns the number of problems"""
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    migrate(conn, verbose=False)
+    build_dataset(conn, users)
+
+    print("=" * 60)
+    print("ORG ANALYTICS ENGINE CHECK")
+    print("=" * 60 + "\n")
+
+    problems = 0
+    results = {}
+    for engine in available_engines():
+        meta, rows = build_snapshot(conn, engine, chunk_size, today=date.today())
+        results[engine] = rows
+        print(f"⏱️  {engine:<7} {meta['build_ms']:8.1f} ms  ({meta['reviews']} reviews)")
+
+    for engine, rows in results.items():
+        if rows != results['python']:
+            problems += 1
+            print(f"❌ {engine} rows differ from the python engine")
+
+    expected = {row['institution']: row for row in conn.execute(EXPECTED)}
+    for row in results['python']:
+        if row['scope'] != 'institution':
+            continue
+        want = expected.get(row['institution'])
+        reviews, rating_sum = (want['reviews'], want['rating_sum']) if want else (0, 0)
+        if row['reviews'] != reviews or abs(row['rating_sum'] - rating_sum) > 1e-6:
+            problems += 1
+            print(f"❌ {row['institution']}: {row['reviews']} reviews / {row['rating_sum']} "
+                  f"(expected {reviews} / {rating_sum})")
+
+    conn.close()
+
+    print("\n" + "-" * 60)
+    print(f"{'✅' if not problems else '❌'} {len(results)} engines, {problems} problems")
+    print("-" * 60 + "\n")
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that the org analytics engines agree')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=250)
+    args = parser.parse_args()
+    sys.exit(1 if check_org_analytics(args.users, args.chunk_size) else 0)
@@ -0,0 +1,214 @@
+# check_query_plans.py - Fail when a route's SQL falls back to a scan or temp sort
+#
+#   python check_query_plans.py            # exit code 1 on any regression
+#   python check_query_plans.py --verbose  # print every plan
+#
+# Every SQL string literal or f-string passed to .execute()/.executemany()
+# in SOURCES, in functions and class methods alike, is run through EXPLAIN
+# QUERY PLAN against a fresh in-memory database built by the migrations.
+# f-string placeholders are filled in from PLACEHOLDER_VALUES. Statements
+# held in variables are covered by the representative samples in
+# DYNAMIC_STATEMENTS.
+
+import argparse
+import ast
+import os
+import re
+import sqlite3
+import sys
+
+from utils.migrations import migrate
+from utils.activity import ROLLUP_SQL, TRENDS_SQL
+from utils.org_analytics import ACTIVE_SQL, PROJECTS_SQL, REVIEWS_SQL, USERS_SQL
+from utils.project_search import SEARCH_SQL
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SOURCES = ['main.py', 'utils/user_cache.py', 'utils/revocation.py', 'utils/org_analytics.py',
+           'utils/notification_queue.py', 'utils/events.py', 'utils/activity.py', 'utils/user_import.py']
+
+# Sample values for f-string placeholders, keyed by the placeholder source
+PLACEHOLDER_VALUES = {
+    'placeholders': '?,?,?',
+    "', '.join(update_fields)": 'full_name = ?, skills = ?',
+    'page_from': '''FROM user_projects up
+                 JOIN projects p ON p.id = up.project_id
+                 WHERE up.user_id = ? AND up.project_status = ? AND (up.project_created_at, up.project_id) < (?, ?)''',
+    'page_order': 'up.project_created_at DESC, up.project_id DESC',
+    'page_limit': ' LIMIT ?'
+}
+
+# Representative SQL for statements held in variables
+DYNAMIC_STATEMENTS = {
+    'search_teammates': [
+        '''SELECT id, full_name, email, institution, department, year, skills FROM users WHERE 1=1
+           AND (full_name LIKE ? OR skills LIKE ? OR department LIKE ? OR institution LIKE ?)
+           AND (skills LIKE ?) AND (year = ?) AND (department LIKE ?)'''
+    ],
+    'get_projects': [
+        '''SELECT p.* FROM user_projects up
+           JOIN projects p ON p.id = up.project_id
+           WHERE up.user_id = ?
+           ORDER BY up.project_created_at DESC, up.project_id DESC''',
+        # Keyset page with a status filter
+        '''SELECT p.* FROM user_projects up
+           JOIN projects p ON p.id = up.project_id
+           WHERE up.user_id = ? AND up.project_status = ? AND (up.project_created_at, up.project_id) < (?, ?)
+           ORDER BY up.project_created_at DESC, up.project_id DESC LIMIT ?'''
+    ],
+    'search_projects': [
+        SEARCH_SQL
+    ],
+    'rollup_job': [
+        ROLLUP_SQL
+    ],
+    'load_trends': [
+        TRENDS_SQL
+    ],
+    'mark_notifications_read': [
+        'UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0 AND id IN (?, ?, ?)',
+        'UPDATE notifications SET is_read = 1 WHERE user_id = ? AND is_read = 0 AND id <= ?'
+    ],
+    '_read': [
+        USERS_SQL,
+        PROJECTS_SQL,
+        REVIEWS_SQL,
+        ACTIVE_SQL
+    ]
+}
+
+# Known plan problems: function name -> reason. Keep this list short and
+# remove entries as soon as the underlying query is fixed.
+ALLOWED = {
+    'search_teammates': 'substring LIKE filters cannot use a B-tree index',
+    'search_projects': 'bm25 order is computed per match; only the caller\'s matches are sorted',
+    'rollup_job': 'groups one bounded batch of events by (user, day)'
+}
+
+# Scanning a derived table (e.g. the rows fed to json_group_array) is fine,
+# the subquery itself is checked through its own plan lines. An FTS5 table
+# driven by MATCH (index string starting with M) is an index lookup.
+HARMLESS_SCANS = re.compile(r'^SCAN (CONSTANT ROW|\(subquery-\d+\)|subquery_\d+|\w+ VIRTUAL TABLE INDEX \d+:M\S*)$')
+
+
+def functions(tree):
+    """Yield (name, node) for module functions and methods (Class.method)"""
+    for top in tree.body:
+        if isinstance(top, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield top.name, top
+        elif isinstance(top, ast.ClassDef):
+            for item in top.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    yield f'{top.name}.{item.name}', item
+
+
+def sql_text(node):
+    """SQL of a string literal or f-string, or None for anything else
+
+    Placeholders missing from PLACEHOLDER_VALUES are left as {source}, so
+    EXPLAIN fails on them and the statement is reported.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if not isinstance(node, ast.JoinedStr):
+        return None
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        else:
+            source = ast.unparse(value.value)
+            parts.append(PLACEHOLDER_VALUES.get(source, f'{{{source}}}'))
+    return ''.join(parts)
+
+
+def collect_statements():
+    """Yield (source, function, line, sql) for every literal SQL statement"""
+    for source in SOURCES:
+        with open(os.path.join(BASE_DIR, source)) as f:
+            tree = ast.parse(f.read())
+
+        for name, function in functions(tree):
+            for node in ast.walk(function):
+                if (isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Attribute)
+                        and node.func.attr in ('execute', 'executemany')
+                        and node.args):
+                    sql = sql_text(node.args[0])
+                    if sql is not None:
+                        yield source, name, node.lineno, sql
+
+    for function, statements in DYNAMIC_STATEMENTS.items():
+        for sql in statements:
+            yield 'dynamic', function, 0, sql
+
+
+def explain(conn, sql):
+    """EXPLAIN QUERY PLAN details for a statement with NULL parameters"""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', [None] * sql.count('?')).fetchall()
+    return [row[3] for row in rows]
+
+
+def problems_in(plan):
+    """Plan lines that mean a full scan or a sort outside an index"""
+    problems = []
+    for detail in plan:
+        if detail.startswith('SCAN') and not HARMLESS_SCANS.match(detail):
+            problems.append(detail)
+        elif 'USE TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(verbose=False):
+    """Check every statement and return the number of regressions"""
+    conn = sqlite3.connect(':memory:')
+    migrate(conn, verbose=False)
+
+    print("=" * 60)
+    print("QUERY PLAN CHECK")
+    print("=" * 60 + "\n")
+
+    checked = allowed = failures = 0
+    for source, function, line, sql in collect_statements():
+        if sql.lstrip().upper().startswith(('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')):
+            continue
+        where = f"{source}:{line} {function}" if line else f"{source} {function}"
+        checked += 1
+
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            failures += 1
+            print(f"❌ {where}: {e}")
+            print(f"   {' '.join(sql.split())}")
+            continue
+
+        problems = problems_in(plan)
+        if problems and function in ALLOWED:
+            allowed += 1
+            print(f"⚠️  {where}: {', '.join(problems)} (allowed: {ALLOWED[function]})")
+        elif problems:
+            failures += 1
+            print(f"❌ {where}: {', '.join(problems)}")
+            print(f"   {' '.join(sql.split())}")
+        elif verbose:
+            print(f"✅ {where}")
+
+        if verbose:
+            for detail in plan:
+                print(f"      {detail}")
+
+    conn.close()
+
+    print("\n" + "-" * 60)
+    print(f"📊 {checked} statements checked, {allowed} allowed, {failures} failing")
+    print("-" * 60 + "\n")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check query plans for every route statement')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    sys.exit(1 if check_query_plans(args.verbose) else 0)
@@ -0,0 +1,105 @@
+# check_user_project_stats.py - Verify the trigger-maintained analytics counters
+#
+#   python check_user_project_stats.py            # exit code 1 on any drift
+#   python check_user_project_stats.py --repair   # rebuild the counters from projects
+#
+# user_project_stats must hold, per project owner, the number of projects
+# and how many are in each status, exactly as a GROUP BY over projects
+# would count them. The triggers from migration 0009 keep it current, so
+# drift means the triggers were dropped or the table was edited by hand.
+
+import argparse
+import sys
+
+from utils.db import connect
+from utils.migrations import migrate
+
+DATABASE = 'database.db'
+MAX_SHOWN = 10
+
+EXPECTED = '''
+    SELECT user_id, COUNT(*) AS total,
+           SUM(status IS 'todo') AS todo,
+           SUM(status IS 'inProgress') AS in_progress,
+           SUM(status IS 'completed') AS completed
+    FROM projects
+    GROUP BY user_id
+'''
+
+# Users whose counters differ; a user with no projects may keep an all-zero row
+DRIFT = f'''
+    SELECT e.user_id, e.total, e.todo, e.in_progress, e.completed,
+           s.total AS stored_total, s.todo AS stored_todo,
+           s.in_progress AS stored_in_progress, s.completed AS stored_completed
+    FROM ({EXPECTED}) e
+    LEFT JOIN user_project_stats s ON s.user_id = e.user_id
+    WHERE s.user_id IS NULL
+       OR s.total != e.total OR s.todo != e.todo
+       OR s.in_progress != e.in_progress OR s.completed != e.completed
+    UNION ALL
+    SELECT s.user_id, 0, 0, 0, 0, s.total, s.todo, s.in_progress, s.completed
+    FROM user_project_stats s
+    WHERE NOT EXISTS (SELECT 1 FROM projects p WHERE p.user_id = s.user_id)
+      AND (s.total != 0 OR s.todo != 0 OR s.in_progress != 0 OR s.completed != 0)
+'''
+
+
+def check_user_project_stats(conn):
+    """Rows for every user whose stored counters are wrong"""
+    return conn.execute(DRIFT).fetchall()
+
+
+def rebuild_user_project_stats(conn):
+    """Replace user_project_stats with counts derived from projects"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM user_project_stats')
+        conn.execute(
+            f'''INSERT INTO user_project_stats (user_id, total, todo, in_progress, completed)
+                SELECT user_id, total, todo, in_progress, completed FROM ({EXPECTED})'''
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify user_project_stats against projects')
+    parser.add_argument('--repair', action='store_true')
+    parser.add_argument('--database', default=DATABASE)
+    args = parser.parse_args()
+
+    conn = connect(args.database)
+    migrate(conn, verbose=False)
+    conn.isolation_level = None
+
+    print("=" * 60)
+    print("ANALYTICS COUNTER CHECK")
+    print("=" * 60 + "\n")
+
+    total = conn.execute('SELECT COUNT(*) FROM user_project_stats').fetchone()[0]
+    rows = check_user_project_stats(conn)
+    icon = '✅' if not rows else '❌'
+    print(f"{icon} drifting users: {len(rows)}")
+    for row in rows[:MAX_SHOWN]:
+        print(f"      user {row['user_id']}: "
+              f"stored {row['stored_total']}/{row['stored_todo']}/{row['stored_in_progress']}/{row['stored_completed']}, "
+              f"expected {row['total']}/{row['todo']}/{row['in_progress']}/{row['completed']} "
+              f"(total/todo/inProgress/completed)")
+
+    drift = len(rows)
+    if drift and args.repair:
+        rebuild_user_project_stats(conn)
+        drift = len(check_user_project_stats(conn))
+        print(f"\n🔧 Rebuilt user_project_stats, {drift} users still drifting")
+
+    print("\n" + "-" * 60)
+    print(f"📊 {total} counter rows checked, {drift} drifting")
+    print("-" * 60 + "\n")
+    conn.close()
+    return 1 if drift else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
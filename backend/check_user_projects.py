@@ -0,0 +1,114 @@
+# check_user_projects.py - Verify the materialized user_projects table
+#
+#   python check_user_projects.py            # exit code 1 on any drift
+#   python check_user_projects.py --repair   # rebuild the table from the source tables
+#
+# user_projects must hold exactly one row per project owner ('owner') and
+# per project member (project_members), with the project's created_at (''
+# when missing) and status copied in. Writers that skip create_project /
+# accept_request (old scripts, manual SQL) show up here as missing or extra
+# rows.
+
+import argparse
+import sys
+
+from utils.db import connect
+from utils.migrations import migrate
+
+DATABASE = 'database.db'
+MAX_SHOWN = 10
+
+# One row per (user, project): owners win over a membership of their own project
+EXPECTED = '''
+    SELECT user_id, project_id, MIN(priority) AS priority,
+           CASE MIN(priority) WHEN 0 THEN 'owner' ELSE MAX(role) END AS role,
+           MIN(joined_at) AS joined_at, project_created_at, project_status
+    FROM (
+        SELECT user_id, id AS project_id, 0 AS priority, 'owner' AS role, created_at AS joined_at,
+               COALESCE(created_at, '') AS project_created_at, status AS project_status
+        FROM projects
+        UNION ALL
+        SELECT m.user_id, m.project_id, 1, COALESCE(m.role, 'member'), m.joined_at, COALESCE(p.created_at, ''), p.status
+        FROM project_members m JOIN projects p ON p.id = m.project_id
+    )
+    GROUP BY user_id, project_id
+'''
+
+CHECKS = {
+    'missing': f'''
+        SELECT e.user_id, e.project_id, e.role FROM ({EXPECTED}) e
+        LEFT JOIN user_projects up ON up.user_id = e.user_id AND up.project_id = e.project_id
+        WHERE up.user_id IS NULL''',
+    'extra': f'''
+        SELECT up.user_id, up.project_id, up.role FROM user_projects up
+        LEFT JOIN ({EXPECTED}) e ON e.user_id = up.user_id AND e.project_id = up.project_id
+        WHERE e.user_id IS NULL''',
+    'stale': f'''
+        SELECT up.user_id, up.project_id, up.role FROM user_projects up
+        JOIN ({EXPECTED}) e ON e.user_id = up.user_id AND e.project_id = up.project_id
+        WHERE up.role IS NOT e.role
+           OR up.project_created_at IS NOT e.project_created_at
+           OR up.project_status IS NOT e.project_status'''
+}
+
+
+def check_user_projects(conn):
+    """Return {check: rows} for every kind of drift"""
+    return {name: conn.execute(sql).fetchall() for name, sql in CHECKS.items()}
+
+
+def rebuild_user_projects(conn):
+    """Replace user_projects with rows derived from projects and project_members"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM user_projects')
+        conn.execute(
+            f'''INSERT INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+                SELECT user_id, project_id, role, joined_at, project_created_at, project_status
+                FROM ({EXPECTED})'''
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify user_projects against projects and project_members')
+    parser.add_argument('--repair', action='store_true')
+    parser.add_argument('--database', default=DATABASE)
+    args = parser.parse_args()
+
+    conn = connect(args.database)
+    migrate(conn, verbose=False)
+    conn.isolation_level = None
+
+    print("=" * 60)
+    print("USER PROJECTS CONSISTENCY CHECK")
+    print("=" * 60 + "\n")
+
+    total = conn.execute('SELECT COUNT(*) FROM user_projects').fetchone()[0]
+    results = check_user_projects(conn)
+    drift = 0
+    for name, rows in results.items():
+        drift += len(rows)
+        icon = '✅' if not rows else '❌'
+        print(f"{icon} {name}: {len(rows)}")
+        for row in rows[:MAX_SHOWN]:
+            print(f"      user {row['user_id']} project {row['project_id']} ({row['role']})")
+
+    if drift and args.repair:
+        rebuild_user_projects(conn)
+        remaining = sum(len(rows) for rows in check_user_projects(conn).values())
+        print(f"\n🔧 Rebuilt user_projects, {remaining} rows still drifting")
+        drift = remaining
+
+    print("\n" + "-" * 60)
+    print(f"📊 {total} rows checked, {drift} drifting")
+    print("-" * 60 + "\n")
+    conn.close()
+    return 1 if drift else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -34,6 +34,7 @@ def create_test_projects():
     ]
     
     for project in test_projects:
+        created_at = datetime.now().isoformat()
         cursor.execute(
             '''INSERT INTO projects (user_id, title, description, status, created_at)
                VALUES (?, ?, ?, ?, ?)''',
@@ -42,9 +43,15 @@ def create_test_projects():
                 project['title'],
                 project['description'],
                 project['status'],
-                datetime.now().isoformat()
+                created_at
             )
         )
+        # Keep the materialized project list in step (see check_user_projects.py)
+        cursor.execute(
+            '''INSERT INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+               VALUES (?, ?, 'owner', ?, ?, ?)''',
+            (project['user_id'], cursor.lastrowid, created_at, created_at, project['status'])
+        )
         print(f"✅ Created project: {project['title']}")
     
     conn.commit()
@@ -0,0 +1,93 @@
+# import_users.py - Bulk-load students from a CSV file
+#
+#   python import_users.py data/indian_students.csv --institution "Tech University" \
+#       --email-domain students.techu.edu --password welcome123
+#
+# Streams the file in chunks (see utils/user_import.py), hashing initial
+# passwords in parallel and inserting each chunk in one transaction. Rows
+# whose email already exists are skipped. Safe to run while the backend is
+# serving: each chunk is one short BEGIN IMMEDIATE transaction.
+
+import argparse
+import sys
+
+from utils.db import connect
+from utils.migrations import migrate
+from utils.passwords import PasswordHasher
+from utils.user_import import DEFAULT_CHUNK_SIZE, IMPORT_LOG_ROUNDS, ImportRowError, import_users
+
+DATABASE = 'database.db'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import users from a CSV file (Name, Year, Interests, Skills)')
+    parser.add_argument('csv_path')
+    parser.add_argument('--institution', required=True)
+    parser.add_argument('--department', default=None, help='Used when the CSV has no Department column')
+    parser.add_argument('--email-domain', default=None, help='Used to build emails when the CSV has no Email column')
+    parser.add_argument('--password', required=True, help='Initial password for every imported user')
+    parser.add_argument('--rounds', type=int, default=IMPORT_LOG_ROUNDS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--database', default=DATABASE)
+    parser.add_argument('--profile', default=None)
+    args = parser.parse_args()
+
+    if len(args.password) < 8:
+        parser.error('Password must be at least 8 characters')
+
+    conn = connect(args.database, args.profile)
+    migrate(conn, verbose=False)
+    # Each chunk is committed explicitly below
+    conn.isolation_level = None
+
+    def run_write(job):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = job(conn)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return result
+
+    def progress(report, elapsed):
+        print(f"   {report['rows']:>8} rows  {report['rows'] / elapsed:>10.0f} rows/s", end='\r')
+
+    print("=" * 60)
+    print("BULK USER IMPORT")
+    print("=" * 60)
+    print(f"\n📄 {args.csv_path} -> {args.database}\n")
+
+    try:
+        with open(args.csv_path, newline='', encoding='utf-8-sig') as f:
+            report = import_users(
+                f, run_write,
+                institution=args.institution,
+                password=args.password,
+                department=args.department,
+                email_domain=args.email_domain,
+                rounds=args.rounds,
+                chunk_size=args.chunk_size,
+                hasher=PasswordHasher(workers=args.workers),
+                progress=progress
+            )
+    except ImportRowError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+
+    print("\n\n" + "-" * 60)
+    print(f"✅ Inserted: {report['inserted']} users")
+    print(f"⏭️  Skipped:  {report['skipped']} users (email already registered)")
+    print(f"⚠️  Invalid:  {report['invalid']} rows")
+    for error in report['errors']:
+        print(f"   line {error['line']}: {error['error']}")
+    print(f"⏱️  {report['rows']} rows in {report['seconds']:.2f} s ({report['rows_per_second']:.0f} rows/s)")
+    print("-" * 60 + "\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,32 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import (JWTManager, create_access_token, jwt_required, get_jwt_identity, get_jwt,
+                                get_jwt_request_location)
 import sqlite3
 from datetime import datetime, timedelta
 import os
 from functools import wraps
+from collections import Counter
 import traceback
+import base64
+import io
 import json
+import queue
+import zlib
+
+from utils.db import init_app as init_db_pool, get_db, execute_write, submit_write, connect, pool_stats, writer_stats
+from utils.migrations import LATEST_VERSION, migrate, schema_version
+from utils import query_stats
+from utils import passwords
+from utils import user_cache
+from utils import revocation
+from utils import project_search
+from utils import events
+from utils import activity
+from utils import org_analytics
+from utils import notification_queue
+from utils.user_import import ImportRowError, import_users
+from utils.passwords import PasswordHasherBusy
 
 app = Flask(__name__)
 
@@ -18,30 +37,78 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
 
 # ==================== CORS CONFIGURATION ====================
 
+CORS_ORIGINS = [
+    "http://localhost:5173",
+    "http://localhost:5174",
+    "http://localhost:5000",
+    "http://localhost:3000",
+    "http://127.0.0.1:5173",
+    "http://127.0.0.1:5174",
+    "http://127.0.0.1:3000"
+]
+
 CORS(app,
      resources={
          r"/api/*": {
-             "origins": [
-                 "http://localhost:5173",
-                 "http://localhost:5174",
-                 "http://localhost:5000",
-                 "http://localhost:3000",
-                 "http://127.0.0.1:5173",
-                 "http://127.0.0.1:5174",
-                 "http://127.0.0.1:3000"
-             ]
+             "origins": CORS_ORIGINS
          }
      },
      supports_credentials=True,
-     allow_headers=["Content-Type", "Authorization"],
+     allow_headers=["Content-Type", "Authorization", "X-Import-Password"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
      max_age=3600
 )
 
-bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
 DATABASE = 'database.db'
+app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', '8'))
+app.config['DB_PROFILE'] = os.getenv('DB_PROFILE', 'balanced')
+app.config['DB_WRITE_BATCH'] = int(os.getenv('DB_WRITE_BATCH', '64'))
+app.config['SQL_STATS_ENABLED'] = os.getenv('SQL_STATS_ENABLED', '1') == '1'
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', '100'))
+app.config['SQL_JSON_RESPONSES'] = os.getenv('SQL_JSON_RESPONSES', '0') == '1'
+init_db_pool(app, DATABASE)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+app.config['PASSWORD_WORKERS'] = int(os.getenv('PASSWORD_WORKERS', '0'))
+app.config['PASSWORD_MAX_PENDING'] = int(os.getenv('PASSWORD_MAX_PENDING', '0'))
+passwords.init_app(app)
+app.config['USER_CACHE_TTL'] = float(os.getenv('USER_CACHE_TTL', '60'))
+app.config['USER_CACHE_SIZE'] = int(os.getenv('USER_CACHE_SIZE', '10000'))
+user_cache.init_app(app)
+app.config['REVOCATION_CAPACITY'] = int(os.getenv('REVOCATION_CAPACITY', '100000'))
+app.config['REVOCATION_SYNC_SECONDS'] = float(os.getenv('REVOCATION_SYNC_SECONDS', '1'))
+revocation.init_app(app, jwt)
+app.config['ADMIN_EMAILS'] = {email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}
+app.config['IMPORT_LOG_ROUNDS'] = int(os.getenv('IMPORT_LOG_ROUNDS', '4'))
+app.config['PROJECTS_PAGE_SIZE'] = int(os.getenv('PROJECTS_PAGE_SIZE', '50'))
+app.config['STREAM_POLL_SECONDS'] = float(os.getenv('STREAM_POLL_SECONDS', '0.25'))
+app.config['STREAM_HEARTBEAT_SECONDS'] = float(os.getenv('STREAM_HEARTBEAT_SECONDS', '15'))
+# EventSource cannot send headers, so streams take a short-lived stream token
+# (POST /api/stream-token) in ?stream_token=; access tokens never go in a URL
+app.config['JWT_QUERY_STRING_NAME'] = 'stream_token'
+app.config['STREAM_TOKEN_SECONDS'] = int(os.getenv('STREAM_TOKEN_SECONDS', '60'))
+events.init_app(app, DATABASE)
+app.config['ACTIVITY_ROLLUP_SECONDS'] = float(os.getenv('ACTIVITY_ROLLUP_SECONDS', '60'))
+app.config['ACTIVITY_ROLLUP_BATCH'] = int(os.getenv('ACTIVITY_ROLLUP_BATCH', '5000'))
+activity.init_app(app)
+app.config['ORG_ANALYTICS_ENGINE'] = os.getenv('ORG_ANALYTICS_ENGINE', 'auto')
+app.config['ORG_ANALYTICS_CHUNK_SIZE'] = int(os.getenv('ORG_ANALYTICS_CHUNK_SIZE', '20000'))
+app.config['ORG_ANALYTICS_ACTIVE_DAYS'] = int(os.getenv('ORG_ANALYTICS_ACTIVE_DAYS', '30'))
+app.config['ORG_ANALYTICS_KEEP'] = int(os.getenv('ORG_ANALYTICS_KEEP', '30'))
+org_analytics.init_app(app)
+app.config['NOTIFICATION_WORKERS'] = int(os.getenv('NOTIFICATION_WORKERS', '1'))
+app.config['NOTIFICATION_BATCH'] = int(os.getenv('NOTIFICATION_BATCH', '200'))
+app.config['NOTIFICATION_POLL_SECONDS'] = float(os.getenv('NOTIFICATION_POLL_SECONDS', '1'))
+app.config['NOTIFICATION_MAX_ATTEMPTS'] = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5'))
+app.config['NOTIFICATION_RETENTION_DAYS'] = float(os.getenv('NOTIFICATION_RETENTION_DAYS', '7'))
+notification_queue.init_app(app)
+
+PROJECT_STATUSES = ('todo', 'inProgress', 'completed')
+MAX_PAGE_SIZE = 200
+MAX_BATCH_UPDATES = 500
+NOTIFICATION_STREAM_BATCH = 100
+MAX_READ_IDS = 500
 
 # ==================== ERROR HANDLERS ====================
 @app.before_request
@@ -49,7 +116,8 @@ def log_request():
     """Log incoming requests"""
     print(f"\n📨 {request.method} {request.path}")
     if request.is_json:
-        print(f"📤 Data: {request.get_json()}")
+        # silent: an empty or malformed JSON body must not 400 every route here
+        print(f"📤 Data: {request.get_json(silent=True)}")
 
 @app.after_request
 def log_response(response):
@@ -62,6 +130,11 @@ def not_found(error):
     """Handle 404 errors"""
     return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
 
+@app.errorhandler(413)
+def request_too_large(error):
+    """Handle bodies over MAX_CONTENT_LENGTH"""
+    return jsonify({'success': False, 'error': 'Request body too large'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
@@ -70,114 +143,159 @@ def internal_error(error):
     return jsonify({'success': False, 'error': 'Internal server error', 'details': str(error)}), 500
 
 # ==================== DATABASE UTILITIES ====================
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+def sql_json_response(key, payload, **extra):
+    """Wrap a JSON array built by SQLite in the standard success envelope"""
+    fields = ''.join(f', "{name}": {json.dumps(value)}' for name, value in extra.items())
+    body = f'{{"success": true, "{key}": {payload or "[]"}{fields}}}'
+    return app.response_class(body, status=200, mimetype='application/json')
+
+def encode_cursor(created_at, row_id):
+    """Opaque keyset cursor for the row a page ended on"""
+    # A missing created_at sorts as '' (see migrations/0015_user_projects_sort_key.sql)
+    raw = json.dumps([created_at or '', row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor, or ValueError if it was tampered with"""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if created_at is None:
+        created_at = ''
+    if not isinstance(created_at, str) or not isinstance(row_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, row_id
+
+def resource_version(user_id, resource):
+    """Trigger-maintained version counter of a user's resource"""
+    row = get_db().execute(
+        'SELECT version FROM resource_versions WHERE user_id = ? AND resource = ?',
+        (user_id, resource)
+    ).fetchone()
+    return row['version'] if row else 0
+
+def sse_event(payload, event=None, event_id=None):
+    """One Server-Sent Events message with a JSON data line"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(payload, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    # Keep reverse proxies from buffering the stream
+    'X-Accel-Buffering': 'no'
+}
+
+def resource_etag(user_id, resource, version=None, variant=b''):
+    """ETag for a user's resource at its current (or given) version
+
+    variant (e.g. the query string) tells pages and filters apart.
+    """
+    if version is None:
+        version = resource_version(user_id, resource)
+    etag = f"{resource}-{user_id}-{version}"
+    if variant:
+        etag += f"-{zlib.crc32(variant):08x}"
+    return etag
+
+def not_modified(etag):
+    """304 response when the client already holds this version, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(app.response_class(status=304), etag)
+
+def with_etag(response, etag):
+    """Attach a weak ETag and make clients revalidate before reusing it"""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 def init_db():
-    """Initialize database with schema"""
-    print("🗄️  Initializing database...")
-    
-    # SQL schema directly in Python
-    sql_schema = '''
-    CREATE TABLE IF NOT EXISTS users (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      full_name TEXT NOT NULL,
-      email TEXT UNIQUE NOT NULL,
-      password TEXT NOT NULL,
-      institution TEXT NOT NULL,
-      department TEXT NOT NULL,
-      year TEXT NOT NULL,
-      skills TEXT,
-      linkedin_url TEXT,
-      profile_pic TEXT,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-
-    CREATE TABLE IF NOT EXISTS projects (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      user_id INTEGER NOT NULL,
-      title TEXT NOT NULL,
-      description TEXT,
-      status TEXT DEFAULT 'todo',
-      assignee TEXT,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      FOREIGN KEY (user_id) REFERENCES users(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS project_members (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      project_id INTEGER NOT NULL,
-      user_id INTEGER NOT NULL,
-      role TEXT DEFAULT 'member',
-      joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      FOREIGN KEY (project_id) REFERENCES projects(id),
-      FOREIGN KEY (user_id) REFERENCES users(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS notifications (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      user_id INTEGER NOT NULL,
-      type TEXT NOT NULL,
-      message TEXT,
-      sender_name TEXT,
-      project_title TEXT,
-      is_read INTEGER DEFAULT 0,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      FOREIGN KEY (user_id) REFERENCES users(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS collaboration_requests (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      sender_id INTEGER NOT NULL,
-      recipient_id INTEGER NOT NULL,
-      project_id INTEGER,
-      message TEXT,
-      status TEXT DEFAULT 'pending',
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      FOREIGN KEY (sender_id) REFERENCES users(id),
-      FOREIGN KEY (recipient_id) REFERENCES users(id),
-      FOREIGN KEY (project_id) REFERENCES projects(id)
-    );
-
-    CREATE TABLE IF NOT EXISTS reviews (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      reviewer_id INTEGER NOT NULL,
-      reviewee_id INTEGER NOT NULL,
-      project_id INTEGER,
-      rating INTEGER,
-      comment TEXT,
-      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-      FOREIGN KEY (reviewer_id) REFERENCES users(id),
-      FOREIGN KEY (reviewee_id) REFERENCES users(id),
-      FOREIGN KEY (project_id) REFERENCES projects(id)
-    );
-
-    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-    CREATE INDEX IF NOT EXISTS idx_projects_user_id ON projects(user_id);
-    CREATE INDEX IF NOT EXISTS idx_project_members_project_id ON project_members(project_id);
-    CREATE INDEX IF NOT EXISTS idx_project_members_user_id ON project_members(user_id);
-    CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id);
-    CREATE INDEX IF NOT EXISTS idx_collaboration_requests_sender ON collaboration_requests(sender_id);
-    CREATE INDEX IF NOT EXISTS idx_collaboration_requests_recipient ON collaboration_requests(recipient_id);
-    CREATE INDEX IF NOT EXISTS idx_reviews_reviewer ON reviews(reviewer_id);
-    CREATE INDEX IF NOT EXISTS idx_reviews_reviewee ON reviews(reviewee_id);
-    '''
+    """Bring the database schema up to date"""
+    print("🗄️  Migrating database...")
     
     try:
-        db = get_db()
-        db.executescript(sql_schema)
-        db.commit()
+        db = connect(DATABASE, app.config['DB_PROFILE'])
+        version = schema_version(db)
+        applied = migrate(db)
         db.close()
-        print("✅ Database initialized successfully")
+        total_ms = sum(elapsed_ms for _, _, elapsed_ms in applied)
+        print(f"✅ Database migrated from v{version} to v{LATEST_VERSION} "
+              f"({len(applied)} migrations, {total_ms:.1f} ms)")
         return True
     except Exception as e:
-        print(f"❌ Database initialization error: {e}")
+        print(f"❌ Database migration error: {e}")
         traceback.print_exc()
         return False
 
+def hasher_busy_response(error):
+    """Shed load when the password hashing queue is full"""
+    print(f"⚠️  {error}")
+    return jsonify({'success': False, 'error': 'Server busy, please retry shortly'}), 503, {'Retry-After': '1'}
+
+def schedule_rehash(user_id, old_hash, password):
+    """Re-hash a password at the configured cost without delaying the login"""
+    def store(future):
+        if future.exception() is not None:
+            return
+        new_hash = future.result()
+        # Only replace the hash the login was checked against
+        submit_write(lambda conn: conn.execute(
+            'UPDATE users SET password = ? WHERE id = ? AND password = ?',
+            (new_hash, user_id, old_hash)
+        ))
+        print(f"🔁 Password rehashed for user {user_id}")
+
+    try:
+        passwords.hash_password_async(password).add_done_callback(store)
+    except PasswordHasherBusy:
+        # Not worth shedding the login for; retried on the next one
+        pass
+
+STREAM_SCOPE = 'stream'
+STREAM_ENDPOINTS = {'analytics_stream', 'notifications_stream'}
+
+@jwt.token_verification_loader
+def check_token_scope(jwt_header, jwt_data):
+    # A stream token copied out of a URL must not reach the rest of the API
+    return jwt_data.get('scope') != STREAM_SCOPE or request.endpoint in STREAM_ENDPOINTS
+
+@jwt.token_verification_failed_loader
+def token_scope_failed(jwt_header, jwt_data):
+    return jsonify({'success': False, 'error': 'Stream tokens only open event streams'}), 401
+
+def stream_jwt_required(fn):
+    """@jwt_required for Server-Sent Events routes
+
+    Takes the usual Authorization header or, since EventSource cannot send
+    one, a stream token in ?stream_token=. An access token in the URL is
+    refused: URLs end up in access logs, browser history and Referer.
+    """
+    @wraps(fn)
+    @jwt_required(locations=['headers', 'query_string'])
+    def wrapper(*args, **kwargs):
+        if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != STREAM_SCOPE:
+            return jsonify({'success': False, 'error': 'Use a stream token from POST /api/stream-token'}), 401
+        return fn(*args, **kwargs)
+    return wrapper
+
+def admin_required(fn):
+    """Allow only users listed in ADMIN_EMAILS (use below @jwt_required)"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if request.method == 'OPTIONS':
+            return fn(*args, **kwargs)
+        user = user_cache.current_user()
+        if not user or user['email'].lower() not in app.config['ADMIN_EMAILS']:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
 # ==================== AUTHENTICATION ROUTES ====================
 @app.route('/api/auth/register', methods=['POST', 'OPTIONS'])
 def register():
@@ -213,41 +331,42 @@ def register():
         ).fetchone()
         
         if existing_user:
-            db.close()
             return jsonify({'success': False, 'error': 'Email already registered'}), 409
         
         # Hash password
-        hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        hashed_password = passwords.hash_password(data['password'])
         
         # Insert user
-        cursor = db.execute(
-            '''INSERT INTO users (full_name, email, password, institution, department, year, 
-               skills, linkedin_url, profile_pic, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                data['fullName'],
-                data['email'],
-                hashed_password,
-                data['institution'],
-                data['department'],
-                data['year'],
-                ','.join(data['skills']),
-                data.get('linkedinUrl', ''),
-                data.get('profilePic', ''),
-                datetime.now().isoformat()
+        def insert_user(conn):
+            cursor = conn.execute(
+                '''INSERT INTO users (full_name, email, password, institution, department, year, 
+                   skills, linkedin_url, profile_pic, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (
+                    data['fullName'],
+                    data['email'],
+                    hashed_password,
+                    data['institution'],
+                    data['department'],
+                    data['year'],
+                    ','.join(data['skills']),
+                    data.get('linkedinUrl', ''),
+                    data.get('profilePic', ''),
+                    datetime.now().isoformat()
+                )
             )
-        )
-        db.commit()
+            return cursor.lastrowid
         
-        user_id = cursor.lastrowid
+        try:
+            user_id = execute_write(insert_user)
+        except sqlite3.IntegrityError:
+            return jsonify({'success': False, 'error': 'Email already registered'}), 409
         
         # Create access token
         access_token = create_access_token(identity=user_id)
         
         print(f"✅ User registered successfully: {user_id}")
         
-        db.close()
-        
         return jsonify({
             'success': True,
             'message': 'User registered successfully',
@@ -265,6 +384,8 @@ def register():
             }
         }), 201
         
+    except PasswordHasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         print(f"❌ Registration error: {str(e)}")
         traceback.print_exc()
@@ -291,20 +412,19 @@ def login():
         ).fetchone()
         
         if not user:
-            db.close()
             return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
         
-        if not bcrypt.check_password_hash(user['password'], data['password']):
-            db.close()
+        if not passwords.check_password(user['password'], data['password']):
             return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
         
+        if passwords.needs_rehash(user['password']):
+            schedule_rehash(user['id'], user['password'], data['password'])
+        
         # Create access token
         access_token = create_access_token(identity=user['id'])
         
         print(f"✅ Login successful: {user['id']}")
         
-        db.close()
-        
         return jsonify({
             'success': True,
             'message': 'Login successful',
@@ -322,34 +442,110 @@ def login():
             }
         }), 200
         
+    except PasswordHasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         print(f"❌ Login error: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/auth/profile', methods=['GET', 'OPTIONS'])
+@app.route('/api/auth/logout', methods=['POST', 'OPTIONS'])
 @jwt_required()
-def get_profile():
-    """Get current user profile"""
+def logout():
+    """Revoke the token used for this request"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        payload = get_jwt()
+        key, not_before = execute_write(lambda conn: revocation.revoke_token(conn, payload))
+        revocation.remember(key, not_before)
+        
+        print(f"👋 Logged out user {payload['sub']}")
+        
+        return jsonify({'success': True, 'message': 'Logged out successfully'}), 200
+        
+    except Exception as e:
+        print(f"❌ Logout error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/auth/password', methods=['PUT', 'OPTIONS'])
+@jwt_required()
+def change_password():
+    """Change password and revoke every token issued before the change"""
     if request.method == 'OPTIONS':
         return '', 204
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
+        data = request.get_json()
         
-        user = db.execute(
-            'SELECT * FROM users WHERE id = ?',
+        if not data.get('currentPassword') or not data.get('newPassword'):
+            return jsonify({'success': False, 'error': 'Current and new password required'}), 400
+        
+        if len(data['newPassword']) < 8:
+            return jsonify({'success': False, 'error': 'Password must be at least 8 characters'}), 400
+        
+        user = get_db().execute(
+            'SELECT password FROM users WHERE id = ?',
             (user_id,)
         ).fetchone()
         
         if not user:
-            db.close()
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
-        db.close()
+        if not passwords.check_password(user['password'], data['currentPassword']):
+            return jsonify({'success': False, 'error': 'Current password is incorrect'}), 401
+        
+        new_hash = passwords.hash_password(data['newPassword'])
+        lifetime = int(app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+        
+        def apply_password_change(conn):
+            conn.execute('UPDATE users SET password = ? WHERE id = ?', (new_hash, user_id))
+            return revocation.revoke_user_tokens(conn, user_id, lifetime)
+        
+        key, not_before = execute_write(apply_password_change)
+        revocation.remember(key, not_before)
+        
+        # Its issued_at claim is after the cutoff, so it stays valid
+        access_token = create_access_token(identity=user_id)
+        
+        print(f"🔑 Password changed for user {user_id}, older tokens revoked")
         
         return jsonify({
+            'success': True,
+            'message': 'Password changed successfully',
+            'token': access_token
+        }), 200
+        
+    except PasswordHasherBusy as e:
+        return hasher_busy_response(e)
+    except Exception as e:
+        print(f"❌ Change password error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/auth/profile', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_profile():
+    """Get current user profile"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        version = resource_version(user_id, 'profile')
+        etag = resource_etag(user_id, 'profile', version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Passing the version reloads a cached row another worker has outdated
+        user = user_cache.get_user(user_id, version)
+        
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        return with_etag(jsonify({
             'success': True,
             'user': {
                 'id': user['id'],
@@ -362,7 +558,7 @@ def get_profile():
                 'linkedinUrl': user['linkedin_url'],
                 'profilePic': user['profile_pic']
             }
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         print(f"❌ Get profile error: {str(e)}")
@@ -379,8 +575,6 @@ def update_profile():
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        db = get_db()
-        
         # Build update query dynamically
         update_fields = []
         values = []
@@ -416,13 +610,11 @@ def update_profile():
         if update_fields:
             values.append(user_id)
             
-            db.execute(
+            execute_write(lambda conn: conn.execute(
                 f'UPDATE users SET {", ".join(update_fields)} WHERE id = ?',
                 values
-            )
-            db.commit()
-        
-        db.close()
+            ))
+            user_cache.invalidate(user_id)
         
         return jsonify({'success': True, 'message': 'Profile updated successfully'}), 200
         
@@ -434,22 +626,91 @@ def update_profile():
 @app.route('/api/projects', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_projects():
-    """Get all projects for current user"""
+    """Get projects for current user, optionally one keyset page at a time
+
+    Query args: limit (page size), cursor (nextCursor from the previous
+    page), status (todo / inProgress / completed). Without limit or cursor
+    every project is returned, as before.
+    """
     if request.method == 'OPTIONS':
         return '', 204
 
     try:
         user_id = get_jwt_identity()
+        status = request.args.get('status')
+        cursor = request.args.get('cursor')
+        limit = request.args.get('limit', type=int)
+        
+        if status and status not in PROJECT_STATUSES:
+            return jsonify({'success': False, 'error': f'Invalid status: {status}'}), 400
+        
+        if cursor and not limit:
+            limit = app.config['PROJECTS_PAGE_SIZE']
+        if limit is not None:
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+        
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        
+        etag = resource_etag(user_id, 'projects', variant=request.query_string)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Owned and member projects both live in user_projects, so a page is
+        # one range scan of its (user_id, [status,] created_at, id) index
+        filters = ''
+        params = [user_id]
+        if status:
+            filters += ' AND up.project_status = ?'
+            params.append(status)
+        if after:
+            filters += ' AND (up.project_created_at, up.project_id) < (?, ?)'
+            params.extend(after)
+        page_limit = ''
+        if limit:
+            page_limit = ' LIMIT ?'
+            params.append(limit + 1)
+        
+        page_from = f'''FROM user_projects up
+                 JOIN projects p ON p.id = up.project_id
+                 WHERE up.user_id = ?{filters}'''
+        page_order = 'up.project_created_at DESC, up.project_id DESC'
+        sql = f'SELECT p.* {page_from} ORDER BY {page_order}{page_limit}'
+        
         db = get_db()
         
-        projects = db.execute(
-            '''SELECT * FROM projects 
-               WHERE user_id = ? OR id IN (
-                   SELECT project_id FROM project_members WHERE user_id = ?
-               )
-               ORDER BY created_at DESC''',
-            (user_id, user_id)
-        ).fetchall()
+        if app.config['SQL_JSON_RESPONSES']:
+            page_size = limit or -1
+            # Numbering rows in the page query itself follows the index order;
+            # a window over the finished page would sort it again
+            payload, more, last_created_at, last_id = db.execute(
+                f'''SELECT json_group_array(json_object(
+                       'id', id, 'title', title, 'description', description,
+                       'status', status, 'assignee', assignee, 'createdAt', created_at
+                   )) FILTER (WHERE ? < 0 OR rn <= ?),
+                   max(rn) > ? AND ? > 0,
+                   max(CASE WHEN rn = ? THEN created_at END),
+                   max(CASE WHEN rn = ? THEN id END)
+                   FROM (
+                       SELECT p.*, row_number() OVER (ORDER BY {page_order}) AS rn
+                       {page_from} ORDER BY {page_order}{page_limit}
+                   )''',
+                (page_size, page_size, page_size, page_size, page_size, page_size, *params)
+            ).fetchone()
+            next_cursor = encode_cursor(last_created_at, last_id) if more else None
+            return with_etag(sql_json_response('projects', payload, nextCursor=next_cursor), etag)
+        
+        projects = db.execute(sql, params).fetchall()
+        
+        next_cursor = None
+        if limit and len(projects) > limit:
+            projects = projects[:limit]
+            next_cursor = encode_cursor(projects[-1]['created_at'], projects[-1]['id'])
         
         project_list = []
         for project in projects:
@@ -462,14 +723,53 @@ def get_projects():
                 'createdAt': project['created_at']
             })
         
-        db.close()
-        
-        return jsonify({'success': True, 'projects': project_list}), 200
+        return with_etag(jsonify({
+            'success': True,
+            'projects': project_list,
+            'nextCursor': next_cursor
+        }), etag), 200
         
     except Exception as e:
         print(f"❌ Get projects error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/projects/search', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def search_projects():
+    """Full-text search over the titles and descriptions of the caller's projects
+
+    Query args: q (words; the last one matches as a prefix), limit.
+    Results are bm25-ranked and carry <mark>-highlighted title and snippet.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        text = request.args.get('q', '').strip()
+        limit = request.args.get('limit', project_search.DEFAULT_LIMIT, type=int)
+        limit = max(1, min(limit, project_search.MAX_LIMIT))
+
+        if not project_search.build_match_query(text):
+            return jsonify({'success': False, 'error': 'Search text is required'}), 400
+
+        etag = resource_etag(user_id, 'projects', variant=request.query_string)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        results = project_search.search_projects(get_db(), user_id, text, limit)
+        return with_etag(jsonify({
+            'success': True,
+            'query': text,
+            'projects': results
+        }), etag), 200
+
+    except Exception as e:
+        print(f"❌ Search projects error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/projects', methods=['POST', 'OPTIONS'])
 @jwt_required()
 def create_project():
@@ -484,24 +784,30 @@ def create_project():
         if not data.get('title'):
             return jsonify({'success': False, 'error': 'Project title is required'}), 400
         
-        db = get_db()
-        cursor = db.execute(
-            '''INSERT INTO projects (user_id, title, description, status, assignee, created_at)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (
-                user_id,
-                data['title'],
-                data.get('description', ''),
-                'todo',
-                data.get('assignee', 'You'),
-                datetime.now().isoformat()
+        created_at = datetime.now().isoformat()
+        
+        def insert_project(conn):
+            cursor = conn.execute(
+                '''INSERT INTO projects (user_id, title, description, status, assignee, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (
+                    user_id,
+                    data['title'],
+                    data.get('description', ''),
+                    'todo',
+                    data.get('assignee', 'You'),
+                    created_at
+                )
             )
-        )
-        db.commit()
-        
-        project_id = cursor.lastrowid
+            # Record ownership in the materialized project list
+            conn.execute(
+                '''INSERT INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+                   VALUES (?, ?, 'owner', ?, ?, 'todo')''',
+                (user_id, cursor.lastrowid, created_at, created_at)
+            )
+            return cursor.lastrowid
         
-        db.close()
+        project_id = execute_write(insert_project)
         
         return jsonify({
             'success': True,
@@ -519,6 +825,78 @@ def create_project():
         print(f"❌ Create project error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/projects/batch', methods=['PUT', 'OPTIONS'])
+@jwt_required()
+def batch_update_projects():
+    """Update the status of several projects in one transaction"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True)
+        changes = data.get('changes') if isinstance(data, dict) else data
+
+        if not isinstance(changes, list) or not changes:
+            return jsonify({'success': False, 'error': 'Expected a non-empty list of {id, status} changes'}), 400
+        if len(changes) > MAX_BATCH_UPDATES:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_UPDATES} changes per batch'}), 400
+
+        # Validate every item up front; invalid items get their own result.
+        # A project listed twice is rejected everywhere it appears rather
+        # than letting whichever entry comes last win.
+        seen = Counter(change.get('id') for change in changes
+                       if isinstance(change, dict) and isinstance(change.get('id'), int))
+        results = []
+        valid = []
+        for change in changes:
+            project_id = change.get('id') if isinstance(change, dict) else None
+            status = change.get('status') if isinstance(change, dict) else None
+            if not isinstance(project_id, int) or isinstance(project_id, bool):
+                results.append({'id': project_id, 'success': False, 'error': 'Invalid project id'})
+            elif seen[project_id] > 1:
+                results.append({'id': project_id, 'success': False, 'error': 'Duplicate project id in batch'})
+            elif status not in PROJECT_STATUSES:
+                results.append({'id': project_id, 'success': False, 'error': 'Invalid status'})
+            else:
+                results.append({'id': project_id, 'success': True})
+                valid.append((len(results) - 1, project_id, status))
+
+        def apply_batch(conn):
+            if not valid:
+                return set()
+            ids = sorted({project_id for _, project_id, _ in valid})
+            placeholders = ','.join('?' * len(ids))
+            owned = {row['id'] for row in conn.execute(
+                f'SELECT id FROM projects WHERE user_id = ? AND id IN ({placeholders})',
+                [user_id, *ids]
+            )}
+            # Unchanged rows are skipped so their ETags do not move
+            conn.executemany(
+                'UPDATE projects SET status = ? WHERE id = ? AND status IS NOT ?',
+                [(status, project_id, status) for _, project_id, status in valid if project_id in owned]
+            )
+            return owned
+
+        owned = execute_write(apply_batch)
+
+        for index, project_id, _ in valid:
+            if project_id not in owned:
+                results[index] = {'id': project_id, 'success': False, 'error': 'Project not found or unauthorized'}
+
+        updated = sum(1 for result in results if result['success'])
+        print(f"✅ Batch project update: {updated}/{len(results)} applied for user {user_id}")
+        return jsonify({
+            'success': updated == len(results),
+            'updated': updated,
+            'results': results
+        }), 200
+
+    except Exception as e:
+        print(f"❌ Batch update projects error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/projects/<int:project_id>', methods=['PUT', 'OPTIONS'])
 @jwt_required()
 def update_project(project_id):
@@ -530,27 +908,26 @@ def update_project(project_id):
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        db = get_db()
-        
-        # Verify project ownership
-        project = db.execute(
-            'SELECT * FROM projects WHERE id = ? AND user_id = ?',
-            (project_id, user_id)
-        ).fetchone()
-        
-        if not project:
-            db.close()
+        def apply_update(conn):
+            # Verify project ownership
+            project = conn.execute(
+                'SELECT * FROM projects WHERE id = ? AND user_id = ?',
+                (project_id, user_id)
+            ).fetchone()
+            
+            if not project:
+                return False
+            
+            if 'status' in data:
+                conn.execute(
+                    'UPDATE projects SET status = ? WHERE id = ?',
+                    (data['status'], project_id)
+                )
+            return True
+        
+        if not execute_write(apply_update):
             return jsonify({'success': False, 'error': 'Project not found or unauthorized'}), 404
         
-        if 'status' in data:
-            db.execute(
-                'UPDATE projects SET status = ? WHERE id = ?',
-                (data['status'], project_id)
-            )
-            db.commit()
-        
-        db.close()
-        
         return jsonify({'success': True, 'message': 'Project updated successfully'}), 200
         
     except Exception as e:
@@ -568,7 +945,128 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     }), 200
 
+@app.route('/api/internal/db/pool', methods=['GET'])
+@jwt_required()
+@admin_required
+def db_pool_stats():
+    """Read pool, writer queue and password hasher counters for this worker"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'pool': pool_stats(),
+        'writer': writer_stats(),
+        'passwords': passwords.hasher_stats()
+    }), 200
+
+@app.route('/api/internal/cache', methods=['GET'])
+@jwt_required()
+@admin_required
+def user_cache_stats():
+    """User context cache counters for this worker"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'user_cache': user_cache.cache_stats()
+    }), 200
+
+@app.route('/api/internal/revocation', methods=['GET'])
+@jwt_required()
+@admin_required
+def revocation_stats():
+    """Token revocation filter counters for this worker"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'revocation': revocation.revocation_stats()
+    }), 200
+
+@app.route('/api/internal/streams', methods=['GET'])
+@jwt_required()
+@admin_required
+def stream_stats():
+    """Change feed counters behind the SSE endpoints for this worker"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'streams': events.feed_stats()
+    }), 200
+
+@app.route('/api/internal/notification-queue', methods=['GET'])
+@jwt_required()
+@admin_required
+def notification_queue_stats():
+    """Notification fan-out backlog, lag and this worker's delivery counters"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'workers': notification_queue.worker_stats(),
+        'queue': notification_queue.queue_stats(get_db())
+    }), 200
+
+@app.route('/api/internal/rollups', methods=['GET'])
+@jwt_required()
+@admin_required
+def rollup_stats():
+    """Activity rollup runs and its lag behind the status event log"""
+    db = get_db()
+    watermark = db.execute(
+        "SELECT last_event_id, updated_at FROM rollup_state WHERE name = 'project_activity_daily'"
+    ).fetchone()
+    latest = db.execute('SELECT MAX(id) FROM project_status_events').fetchone()[0] or 0
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'rollup': activity.rollup_stats(),
+        'watermark': watermark['last_event_id'],
+        'rolled_up_at': watermark['updated_at'],
+        'pending_events': latest - watermark['last_event_id']
+    }), 200
+
+@app.route('/api/internal/db/queries', methods=['GET'])
+@jwt_required()
+@admin_required
+def db_query_stats():
+    """Top-N statement aggregates and recent slow queries for this worker"""
+    limit = request.args.get('limit', 20, type=int)
+    sort = request.args.get('sort', 'total_ms')
+    if sort not in ('total_ms', 'max_ms', 'avg_ms', 'calls', 'rows'):
+        return jsonify({'success': False, 'error': f'Invalid sort: {sort}'}), 400
+    
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'slow_query_ms': query_stats.settings['slow_query_ms'],
+        'statements': query_stats.top_statements(limit, sort),
+        'slow_queries': query_stats.slow_queries(limit)
+    }), 200
+
+@app.route('/api/internal/db/queries', methods=['DELETE'])
+@jwt_required()
+@admin_required
+def reset_db_query_stats():
+    """Reset statement aggregates for this worker"""
+    query_stats.reset()
+    return jsonify({'success': True, 'message': 'Query stats reset'}), 200
+
 # ==================== ANALYTICS ROUTES ====================
+def load_analytics(user_id):
+    """Project counters for a user, as served by /api/analytics and its stream"""
+    # Counters are maintained by triggers (migration 0009); no row means no projects
+    project_stats = get_db().execute(
+        'SELECT total, todo, in_progress, completed FROM user_project_stats WHERE user_id = ?',
+        (user_id,)
+    ).fetchone() or {'total': 0, 'todo': 0, 'in_progress': 0, 'completed': 0}
+    
+    total = project_stats['total'] or 0
+    completed = project_stats['completed'] or 0
+    return {
+        'total_projects': total,
+        'todo': project_stats['todo'] or 0,
+        'in_progress': project_stats['in_progress'] or 0,
+        'completed': completed,
+        'completion_rate': (completed / total * 100) if total > 0 else 0
+    }
+
 @app.route('/api/analytics', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_analytics():
@@ -578,40 +1076,191 @@ def get_analytics():
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
-        
-        # Get project stats
-        project_stats = db.execute(
-            '''SELECT 
-                   COUNT(*) as total,
-                   SUM(CASE WHEN status = 'todo' THEN 1 ELSE 0 END) as todo,
-                   SUM(CASE WHEN status = 'inProgress' THEN 1 ELSE 0 END) as in_progress,
-                   SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-               FROM projects WHERE user_id = ?''',
-            (user_id,)
-        ).fetchone()
-        
-        db.close()
+        return jsonify({
+            'success': True,
+            'analytics': load_analytics(user_id)
+        }), 200
         
-        total = project_stats['total'] or 0
-        completed = project_stats['completed'] or 0
+    except Exception as e:
+        print(f"❌ Get analytics error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analytics/trends', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_analytics_trends():
+    """Projects created / started / completed and time in progress per day or week
+
+    Query args: from, to (YYYY-MM-DD, inclusive; default the last 30 days),
+    bucket (day or week). Served from the daily rollups plus the events
+    the background rollup has not folded in yet.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        bucket = request.args.get('bucket', 'day')
+        if bucket not in activity.BUCKETS:
+            return jsonify({'success': False, 'error': f'Invalid bucket: {bucket}'}), 400
+        try:
+            first, last = activity.parse_range(request.args.get('from'), request.args.get('to'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
+        series, totals = activity.load_trends(get_db(), user_id, first, last, bucket)
         return jsonify({
             'success': True,
-            'analytics': {
-                'total_projects': total,
-                'todo': project_stats['todo'] or 0,
-                'in_progress': project_stats['in_progress'] or 0,
-                'completed': completed,
-                'completion_rate': (completed / total * 100) if total > 0 else 0
-            }
+            'from': first.isoformat(),
+            'to': last.isoformat(),
+            'bucket': bucket,
+            'series': series,
+            'totals': totals
         }), 200
         
     except Exception as e:
-        print(f"❌ Get analytics error: {str(e)}")
+        print(f"❌ Get analytics trends error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/analytics/org', methods=['GET', 'OPTIONS'])
+@jwt_required()
+@admin_required
+def get_org_analytics():
+    """Per-institution analytics from the latest batch snapshot
+
+    ?institution=<name> returns that institution's departments instead.
+    Snapshots never change, so the ETag is the snapshot id.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        db = get_db()
+        snapshot = org_analytics.latest_snapshot(db)
+        if snapshot is None:
+            return jsonify({'success': False, 'error': 'No analytics snapshot has been built yet'}), 404
+        
+        institution = request.args.get('institution')
+        etag = f"org-{snapshot['id']}"
+        if institution is not None:
+            etag += f"-{zlib.crc32(institution.encode()):08x}"
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+        
+        payload = org_analytics.cached_org(db, snapshot, institution)
+        if payload is None:
+            return jsonify({'success': False, 'error': 'Institution not found'}), 404
+        return with_etag(jsonify({'success': True, **payload}), etag), 200
+        
+    except Exception as e:
+        print(f"❌ Get org analytics error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/stream-token', methods=['POST', 'OPTIONS'])
+@jwt_required()
+def create_stream_token():
+    """Short-lived token that only opens Server-Sent Events streams
+
+    EventSource cannot send an Authorization header, so the stream URL has
+    to carry a token. This one expires after STREAM_TOKEN_SECONDS, is
+    refused by every other route and is only checked when a stream opens.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    seconds = app.config['STREAM_TOKEN_SECONDS']
+    token = create_access_token(
+        identity=get_jwt_identity(),
+        expires_delta=timedelta(seconds=seconds),
+        additional_claims={'scope': STREAM_SCOPE}
+    )
+    return jsonify({'success': True, 'token': token, 'expiresIn': seconds}), 200
+
+@app.route('/api/analytics/stream', methods=['GET'])
+@stream_jwt_required
+def analytics_stream():
+    """Server-Sent Events: a fresh analytics snapshot whenever the user's projects change
+
+    Event ids are the user's projects version, so a reconnect with
+    Last-Event-ID gets no snapshot unless something changed meanwhile.
+    Each open stream holds a thread here; serve through asgi.py for many
+    concurrent clients, where the same stream is a coroutine.
+    """
+    user_id = get_jwt_identity()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    heartbeat = app.config['STREAM_HEARTBEAT_SECONDS']
+    
+    updates = queue.Queue()
+    version = resource_version(user_id, 'projects')
+    subscription = events.subscribe('projects', user_id, version, updates.put)
+    
+    def generate():
+        sent = last_event_id
+        current = version
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                if str(current) != sent:
+                    # A short app context per snapshot so the stream does not hold a pooled connection
+                    with app.app_context():
+                        snapshot = load_analytics(user_id)
+                    yield sse_event(snapshot, 'analytics', current)
+                    sent = str(current)
+                try:
+                    current = updates.get(timeout=heartbeat)
+                    while not updates.empty():
+                        current = updates.get_nowait()
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+        finally:
+            events.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
 # ==================== NOTIFICATIONS ROUTES ====================
+def notification_json(notif):
+    """API shape of a notifications row"""
+    return {
+        'id': notif['id'],
+        'type': notif['type'],
+        'message': notif['message'],
+        'read': bool(notif['is_read']),
+        'timestamp': notif['created_at'],
+        'sender': notif['sender_name'],
+        'project': notif['project_title']
+    }
+
+def latest_notification_id(user_id):
+    """Id of the user's newest notification, 0 when there are none"""
+    return get_db().execute(
+        'SELECT MAX(id) FROM notifications WHERE user_id = ?',
+        (user_id,)
+    ).fetchone()[0] or 0
+
+def load_new_notifications(user_id, after_id, limit=NOTIFICATION_STREAM_BATCH):
+    """Notifications created after after_id, oldest first, as sent by the stream"""
+    rows = get_db().execute(
+        '''SELECT * FROM notifications
+           WHERE user_id = ? AND id > ?
+           ORDER BY id
+           LIMIT ?''',
+        (user_id, after_id, limit)
+    ).fetchall()
+    return [notification_json(row) for row in rows]
+
+def notification_resume_id(last_event_id, after):
+    """Last notification id the client has seen, None for a fresh stream
+
+    Raises ValueError for ids that are not non-negative integers.
+    """
+    value = last_event_id or after
+    if value is None or value == '':
+        return None
+    value = int(value)
+    if value < 0:
+        raise ValueError(value)
+    return value
+
 @app.route('/api/notifications', methods=['GET', 'OPTIONS'])
 @jwt_required()
 def get_notifications():
@@ -621,8 +1270,30 @@ def get_notifications():
 
     try:
         user_id = get_jwt_identity()
+        etag = resource_etag(user_id, 'notifications')
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         db = get_db()
         
+        if app.config['SQL_JSON_RESPONSES']:
+            payload = db.execute(
+                '''SELECT json_group_array(json_object(
+                       'id', id, 'type', type, 'message', message,
+                       'read', json(CASE WHEN is_read THEN 'true' ELSE 'false' END),
+                       'timestamp', created_at, 'sender', sender_name, 'project', project_title
+                   ))
+                   FROM (
+                       SELECT * FROM notifications 
+                       WHERE user_id = ? 
+                       ORDER BY created_at DESC 
+                       LIMIT 50
+                   )''',
+                (user_id,)
+            ).fetchone()[0]
+            return with_etag(sql_json_response('notifications', payload), etag)
+        
         notifications = db.execute(
             '''SELECT * FROM notifications 
                WHERE user_id = ? 
@@ -631,29 +1302,152 @@ def get_notifications():
             (user_id,)
         ).fetchall()
         
-        notification_list = []
-        for notif in notifications:
-            notification_list.append({
-                'id': notif['id'],
-                'type': notif['type'],
-                'message': notif['message'],
-                'read': bool(notif['is_read']),
-                'timestamp': notif['created_at'],
-                'sender': notif['sender_name'],
-                'project': notif['project_title']
-            })
+        notification_list = [notification_json(notif) for notif in notifications]
         
-        db.close()
-        
-        return jsonify({
+        return with_etag(jsonify({
             'success': True,
             'notifications': notification_list
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         print(f"❌ Get notifications error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/notifications/stream', methods=['GET'])
+@stream_jwt_required
+def notifications_stream():
+    """Server-Sent Events: each notification as it is created
+
+    Event ids are notification ids. A reconnect with Last-Event-ID (or
+    ?after=<id>) first replays what was created meanwhile; a fresh stream
+    starts after the newest existing notification, which the client
+    already has from GET /api/notifications.
+    """
+    user_id = get_jwt_identity()
+    try:
+        after = notification_resume_id(request.headers.get('Last-Event-ID'), request.args.get('after'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid notification id'}), 400
+    heartbeat = app.config['STREAM_HEARTBEAT_SECONDS']
+    
+    updates = queue.Queue()
+    # Version first: anything inserted after this read wakes the subscription
+    version = resource_version(user_id, 'notifications')
+    if after is None:
+        after = latest_notification_id(user_id)
+    subscription = events.subscribe('notifications', user_id, version, updates.put)
+    
+    def generate():
+        last_id = after
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                with app.app_context():
+                    batch = load_new_notifications(user_id, last_id)
+                for notification in batch:
+                    yield sse_event(notification, 'notification', notification['id'])
+                    last_id = notification['id']
+                if len(batch) == NOTIFICATION_STREAM_BATCH:
+                    continue
+                # Idle streams only send heartbeats; the database is read on wake-ups
+                while True:
+                    try:
+                        updates.get(timeout=heartbeat)
+                        break
+                    except queue.Empty:
+                        yield ': heartbeat\n\n'
+                while not updates.empty():
+                    updates.get_nowait()
+        finally:
+            events.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+@app.route('/api/notifications/unread-count', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_unread_notification_count():
+    """Unread notification count from the trigger-maintained counter"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        etag = resource_etag(user_id, 'notifications', variant=b'unread-count')
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # Maintained by triggers (migration 0014); no row means no notifications yet
+        counter = get_db().execute(
+            'SELECT unread FROM notification_counters WHERE user_id = ?',
+            (user_id,)
+        ).fetchone()
+        
+        return with_etag(jsonify({
+            'success': True,
+            'unread': counter['unread'] if counter else 0
+        }), etag), 200
+        
+    except Exception as e:
+        print(f"❌ Get unread count error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/notifications/read', methods=['PUT', 'OPTIONS'])
+@jwt_required()
+def mark_notifications_read():
+    """Mark several notifications as read in one statement
+
+    Body: {"ids": [3, 5, 8]} for those notifications, or {"upTo": 8} for
+    every notification up to and including id 8. Returns how many changed
+    and the new unread count.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+        ids = data.get('ids')
+        up_to = data.get('upTo', data.get('up_to'))
+        
+        if (ids is None) == (up_to is None):
+            return jsonify({'success': False, 'error': 'Send either ids or upTo'}), 400
+        
+        if ids is not None:
+            if not isinstance(ids, list) or not ids:
+                return jsonify({'success': False, 'error': 'ids must be a non-empty list'}), 400
+            if len(ids) > MAX_READ_IDS:
+                return jsonify({'success': False, 'error': f'At most {MAX_READ_IDS} ids per request'}), 400
+            if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+                return jsonify({'success': False, 'error': 'ids must be integers'}), 400
+            ids = sorted(set(ids))
+            placeholders = ','.join('?' * len(ids))
+            sql = f'''UPDATE notifications SET is_read = 1
+                      WHERE user_id = ? AND is_read = 0 AND id IN ({placeholders})'''
+            params = [user_id, *ids]
+        else:
+            if not isinstance(up_to, int) or isinstance(up_to, bool) or up_to < 0:
+                return jsonify({'success': False, 'error': 'upTo must be a notification id'}), 400
+            sql = '''UPDATE notifications SET is_read = 1
+                     WHERE user_id = ? AND is_read = 0 AND id <= ?'''
+            params = [user_id, up_to]
+        
+        def mark(conn):
+            updated = conn.execute(sql, params).rowcount
+            counter = conn.execute(
+                'SELECT unread FROM notification_counters WHERE user_id = ?',
+                (user_id,)
+            ).fetchone()
+            return updated, counter['unread'] if counter else 0
+        
+        updated, unread = execute_write(mark)
+        
+        return jsonify({'success': True, 'updated': updated, 'unread': unread}), 200
+        
+    except Exception as e:
+        print(f"❌ Mark notifications read error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/notifications/<int:notification_id>/read', methods=['PUT', 'OPTIONS'])
 @jwt_required()
 def mark_notification_read(notification_id):
@@ -663,14 +1457,11 @@ def mark_notification_read(notification_id):
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
         
-        db.execute(
+        execute_write(lambda conn: conn.execute(
             'UPDATE notifications SET is_read = 1 WHERE id = ? AND user_id = ?',
             (notification_id, user_id)
-        )
-        db.commit()
-        db.close()
+        ))
         
         return jsonify({'success': True, 'message': 'Notification marked as read'}), 200
         
@@ -687,14 +1478,11 @@ def clear_notifications():
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
         
-        db.execute(
+        execute_write(lambda conn: conn.execute(
             'DELETE FROM notifications WHERE user_id = ?',
             (user_id,)
-        )
-        db.commit()
-        db.close()
+        ))
         
         return jsonify({'success': True, 'message': 'All notifications cleared'}), 200
         
@@ -794,11 +1582,7 @@ def search_teammates():
     # -----------------------------
     # 6️⃣ Execute query
     # -----------------------------
-    conn = sqlite3.connect("database.db")
-    cursor = conn.cursor()
-    cursor.execute(sql, params)
-    rows = cursor.fetchall()
-    conn.close()
+    rows = get_db().execute(sql, params).fetchall()
 
     print(f"\n📌 Found {len(rows)} matching teammates")
 
@@ -864,6 +1648,42 @@ def test_send_collaboration_request():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ==================== COLLABORATION REQUESTS ====================
+def create_collaboration_request(conn, sender_id, teammate_id, project_id, message):
+    """Insert a pending request and queue its notification in one write job.
+
+    The request is an INSERT ... SELECT, so nothing is read before the
+    write, and the notification job commits with it: the request never
+    exists without its notification being delivered. Returns the new
+    request id, or None when the sender or project does not exist. A
+    duplicate pending request raises sqlite3.IntegrityError from
+    idx_collaboration_requests_pending.
+    """
+    now = datetime.now().isoformat()
+    cursor = conn.execute(
+        '''INSERT INTO collaboration_requests 
+           (sender_id, recipient_id, project_id, message, status, created_at)
+           SELECT u.id, ?, p.id, ?, 'pending', ?
+           FROM users u, projects p
+           WHERE u.id = ? AND p.id = ?''',
+        (teammate_id, message, now, sender_id, project_id)
+    )
+    if cursor.rowcount == 0:
+        return None
+    request_id = cursor.lastrowid
+    
+    # Notification for the recipient, delivered by the queue workers
+    names = conn.execute(
+        '''SELECT u.full_name, p.title FROM users u, projects p
+           WHERE u.id = ? AND p.id = ?''',
+        (sender_id, project_id)
+    ).fetchone()
+    notification_queue.enqueue(
+        conn, f'collaboration_request:{request_id}', [teammate_id], 'incoming_request',
+        f"{names['full_name']} wants to collaborate on '{names['title']}'",
+        sender_name=names['full_name'], project_title=names['title'], created_at=now
+    )
+    return request_id
+
 @app.route('/api/requests/send', methods=['POST', 'OPTIONS'])
 @jwt_required(optional=True)
 def send_collaboration_request():
@@ -931,82 +1751,26 @@ def send_collaboration_request():
         
         print(f"   ✅ All validations passed")
         
-        db_conn = get_db()
-        
-        # Get sender and project info for notification
-        sender = db_conn.execute(
-            'SELECT full_name, email FROM users WHERE id = ?', 
-            (sender_id,)
-        ).fetchone()
-        
-        project = db_conn.execute(
-            'SELECT title FROM projects WHERE id = ?', 
-            (project_id,)
-        ).fetchone()
-        
-        if not sender:
-            db_conn.close()
-            return jsonify({'success': False, 'error': 'Sender not found'}), 404
-            
-        if not project:
-            db_conn.close()
-            return jsonify({'success': False, 'error': 'Project not found'}), 404
-        
-        # Check if request already exists
-        existing = db_conn.execute(
-            '''SELECT id FROM collaboration_requests 
-               WHERE sender_id = ? AND recipient_id = ? AND project_id = ? AND status = 'pending' ''',
-            (sender_id, teammate_id, project_id)
-        ).fetchone()
-        
-        if existing:
-            db_conn.close()
+        try:
+            request_id = execute_write(
+                lambda conn: create_collaboration_request(conn, sender_id, teammate_id, project_id, message)
+            )
+        except sqlite3.IntegrityError:
+            # idx_collaboration_requests_pending rejected a duplicate
             return jsonify({
                 'success': False, 
                 'error': 'You already have a pending request for this project'
             }), 409
         
-        # Create collaboration request
-        cursor = db_conn.execute(
-            '''INSERT INTO collaboration_requests 
-               (sender_id, recipient_id, project_id, message, status, created_at)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (
-                sender_id,
-                teammate_id,
-                project_id,
-                message,
-                'pending',
-                datetime.now().isoformat()
-            )
-        )
-        request_id = cursor.lastrowid
-        db_conn.commit()
-        
-        print(f"✅ Collaboration request created with ID: {request_id}")
-        
-        # Create notification for recipient
-        notification_message = f"{sender['full_name']} wants to collaborate on '{project['title']}'"
-        
-        db_conn.execute(
-            '''INSERT INTO notifications 
-               (user_id, type, message, sender_name, project_title, is_read, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?)''',
-            (
-                teammate_id,
-                'incoming_request',
-                notification_message,
-                sender['full_name'],
-                project['title'],
-                0,
-                datetime.now().isoformat()
-            )
-        )
-        db_conn.commit()
+        if request_id is None:
+            if not user_cache.get_user(sender_id):
+                return jsonify({'success': False, 'error': 'Sender not found'}), 404
+            return jsonify({'success': False, 'error': 'Project not found'}), 404
         
-        print(f"✅ Notification created for user {teammate_id}")
+        notification_queue.wake()
         
-        db_conn.close()
+        print(f"✅ Collaboration request created with ID: {request_id}")
+        print(f"✅ Notification queued for user {teammate_id}")
         
         return jsonify({
             'success': True,
@@ -1033,6 +1797,24 @@ def get_received_requests():
         user_id = get_jwt_identity()
         db = get_db()
         
+        if app.config['SQL_JSON_RESPONSES']:
+            payload = db.execute(
+                '''SELECT json_group_array(json_object(
+                       'id', id, 'sender_name', full_name, 'project_title', title,
+                       'message', message, 'created_at', created_at
+                   ))
+                   FROM (
+                       SELECT cr.*, u.full_name, p.title 
+                       FROM collaboration_requests cr
+                       JOIN users u ON cr.sender_id = u.id
+                       JOIN projects p ON cr.project_id = p.id
+                       WHERE cr.recipient_id = ? AND cr.status = 'pending'
+                       ORDER BY cr.created_at DESC
+                   )''',
+                (user_id,)
+            ).fetchone()[0]
+            return sql_json_response('requests', payload)
+        
         requests = db.execute(
             '''SELECT cr.*, u.full_name, p.title 
                FROM collaboration_requests cr
@@ -1053,8 +1835,6 @@ def get_received_requests():
                 'created_at': req['created_at']
             })
         
-        db.close()
-        
         return jsonify({
             'success': True,
             'requests': request_list
@@ -1073,33 +1853,43 @@ def accept_request(request_id):
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
         
-        # Get request details
-        req = db.execute(
-            'SELECT * FROM collaboration_requests WHERE id = ? AND recipient_id = ?',
-            (request_id, user_id)
-        ).fetchone()
+        def apply_accept(conn):
+            # Get request details
+            req = conn.execute(
+                'SELECT * FROM collaboration_requests WHERE id = ? AND recipient_id = ?',
+                (request_id, user_id)
+            ).fetchone()
+            
+            if not req:
+                return False
+            
+            # Add user as project member
+            member = conn.execute(
+                'INSERT INTO project_members (project_id, user_id, role) VALUES (?, ?, ?)',
+                (req['project_id'], user_id, 'member')
+            )
+            
+            # Record membership in the materialized project list
+            conn.execute(
+                '''INSERT OR IGNORE INTO user_projects
+                   (user_id, project_id, role, joined_at, project_created_at, project_status)
+                   SELECT m.user_id, m.project_id, m.role, m.joined_at, p.created_at, p.status
+                   FROM project_members m JOIN projects p ON p.id = m.project_id
+                   WHERE m.id = ?''',
+                (member.lastrowid,)
+            )
+            
+            # Update request status
+            conn.execute(
+                'UPDATE collaboration_requests SET status = ? WHERE id = ?',
+                ('accepted', request_id)
+            )
+            return True
         
-        if not req:
-            db.close()
+        if not execute_write(apply_accept):
             return jsonify({'success': False, 'error': 'Request not found'}), 404
         
-        # Add user as project member
-        db.execute(
-            'INSERT INTO project_members (project_id, user_id, role) VALUES (?, ?, ?)',
-            (req['project_id'], user_id, 'member')
-        )
-        
-        # Update request status
-        db.execute(
-            'UPDATE collaboration_requests SET status = ? WHERE id = ?',
-            ('accepted', request_id)
-        )
-        
-        db.commit()
-        db.close()
-        
         return jsonify({
             'success': True,
             'message': 'Collaboration request accepted'
@@ -1118,16 +1908,12 @@ def reject_request(request_id):
 
     try:
         user_id = get_jwt_identity()
-        db = get_db()
         
         # Update request status
-        db.execute(
+        execute_write(lambda conn: conn.execute(
             'UPDATE collaboration_requests SET status = ? WHERE id = ? AND recipient_id = ?',
             ('rejected', request_id, user_id)
-        )
-        
-        db.commit()
-        db.close()
+        ))
         
         return jsonify({
             'success': True,
@@ -1158,28 +1944,28 @@ def submit_review():
         if not 1 <= data['rating'] <= 5:
             return jsonify({'success': False, 'error': 'Rating must be between 1 and 5'}), 400
         
-        db = get_db()
-        
-        cursor = db.execute(
-            '''INSERT INTO reviews 
-               (reviewer_id, reviewee_id, project_id, rating, comment, created_at)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (
-                reviewer_id,
-                data['reviewee_id'],
-                data['project_id'],
-                data['rating'],
-                data['comment'],
-                datetime.now().isoformat()
+        def insert_review(conn):
+            cursor = conn.execute(
+                '''INSERT INTO reviews 
+                   (reviewer_id, reviewee_id, project_id, rating, comment, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (
+                    reviewer_id,
+                    data['reviewee_id'],
+                    data['project_id'],
+                    data['rating'],
+                    data['comment'],
+                    datetime.now().isoformat()
+                )
             )
-        )
-        db.commit()
-        db.close()
+            return cursor.lastrowid
+        
+        review_id = execute_write(insert_review)
         
         return jsonify({
             'success': True,
             'message': 'Review submitted successfully',
-            'review_id': cursor.lastrowid
+            'review_id': review_id
         }), 201
         
     except Exception as e:
@@ -1197,6 +1983,23 @@ def get_received_reviews():
         user_id = get_jwt_identity()
         db = get_db()
         
+        if app.config['SQL_JSON_RESPONSES']:
+            payload = db.execute(
+                '''SELECT json_group_array(json_object(
+                       'id', id, 'reviewer_name', full_name, 'rating', rating,
+                       'comment', comment, 'created_at', created_at
+                   ))
+                   FROM (
+                       SELECT r.*, u.full_name 
+                       FROM reviews r
+                       JOIN users u ON r.reviewer_id = u.id
+                       WHERE r.reviewee_id = ?
+                       ORDER BY r.created_at DESC
+                   )''',
+                (user_id,)
+            ).fetchone()[0]
+            return sql_json_response('reviews', payload)
+        
         reviews = db.execute(
             '''SELECT r.*, u.full_name 
                FROM reviews r
@@ -1216,8 +2019,6 @@ def get_received_reviews():
                 'created_at': review['created_at']
             })
         
-        db.close()
-        
         return jsonify({
             'success': True,
             'reviews': review_list
@@ -1238,6 +2039,23 @@ def get_given_reviews():
         user_id = get_jwt_identity()
         db = get_db()
         
+        if app.config['SQL_JSON_RESPONSES']:
+            payload = db.execute(
+                '''SELECT json_group_array(json_object(
+                       'id', id, 'reviewee_name', full_name, 'rating', rating,
+                       'comment', comment, 'created_at', created_at
+                   ))
+                   FROM (
+                       SELECT r.*, u.full_name 
+                       FROM reviews r
+                       JOIN users u ON r.reviewee_id = u.id
+                       WHERE r.reviewer_id = ?
+                       ORDER BY r.created_at DESC
+                   )''',
+                (user_id,)
+            ).fetchone()[0]
+            return sql_json_response('reviews', payload)
+        
         reviews = db.execute(
             '''SELECT r.*, u.full_name 
                FROM reviews r
@@ -1257,8 +2075,6 @@ def get_given_reviews():
                 'created_at': review['created_at']
             })
         
-        db.close()
-        
         return jsonify({
             'success': True,
             'reviews': review_list
@@ -1269,6 +2085,87 @@ def get_given_reviews():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# ==================== ADMIN ROUTES ====================
+@app.route('/api/admin/users/import', methods=['POST', 'OPTIONS'])
+@jwt_required()
+@admin_required
+def import_users_csv():
+    """Bulk-import users from an uploaded CSV (Name, Year, Interests, Skills)"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        if 'password' in request.args:
+            # Query strings end up in access logs and browser history
+            return jsonify({'success': False, 'error': 'Send password as a form field or X-Import-Password header, not in the URL'}), 400
+        
+        options = request.form if request.files else request.args
+        institution = options.get('institution')
+        password = request.form.get('password') if request.files else request.headers.get('X-Import-Password')
+        
+        if not institution or not password:
+            return jsonify({'success': False, 'error': 'institution and password are required'}), 400
+        
+        if len(password) < 8:
+            return jsonify({'success': False, 'error': 'Password must be at least 8 characters'}), 400
+        
+        # Multipart upload or a raw text/csv body, streamed either way
+        stream = request.files['file'].stream if 'file' in request.files else request.stream
+        lines = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        
+        print(f"📥 Importing users for {institution}")
+        
+        report = import_users(
+            lines, execute_write,
+            institution=institution,
+            password=password,
+            hasher=app.extensions['password_hasher'],
+            department=options.get('department'),
+            email_domain=options.get('emailDomain'),
+            rounds=app.config['IMPORT_LOG_ROUNDS']
+        )
+        
+        print(f"✅ Imported {report['inserted']} users ({report['rows_per_second']:.0f} rows/s)")
+        
+        return jsonify({'success': True, 'report': report}), 200
+        
+    except ImportRowError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except PasswordHasherBusy as e:
+        return hasher_busy_response(e)
+    except Exception as e:
+        print(f"❌ Import users error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/admin/analytics/org/snapshot', methods=['POST', 'OPTIONS'])
+@jwt_required()
+@admin_required
+def build_org_analytics_snapshot():
+    """Build and store a new institution/department analytics snapshot now"""
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        meta, rows = org_analytics.build_snapshot(
+            get_db(),
+            engine=app.config['ORG_ANALYTICS_ENGINE'],
+            chunk_size=app.config['ORG_ANALYTICS_CHUNK_SIZE'],
+            active_days=app.config['ORG_ANALYTICS_ACTIVE_DAYS']
+        )
+        snapshot_id = execute_write(org_analytics.save_snapshot_job(meta, rows, app.config['ORG_ANALYTICS_KEEP']))
+        
+        print(f"✅ Built org analytics snapshot {snapshot_id} in {meta['build_ms']:.0f} ms ({meta['engine']})")
+        
+        return jsonify({
+            'success': True,
+            'snapshot': {'id': snapshot_id, **meta, 'rows': len(rows)}
+        }), 201
+        
+    except Exception as e:
+        print(f"❌ Build org analytics error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 # ==================== MAIN ====================
 if __name__ == '__main__':
@@ -1276,28 +2173,20 @@ if __name__ == '__main__':
     print("🚀 Starting CollabSphere Backend")
     print("="*50)
     print(f"📝 Database: {DATABASE}")
+    print(f"💾 Storage profile: {app.config['DB_PROFILE']}")
     print(f"🌐 API Base URL: http://localhost:5000/api")
     print(f"✨ CORS enabled for localhost:3000 and localhost:5173")
     print("="*50 + "\n")
     
-    # Initialize database - check if exists
-    if not os.path.exists(DATABASE):
-        print("⚠️  Database not found, creating new database...")
+    # Startup check is a single PRAGMA user_version read
+    db = connect(DATABASE, app.config['DB_PROFILE'])
+    version = schema_version(db)
+    db.close()
+    
+    if version < LATEST_VERSION:
+        print(f"⚠️  Database schema v{version} is behind v{LATEST_VERSION}, migrating...")
         init_db()
     else:
-        # Check if tables exist
-        try:
-            db = get_db()
-            cursor = db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-            if not cursor.fetchone():
-                print("⚠️  Tables not found, initializing database...")
-                db.close()
-                init_db()
-            else:
-                print("✅ Database and tables verified")
-                db.close()
-        except Exception as e:
-            print(f"⚠️  Error checking database: {e}")
-            init_db()
+        print(f"✅ Database schema verified (v{version})")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
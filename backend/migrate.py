@@ -0,0 +1,55 @@
+# migrate.py - Apply pending schema migrations to database.db
+#
+#   python migrate.py                        # apply everything pending
+#   python migrate.py --status               # list pending migrations, change nothing
+#   python migrate.py --database other.db
+#
+# Safe to run while the backend is serving: each migration is a short
+# incremental transaction (new tables/indexes), never a rebuild.
+
+import argparse
+import sqlite3
+
+from utils.migrations import LATEST_VERSION, MIGRATIONS, migrate, schema_version
+
+DATABASE = 'database.db'
+
+
+def run_migrations(database=DATABASE, apply=True):
+    """Show migration status and apply anything pending unless apply is False"""
+    conn = sqlite3.connect(database)
+
+    print("=" * 60)
+    print("DATABASE MIGRATIONS")
+    print("=" * 60)
+
+    version = schema_version(conn)
+    print(f"\n📄 {database}")
+    print(f"📌 Current version: v{version}")
+    print(f"📦 Latest version:  v{LATEST_VERSION}")
+
+    pending = [(v, name) for v, name, _ in MIGRATIONS if v > version]
+    if not pending:
+        print("\n✅ Nothing to migrate")
+    elif not apply:
+        print(f"\n⏸️  {len(pending)} pending migrations (not applied):")
+        for v, name in pending:
+            print(f"   • {v:04d}_{name}")
+    else:
+        print(f"\n🔧 Applying {len(pending)} migrations:")
+        applied = migrate(conn)
+        total_ms = sum(elapsed_ms for _, _, elapsed_ms in applied)
+        print(f"\n✅ Migrated to v{schema_version(conn)} in {total_ms:.1f} ms")
+
+    print("\n" + "=" * 60 + "\n")
+    conn.close()
+    return len(pending)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply pending schema migrations')
+    parser.add_argument('--database', default=DATABASE)
+    parser.add_argument('--status', '--dry-run', dest='status', action='store_true',
+                        help='List pending migrations without applying them')
+    args = parser.parse_args()
+    run_migrations(args.database, apply=not args.status)
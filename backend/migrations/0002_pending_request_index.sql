@@ -0,0 +1,14 @@
+-- Enforce one pending request per sender/recipient/project so
+-- send_collaboration_request can rely on the index instead of a pre-SELECT.
+
+-- Older databases may already hold duplicates, keep the oldest one pending
+UPDATE collaboration_requests SET status = 'duplicate'
+WHERE status = 'pending' AND id NOT IN (
+  SELECT MIN(id) FROM collaboration_requests
+  WHERE status = 'pending'
+  GROUP BY sender_id, recipient_id, project_id
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_collaboration_requests_pending
+  ON collaboration_requests(sender_id, recipient_id, project_id)
+  WHERE status = 'pending';
@@ -0,0 +1,22 @@
+-- Composite indexes so every list route is served by an index range scan
+-- in the order it returns rows (no SCAN, no temp B-tree sort). Checked by
+-- check_query_plans.py.
+
+-- GET /api/notifications: WHERE user_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at);
+DROP INDEX IF EXISTS idx_notifications_user_id;
+
+-- GET /api/requests/received: WHERE recipient_id = ? AND status = 'pending' ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_collaboration_requests_recipient_status_created
+  ON collaboration_requests(recipient_id, status, created_at);
+DROP INDEX IF EXISTS idx_collaboration_requests_recipient;
+
+-- GET /api/reviews/received and /api/reviews/given
+CREATE INDEX IF NOT EXISTS idx_reviews_reviewee_created ON reviews(reviewee_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_reviewer_created ON reviews(reviewer_id, created_at);
+DROP INDEX IF EXISTS idx_reviews_reviewee;
+DROP INDEX IF EXISTS idx_reviews_reviewer;
+
+-- GET /api/projects owner branch and GET /api/analytics
+CREATE INDEX IF NOT EXISTS idx_projects_user_created ON projects(user_id, created_at);
+DROP INDEX IF EXISTS idx_projects_user_id;
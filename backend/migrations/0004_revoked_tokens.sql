@@ -0,0 +1,19 @@
+-- Revoked JWTs. `token_key` is either a token's jti (logout) or
+-- 'user:<id>' (password change), in which case every token for that user
+-- issued before `not_before` (unix seconds) is revoked. Workers load new
+-- rows into an in-memory Bloom filter by id, so ids must never be reused.
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    token_key TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    not_before INTEGER,
+    expires_at INTEGER NOT NULL,
+    revoked_at TEXT NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Confirming a Bloom filter hit
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_key ON revoked_tokens(token_key);
+
+-- Pruning rows whose tokens have expired anyway
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
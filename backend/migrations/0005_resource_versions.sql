@@ -0,0 +1,81 @@
+-- Per-user version counters behind the ETags on GET /api/auth/profile,
+-- /api/projects and /api/notifications. Triggers bump them on every write,
+-- whoever makes it (routes, the writer queue, CLI imports), so a request
+-- can answer 304 from one primary-key lookup.
+CREATE TABLE IF NOT EXISTS resource_versions (
+    user_id INTEGER NOT NULL,
+    resource TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, resource)
+) WITHOUT ROWID;
+
+-- Profile: only the columns the profile response shows (not password rehashes)
+CREATE TRIGGER IF NOT EXISTS trg_users_profile_version
+AFTER UPDATE OF full_name, email, institution, department, year, skills, linkedin_url, profile_pic ON users
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.id, 'profile', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+-- Projects: the owner and every member see the project in their list
+CREATE TRIGGER IF NOT EXISTS trg_projects_insert_version
+AFTER INSERT ON projects
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.user_id, 'projects', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_update_version
+AFTER UPDATE ON projects
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version)
+    SELECT NEW.user_id, 'projects', 1 WHERE true
+    UNION SELECT OLD.user_id, 'projects', 1 WHERE true
+    UNION SELECT user_id, 'projects', 1 FROM project_members WHERE project_id = NEW.id
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_delete_version
+AFTER DELETE ON projects
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version)
+    SELECT OLD.user_id, 'projects', 1 WHERE true
+    UNION SELECT user_id, 'projects', 1 FROM project_members WHERE project_id = OLD.id
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_project_members_insert_version
+AFTER INSERT ON project_members
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.user_id, 'projects', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_project_members_delete_version
+AFTER DELETE ON project_members
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (OLD.user_id, 'projects', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+-- Notifications: insert, mark read, clear
+CREATE TRIGGER IF NOT EXISTS trg_notifications_insert_version
+AFTER INSERT ON notifications
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.user_id, 'notifications', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_update_version
+AFTER UPDATE ON notifications
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.user_id, 'notifications', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_delete_version
+AFTER DELETE ON notifications
+BEGIN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (OLD.user_id, 'notifications', 1)
+    ON CONFLICT(user_id, resource) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,7 @@
+-- Keyset pagination for GET /api/projects: each branch of the owned /
+-- member union is a range scan in (created_at, id) order. The rowid is
+-- the trailing column of every index, so idx_projects_user_created
+-- already covers the unfiltered owner branch.
+
+-- ?status= filter on the owner branch
+CREATE INDEX IF NOT EXISTS idx_projects_user_status_created ON projects(user_id, status, created_at);
@@ -0,0 +1,45 @@
+-- Materialized "my projects": one row per (user, project) the user owns or
+-- is a member of. create_project records ownership and accept_request
+-- records membership; check_user_projects.py verifies the table against
+-- projects and project_members. The project's created_at and status are
+-- copied in so a page of GET /api/projects is a single index range scan.
+CREATE TABLE IF NOT EXISTS user_projects (
+    user_id INTEGER NOT NULL,
+    project_id INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    joined_at TEXT,
+    project_created_at TEXT,
+    project_status TEXT,
+    PRIMARY KEY (user_id, project_id),
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (project_id) REFERENCES projects(id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_user_projects_user_created
+  ON user_projects(user_id, project_created_at, project_id);
+CREATE INDEX IF NOT EXISTS idx_user_projects_user_status_created
+  ON user_projects(user_id, project_status, project_created_at, project_id);
+CREATE INDEX IF NOT EXISTS idx_user_projects_project ON user_projects(project_id);
+
+-- Backfill: owners first so an owner who is also a member keeps 'owner'
+INSERT OR IGNORE INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+SELECT user_id, id, 'owner', created_at, created_at, status FROM projects;
+
+INSERT OR IGNORE INTO user_projects (user_id, project_id, role, joined_at, project_created_at, project_status)
+SELECT m.user_id, m.project_id, COALESCE(m.role, 'member'), m.joined_at, p.created_at, p.status
+FROM project_members m JOIN projects p ON p.id = m.project_id;
+
+-- Keep the copied columns current whoever changes the project
+CREATE TRIGGER IF NOT EXISTS trg_projects_user_projects_status
+AFTER UPDATE OF status, created_at ON projects
+BEGIN
+    UPDATE user_projects
+    SET project_status = NEW.status, project_created_at = NEW.created_at
+    WHERE project_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_user_projects_delete
+AFTER DELETE ON projects
+BEGIN
+    DELETE FROM user_projects WHERE project_id = OLD.id;
+END;
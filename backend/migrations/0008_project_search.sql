@@ -0,0 +1,60 @@
+-- Full-text search over project titles and descriptions for
+-- GET /api/projects/search. Triggers keep projects_fts in step with every
+-- write, whoever makes it.
+--
+-- members holds one 'u<user_id>' token per user_projects row, so a search
+-- is scoped inside the index: MATCH 'members:"u7" AND {title description}: ...'
+-- intersects the caller's short doclist with the term doclists instead of
+-- ranking every matching project and filtering afterwards. That keeps the
+-- cost tied to the caller's projects rather than to the whole table.
+-- prefix='2 3' adds prefix indexes so short "ap*" queries stay index lookups.
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    title,
+    description,
+    members,
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+INSERT INTO projects_fts (rowid, title, description, members)
+SELECT p.id, p.title, COALESCE(p.description, ''),
+       COALESCE((SELECT group_concat('u' || up.user_id, ' ') FROM user_projects up WHERE up.project_id = p.id), '')
+FROM projects p;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_fts_insert
+AFTER INSERT ON projects
+BEGIN
+    INSERT INTO projects_fts (rowid, title, description, members)
+    VALUES (NEW.id, NEW.title, COALESCE(NEW.description, ''), '');
+END;
+
+-- Status changes do not touch the text, so only title / description updates reindex
+CREATE TRIGGER IF NOT EXISTS trg_projects_fts_update
+AFTER UPDATE OF title, description ON projects
+BEGIN
+    UPDATE projects_fts SET title = NEW.title, description = COALESCE(NEW.description, '')
+    WHERE rowid = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_fts_delete
+AFTER DELETE ON projects
+BEGIN
+    DELETE FROM projects_fts WHERE rowid = OLD.id;
+END;
+
+-- Owners and members come and go through user_projects
+CREATE TRIGGER IF NOT EXISTS trg_user_projects_fts_insert
+AFTER INSERT ON user_projects
+BEGIN
+    UPDATE projects_fts
+    SET members = (SELECT group_concat('u' || user_id, ' ') FROM user_projects WHERE project_id = NEW.project_id)
+    WHERE rowid = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_projects_fts_delete
+AFTER DELETE ON user_projects
+BEGIN
+    UPDATE projects_fts
+    SET members = COALESCE((SELECT group_concat('u' || user_id, ' ') FROM user_projects WHERE project_id = OLD.project_id), '')
+    WHERE rowid = OLD.project_id;
+END;
@@ -0,0 +1,63 @@
+-- Per-user project counters behind GET /api/analytics, which used to run a
+-- COUNT / SUM(CASE ...) over all of the user's projects on every poll.
+-- Triggers keep them exact on every write to projects, whoever makes it,
+-- so the endpoint reads one row by primary key. Like the old query, the
+-- counts cover projects the user owns; total includes any status outside
+-- the three known ones. check_user_project_stats.py verifies and rebuilds.
+CREATE TABLE IF NOT EXISTS user_project_stats (
+    user_id INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    todo INTEGER NOT NULL DEFAULT 0,
+    in_progress INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+) WITHOUT ROWID;
+
+INSERT INTO user_project_stats (user_id, total, todo, in_progress, completed)
+SELECT user_id, COUNT(*),
+       SUM(status IS 'todo'), SUM(status IS 'inProgress'), SUM(status IS 'completed')
+FROM projects
+GROUP BY user_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_stats_insert
+AFTER INSERT ON projects
+BEGIN
+    INSERT INTO user_project_stats (user_id, total, todo, in_progress, completed)
+    VALUES (NEW.user_id, 1, NEW.status IS 'todo', NEW.status IS 'inProgress', NEW.status IS 'completed')
+    ON CONFLICT(user_id) DO UPDATE SET
+        total = total + 1,
+        todo = todo + excluded.todo,
+        in_progress = in_progress + excluded.in_progress,
+        completed = completed + excluded.completed;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_stats_update
+AFTER UPDATE OF status, user_id ON projects
+WHEN OLD.status IS NOT NEW.status OR OLD.user_id IS NOT NEW.user_id
+BEGIN
+    UPDATE user_project_stats SET
+        total = total - 1,
+        todo = todo - (OLD.status IS 'todo'),
+        in_progress = in_progress - (OLD.status IS 'inProgress'),
+        completed = completed - (OLD.status IS 'completed')
+    WHERE user_id = OLD.user_id;
+
+    INSERT INTO user_project_stats (user_id, total, todo, in_progress, completed)
+    VALUES (NEW.user_id, 1, NEW.status IS 'todo', NEW.status IS 'inProgress', NEW.status IS 'completed')
+    ON CONFLICT(user_id) DO UPDATE SET
+        total = total + 1,
+        todo = todo + excluded.todo,
+        in_progress = in_progress + excluded.in_progress,
+        completed = completed + excluded.completed;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_stats_delete
+AFTER DELETE ON projects
+BEGIN
+    UPDATE user_project_stats SET
+        total = total - 1,
+        todo = todo - (OLD.status IS 'todo'),
+        in_progress = in_progress - (OLD.status IS 'inProgress'),
+        completed = completed - (OLD.status IS 'completed')
+    WHERE user_id = OLD.user_id;
+END;
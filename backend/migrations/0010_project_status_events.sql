@@ -0,0 +1,77 @@
+-- Append-only log of project status changes plus the daily per-owner
+-- buckets that utils/activity.py rolls it up into for
+-- GET /api/analytics/trends. Triggers on projects write the log for every
+-- insert and status change, whoever makes it (create_project,
+-- update_project, the batch endpoint, scripts). Timestamps use the same
+-- local-time ISO format as the rest of the app; buckets are keyed on the
+-- date part.
+CREATE TABLE IF NOT EXISTS project_status_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    from_status TEXT,
+    to_status TEXT,
+    created_at TEXT NOT NULL
+);
+
+-- Previous "entered inProgress" event of a project (time-in-progress)
+CREATE INDEX IF NOT EXISTS idx_status_events_project ON project_status_events(project_id, id);
+-- Events a user's trend query adds on top of the rollup
+CREATE INDEX IF NOT EXISTS idx_status_events_user ON project_status_events(user_id, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_status_events_no_update
+BEFORE UPDATE ON project_status_events
+BEGIN
+    SELECT RAISE(ABORT, 'project_status_events is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_status_events_no_delete
+BEFORE DELETE ON project_status_events
+BEGIN
+    SELECT RAISE(ABORT, 'project_status_events is append-only');
+END;
+
+-- History before this migration is unknown: each existing project gets one
+-- creation event in its current status at its created_at
+INSERT INTO project_status_events (project_id, user_id, from_status, to_status, created_at)
+SELECT id, user_id, NULL, status, COALESCE(created_at, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))
+FROM projects
+ORDER BY id;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_status_event_insert
+AFTER INSERT ON projects
+BEGIN
+    INSERT INTO project_status_events (project_id, user_id, from_status, to_status, created_at)
+    VALUES (NEW.id, NEW.user_id, NULL, NEW.status,
+            COALESCE(NEW.created_at, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_status_event_update
+AFTER UPDATE OF status ON projects
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    INSERT INTO project_status_events (project_id, user_id, from_status, to_status, created_at)
+    VALUES (NEW.id, NEW.user_id, OLD.status, NEW.status, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'));
+END;
+
+-- Daily buckets per project owner. in_progress_seconds sums the inProgress
+-- stints that ended that day; in_progress_exits counts them.
+CREATE TABLE IF NOT EXISTS project_activity_daily (
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    created INTEGER NOT NULL DEFAULT 0,
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    in_progress_seconds REAL NOT NULL DEFAULT 0,
+    in_progress_exits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+
+-- Watermark: the last event folded into the buckets
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name TEXT PRIMARY KEY,
+    last_event_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+
+INSERT OR IGNORE INTO rollup_state (name, last_event_id) VALUES ('project_activity_daily', 0);
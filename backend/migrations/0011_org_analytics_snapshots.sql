@@ -0,0 +1,51 @@
+-- Institution- and department-wide analytics computed in batch by
+-- utils/org_analytics.py (build_org_snapshot.py or the admin endpoint) and
+-- served by GET /api/analytics/org. A snapshot is written once, in one
+-- transaction, and never changed: readers see either the previous
+-- snapshot or the complete new one. Old snapshots are pruned whole.
+CREATE TABLE IF NOT EXISTS org_analytics_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    build_ms REAL NOT NULL,
+    users INTEGER NOT NULL,
+    projects INTEGER NOT NULL,
+    reviews INTEGER NOT NULL,
+    active_days INTEGER NOT NULL
+);
+
+-- scope 'institution' rows have department NULL and sum their departments
+CREATE TABLE IF NOT EXISTS org_analytics_rows (
+    snapshot_id INTEGER NOT NULL,
+    scope TEXT NOT NULL,
+    institution TEXT NOT NULL,
+    department TEXT,
+    users INTEGER NOT NULL,
+    active_users INTEGER NOT NULL,
+    projects INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    reviews INTEGER NOT NULL,
+    rating_sum INTEGER NOT NULL,
+    top_skills TEXT NOT NULL,
+    FOREIGN KEY (snapshot_id) REFERENCES org_analytics_snapshots(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_org_analytics_rows_snapshot
+  ON org_analytics_rows(snapshot_id, scope, institution, department);
+
+CREATE TRIGGER IF NOT EXISTS trg_org_analytics_snapshots_immutable
+BEFORE UPDATE ON org_analytics_snapshots
+BEGIN
+    SELECT RAISE(ABORT, 'org analytics snapshots are immutable');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_org_analytics_rows_immutable
+BEFORE UPDATE ON org_analytics_rows
+BEGIN
+    SELECT RAISE(ABORT, 'org analytics snapshots are immutable');
+END;
+
+-- Active users for the snapshot: distinct owners with buckets in the last
+-- N days, read from this index alone instead of scanning every bucket
+CREATE INDEX IF NOT EXISTS idx_project_activity_daily_day
+  ON project_activity_daily(day, user_id);
@@ -0,0 +1,4 @@
+-- GET /api/notifications/stream: WHERE user_id = ? AND id > ? ORDER BY id.
+-- notifications.id is AUTOINCREMENT, so a client's last seen id is a
+-- resume point that later inserts always sort after.
+CREATE INDEX IF NOT EXISTS idx_notifications_user_id_id ON notifications(user_id, id);
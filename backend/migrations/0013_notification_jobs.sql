@@ -0,0 +1,30 @@
+-- Durable fan-out queue for notifications (utils/notification_queue.py).
+-- Request handlers insert one job however many recipients it has, in the
+-- same transaction as the change that caused it; worker threads deliver
+-- jobs in batches. Times are Unix seconds.
+--
+--   status       pending -> done, or failed after the last attempt
+--   available_at when a pending job may next be claimed (retries back off)
+CREATE TABLE IF NOT EXISTS notification_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    completed_at REAL,
+    last_error TEXT
+);
+
+-- Claims walk due jobs in order; counts per status and pruning of done
+-- jobs read the same index
+CREATE INDEX IF NOT EXISTS idx_notification_jobs_status_available
+  ON notification_jobs(status, available_at);
+
+-- A job delivered twice (at-least-once) inserts each recipient's
+-- notification only once
+ALTER TABLE notifications ADD COLUMN idempotency_key TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_user_idempotency
+  ON notifications(user_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
@@ -0,0 +1,51 @@
+-- Per-user unread notification counter behind GET
+-- /api/notifications/unread-count, so a badge no longer needs the 50 most
+-- recent notifications. Triggers keep it exact on every write to
+-- notifications, including bulk marks made in one UPDATE statement.
+-- Unread means is_read = 0, the form the bulk UPDATE can find through
+-- the index below; the few legacy NULLs are normalized first.
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id INTEGER PRIMARY KEY,
+    unread INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+) WITHOUT ROWID;
+
+UPDATE notifications SET is_read = 0 WHERE is_read IS NULL;
+
+INSERT INTO notification_counters (user_id, unread)
+SELECT user_id, SUM(is_read IS 0)
+FROM notifications
+GROUP BY user_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_insert
+AFTER INSERT ON notifications
+BEGIN
+    INSERT INTO notification_counters (user_id, unread)
+    VALUES (NEW.user_id, NEW.is_read IS 0)
+    ON CONFLICT(user_id) DO UPDATE SET unread = unread + excluded.unread;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_update
+AFTER UPDATE OF is_read, user_id ON notifications
+WHEN (OLD.is_read IS 0) IS NOT (NEW.is_read IS 0) OR OLD.user_id IS NOT NEW.user_id
+BEGIN
+    UPDATE notification_counters SET unread = unread - (OLD.is_read IS 0)
+    WHERE user_id = OLD.user_id;
+
+    INSERT INTO notification_counters (user_id, unread)
+    VALUES (NEW.user_id, NEW.is_read IS 0)
+    ON CONFLICT(user_id) DO UPDATE SET unread = unread + excluded.unread;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_unread_delete
+AFTER DELETE ON notifications
+WHEN OLD.is_read IS 0
+BEGIN
+    UPDATE notification_counters SET unread = unread - 1
+    WHERE user_id = OLD.user_id;
+END;
+
+-- A user's unread notifications, newest first: PUT /api/notifications/read
+-- finds the rows to mark through it without touching read ones
+CREATE INDEX IF NOT EXISTS idx_notifications_user_read_created
+  ON notifications(user_id, is_read, created_at);
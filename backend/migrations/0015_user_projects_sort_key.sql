@@ -0,0 +1,25 @@
+-- project_created_at is the keyset sort key of GET /api/projects, and a
+-- NULL there drops out of row-value comparisons: a page ending on such a
+-- project got a cursor the route rejected, and a cursor before it never
+-- reached it. Store '' instead; it sorts below every timestamp, so these
+-- projects stay last, and the range scans keep their index.
+UPDATE user_projects SET project_created_at = '' WHERE project_created_at IS NULL;
+
+DROP TRIGGER IF EXISTS trg_projects_user_projects_status;
+
+CREATE TRIGGER IF NOT EXISTS trg_projects_user_projects_status
+AFTER UPDATE OF status, created_at ON projects
+BEGIN
+    UPDATE user_projects
+    SET project_status = NEW.status, project_created_at = coalesce(NEW.created_at, '')
+    WHERE project_id = NEW.id;
+END;
+
+-- Writers copy projects.created_at as is
+CREATE TRIGGER IF NOT EXISTS trg_user_projects_sort_key
+AFTER INSERT ON user_projects
+WHEN NEW.project_created_at IS NULL
+BEGIN
+    UPDATE user_projects SET project_created_at = ''
+    WHERE user_id = NEW.user_id AND project_id = NEW.project_id;
+END;
@@ -0,0 +1,4 @@
+-- GET /api/projects pages through user_projects since migration 0007, so
+-- the ?status= owner-branch index of 0006 has no reader left and only
+-- costs a write on every project insert and status change.
+DROP INDEX IF EXISTS idx_projects_user_status_created;
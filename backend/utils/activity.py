@@ -0,0 +1,245 @@
+# utils/activity.py - Daily rollups of project_status_events for trend views
+#
+# The event log (migration 0010) only grows. A background thread folds new
+# events into project_activity_daily every ACTIVITY_ROLLUP_SECONDS through
+# the single writer: each pass reads the watermark in rollup_state, adds at
+# most ACTIVITY_ROLLUP_BATCH events to their (owner, day) buckets and moves
+# the watermark in the same transaction, so passes from several workers
+# serialize on the write lock and never count an event twice.
+#
+# Trend reads scan the requested range of a user's buckets by primary key
+# and add the user's few events past the watermark, so they are current and
+# cost grows with the days requested, not with the history.
+
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from utils.db import execute_write
+
+ROLLUP_NAME = 'project_activity_daily'
+DEFAULT_ROLLUP_SECONDS = 60
+DEFAULT_ROLLUP_BATCH = 5000
+MAX_TREND_DAYS = 731
+DEFAULT_TREND_DAYS = 30
+BUCKETS = ('day', 'week')
+
+# One row per event with the counters it contributes to its (owner, day)
+# bucket. Leaving inProgress closes a stint that started at the project's
+# latest earlier "entered inProgress" event.
+EVENT_METRICS = '''
+    SELECT e.user_id, substr(e.created_at, 1, 10) AS day,
+           e.from_status IS NULL AS created,
+           e.to_status IS 'inProgress' AS started,
+           e.to_status IS 'completed' AS completed,
+           CASE WHEN e.from_status IS 'inProgress' THEN max(0, (julianday(e.created_at) - julianday((
+               SELECT s.created_at FROM project_status_events s
+               WHERE s.project_id = e.project_id AND s.id < e.id AND s.to_status = 'inProgress'
+               ORDER BY s.id DESC LIMIT 1
+           ))) * 86400) END AS in_progress_seconds
+    FROM project_status_events e'''
+
+ROLLUP_SQL = f'''
+    INSERT INTO project_activity_daily
+        (user_id, day, created, started, completed, in_progress_seconds, in_progress_exits)
+    SELECT user_id, day, SUM(created), SUM(started), SUM(completed),
+           TOTAL(in_progress_seconds), COUNT(in_progress_seconds)
+    FROM ({EVENT_METRICS} WHERE e.id > ? AND e.id <= ?)
+    WHERE true
+    GROUP BY user_id, day
+    ON CONFLICT(user_id, day) DO UPDATE SET
+        created = created + excluded.created,
+        started = started + excluded.started,
+        completed = completed + excluded.completed,
+        in_progress_seconds = in_progress_seconds + excluded.in_progress_seconds,
+        in_progress_exits = in_progress_exits + excluded.in_progress_exits'''
+
+# Bucket rows in the range plus per-event rows past the watermark; the
+# caller sums them per day or week
+TRENDS_SQL = f'''
+    SELECT day, created, started, completed, in_progress_seconds, in_progress_exits
+    FROM project_activity_daily
+    WHERE user_id = ? AND day >= ? AND day <= ?
+    UNION ALL
+    SELECT day, created, started, completed, in_progress_seconds, in_progress_seconds IS NOT NULL
+    FROM ({EVENT_METRICS}
+          WHERE e.user_id = ?
+            AND e.id > (SELECT last_event_id FROM rollup_state WHERE name = 'project_activity_daily'))
+    WHERE day >= ? AND day <= ?'''
+
+
+def rollup_job(conn, batch_size=DEFAULT_ROLLUP_BATCH):
+    """Writer job: fold the next batch of events into the buckets; returns the event count"""
+    last_id = conn.execute(
+        'SELECT last_event_id FROM rollup_state WHERE name = ?',
+        (ROLLUP_NAME,)
+    ).fetchone()[0]
+    count, upto = conn.execute(
+        '''SELECT COUNT(*), MAX(id) FROM (
+               SELECT id FROM project_status_events WHERE id > ? ORDER BY id LIMIT ?
+           )''',
+        (last_id, batch_size)
+    ).fetchone()
+    if not count:
+        return 0
+    conn.execute(ROLLUP_SQL, (last_id, upto))
+    conn.execute(
+        'UPDATE rollup_state SET last_event_id = ?, updated_at = ? WHERE name = ?',
+        (upto, datetime.now().isoformat(), ROLLUP_NAME)
+    )
+    return count
+
+
+def reset_job(conn):
+    """Writer job: drop every bucket and rewind the watermark (rebuild from the log)"""
+    conn.execute('DELETE FROM project_activity_daily')
+    conn.execute('UPDATE rollup_state SET last_event_id = 0, updated_at = ? WHERE name = ?',
+                 (datetime.now().isoformat(), ROLLUP_NAME))
+
+
+def run_rollup(run_write, batch_size=DEFAULT_ROLLUP_BATCH):
+    """Roll up until the log is drained; returns the number of events folded"""
+    total = 0
+    while True:
+        count = run_write(lambda conn: rollup_job(conn, batch_size))
+        total += count
+        if count < batch_size:
+            return total
+
+
+def parse_range(start, end, today=None):
+    """(first_day, last_day) as dates, or ValueError for bad or oversized ranges"""
+    today = today or date.today()
+    try:
+        last = date.fromisoformat(end) if end else today
+        first = date.fromisoformat(start) if start else last - timedelta(days=DEFAULT_TREND_DAYS - 1)
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if first > last:
+        raise ValueError('from must not be after to')
+    if (last - first).days + 1 > MAX_TREND_DAYS:
+        raise ValueError(f'At most {MAX_TREND_DAYS} days per request')
+    return first, last
+
+
+def _bucket_start(day, bucket):
+    return day - timedelta(days=day.weekday()) if bucket == 'week' else day
+
+
+def load_trends(db, user_id, first, last, bucket='day'):
+    """Zero-filled series of activity buckets between two dates (inclusive)"""
+    rows = db.execute(
+        TRENDS_SQL,
+        (user_id, first.isoformat(), last.isoformat(), user_id, first.isoformat(), last.isoformat())
+    ).fetchall()
+
+    series = {}
+    day = _bucket_start(first, bucket)
+    step = timedelta(days=7 if bucket == 'week' else 1)
+    while day <= last:
+        series[day] = {'created': 0, 'started': 0, 'completed': 0,
+                       'in_progress_seconds': 0.0, 'in_progress_exits': 0}
+        day += step
+
+    for row in rows:
+        point = series[_bucket_start(date.fromisoformat(row['day']), bucket)]
+        for key in point:
+            point[key] += row[key] or 0
+
+    def shape(start, point):
+        exits = point['in_progress_exits']
+        return {
+            'start': start.isoformat(),
+            'created': point['created'],
+            'started': point['started'],
+            'completed': point['completed'],
+            'inProgressExits': exits,
+            'avgInProgressHours': round(point['in_progress_seconds'] / exits / 3600, 2) if exits else None
+        }
+
+    totals = {key: sum(point[key] for point in series.values())
+              for key in ('created', 'started', 'completed', 'in_progress_seconds', 'in_progress_exits')}
+    return [shape(start, point) for start, point in series.items()], shape(first, totals)
+
+
+class ActivityRollup:
+    """Background thread that keeps project_activity_daily caught up"""
+
+    def __init__(self, interval=DEFAULT_ROLLUP_SECONDS, batch_size=DEFAULT_ROLLUP_BATCH):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self.runs = 0
+        self.events = 0
+        self.errors = 0
+        self.last_run_ms = 0.0
+        self.last_run_at = None
+
+    def ensure_started(self):
+        # Lazily (re)start the thread in the current process
+        if self.interval <= 0 or (self._pid == os.getpid() and self._thread is not None):
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-rollup', daemon=True)
+            self._thread.start()
+
+    def run_once(self):
+        started = time.perf_counter()
+        count = run_rollup(execute_write, self.batch_size)
+        with self._lock:
+            self.runs += 1
+            self.events += count
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+            self.last_run_at = datetime.now().isoformat()
+        return count
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Activity rollup error: {str(e)}")
+
+    def stats(self):
+        """Snapshot of rollup counters"""
+        with self._lock:
+            return {
+                'interval_seconds': self.interval,
+                'batch_size': self.batch_size,
+                'running': self._thread is not None and self._pid == os.getpid(),
+                'runs': self.runs,
+                'events': self.events,
+                'errors': self.errors,
+                'last_run_ms': round(self.last_run_ms, 3),
+                'last_run_at': self.last_run_at
+            }
+
+
+_rollup = None
+
+
+def init_app(app):
+    """Configure the rollup and start it with the first request in each process"""
+    global _rollup
+    _rollup = ActivityRollup(
+        interval=float(app.config.get('ACTIVITY_ROLLUP_SECONDS', DEFAULT_ROLLUP_SECONDS)),
+        batch_size=int(app.config.get('ACTIVITY_ROLLUP_BATCH', DEFAULT_ROLLUP_BATCH))
+    )
+    app.extensions['activity_rollup'] = _rollup
+    app.before_request(_rollup.ensure_started)
+    return _rollup
+
+
+def rollup_stats():
+    """Counters for the current process rollup"""
+    if _rollup is None:
+        return {}
+    return _rollup.stats()
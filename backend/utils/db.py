@@ -0,0 +1,397 @@
+# utils/db.py - Pooled, request-scoped SQLite connections
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import g
+
+from utils import query_stats
+from utils.query_stats import InstrumentedConnection, current_route, route_context
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_PROFILE = 'balanced'
+DEFAULT_WRITE_BATCH = 64
+DEFAULT_WRITE_TIMEOUT = 30
+
+# Named storage profiles applied to every connection. cache_size is in
+# KiB when negative (SQLite convention), mmap_size is in bytes.
+STORAGE_PROFILES = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT'
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY'
+    },
+    'read-heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -128000,
+        'mmap_size': 512 * 1024 * 1024,
+        'temp_store': 'MEMORY'
+    }
+}
+
+
+def get_storage_profile(name=None):
+    """Resolve a profile name (or DB_PROFILE env var) to its pragmas"""
+    name = name or os.getenv('DB_PROFILE', DEFAULT_PROFILE)
+    if name not in STORAGE_PROFILES:
+        raise ValueError(
+            f"Unknown DB profile '{name}', expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+    return name, STORAGE_PROFILES[name]
+
+
+def apply_storage_profile(conn, profile, readonly=False):
+    """Apply a profile's pragmas to an open connection"""
+    _, pragmas = get_storage_profile(profile)
+    for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store'):
+        # The journal mode is a property of the file, only writers may change it
+        if readonly and pragma == 'journal_mode':
+            continue
+        conn.execute(f'PRAGMA {pragma} = {pragmas[pragma]}')
+
+
+def connect(database, profile=None, readonly=False):
+    """Open a new SQLite connection configured the way the app expects"""
+    if readonly:
+        uri = f'file:{os.path.abspath(database)}?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=InstrumentedConnection)
+    else:
+        conn = sqlite3.connect(database, check_same_thread=False, factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    apply_storage_profile(conn, profile, readonly=readonly)
+    return conn
+
+
+class ConnectionPool:
+    """Pool of reusable SQLite connections for one worker process.
+
+    Idle connections are kept in a LIFO queue so the most recently used
+    (warmest page cache) connection is handed out first. A connection is
+    only ever used by one thread at a time; it goes back to the pool when
+    the app context that borrowed it is torn down.
+    """
+
+    def __init__(self, database, size=DEFAULT_POOL_SIZE, profile=None, readonly=True):
+        self.database = database
+        self.size = size
+        self.readonly = readonly
+        self.profile, _ = get_storage_profile(profile)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Start with an empty pool owned by the current process"""
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.in_use = 0
+
+    def _check_pid(self):
+        # Connections must never be shared across a fork (gunicorn workers)
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def acquire(self):
+        """Borrow a connection, opening a new one if the pool is empty"""
+        self._check_pid()
+        try:
+            conn = self._idle.get_nowait()
+            hit = True
+        except queue.Empty:
+            conn = connect(self.database, self.profile, readonly=self.readonly)
+            hit = False
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.in_use += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding it if unusable"""
+        with self._lock:
+            self.in_use -= 1
+
+        if self._pid != os.getpid():
+            return
+
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (sqlite3.Error, queue.Full):
+            with self._lock:
+                self.discarded += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'database': self.database,
+                'profile': self.profile,
+                'readonly': self.readonly,
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'in_use': self.in_use,
+                'hits': self.hits,
+                'misses': self.misses,
+                'discarded': self.discarded,
+                'hit_ratio': (self.hits / requests) if requests else 0.0
+            }
+
+
+class WriteQueue:
+    """Single in-process writer that group-commits queued jobs.
+
+    A job is a callable taking the writer connection; whatever it returns
+    is handed back to the submitting thread. Jobs queued while a commit is
+    in flight are drained together and run in one BEGIN IMMEDIATE ...
+    COMMIT, each inside its own savepoint so a failing job only rolls back
+    its own statements. Jobs must not call commit() or rollback().
+    """
+
+    def __init__(self, database, profile=None, max_batch=DEFAULT_WRITE_BATCH):
+        self.database = database
+        self.max_batch = max_batch
+        self.profile, _ = get_storage_profile(profile)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self.batches = 0
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.reconnects = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.last_commit_ms = 0.0
+
+    def _ensure_started(self):
+        # Lazily (re)start the writer thread in the current process
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+            self._thread.start()
+
+    def submit(self, job):
+        """Queue a write job and return a Future for its result"""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((job, future, current_route()))
+        return future
+
+    def run(self, job, timeout=DEFAULT_WRITE_TIMEOUT):
+        """Queue a write job and wait for it to be committed"""
+        return self.submit(job).result(timeout)
+
+    def _connect(self):
+        conn = connect(self.database, self.profile)
+        # Transactions are managed explicitly below
+        conn.isolation_level = None
+        return conn
+
+    def _run(self):
+        # The thread must outlive any batch: if it died, every later
+        # execute_write would wait forever on its future
+        conn = None
+        work = self._queue
+
+        while True:
+            batch = [work.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(work.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None:
+                    conn = self._connect()
+                healthy = self._commit_batch(conn, batch)
+            except Exception as e:
+                self._fail(batch, e)
+                healthy = False
+            if not healthy and conn is not None:
+                # Reopen for the next batch rather than reuse a connection
+                # whose transaction state is unknown
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+                conn = None
+                with self._lock:
+                    self.reconnects += 1
+                print("⚠️  Database writer connection reset after a failed batch")
+
+    def _fail(self, batch, error):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+        with self._lock:
+            self.failed_jobs += len(batch)
+
+    @staticmethod
+    def _rollback(conn):
+        """Roll back a failed batch; False when the connection is unusable"""
+        try:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            return True
+        except sqlite3.Error as e:
+            print(f"❌ Database writer rollback failed: {str(e)}")
+            return False
+
+    def _commit_batch(self, conn, batch):
+        """Run one batch in a transaction; False when conn must be replaced"""
+        started = time.perf_counter()
+        results = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for job, future, route in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT job')
+                try:
+                    with route_context(route):
+                        result = job(conn)
+                    results.append((future, result, None))
+                    conn.execute('RELEASE job')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    results.append((future, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            healthy = self._rollback(conn)
+            self._fail(batch, e)
+            return healthy
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        with self._lock:
+            self.batches += 1
+            self.jobs += len(batch)
+            self.failed_jobs += sum(1 for _, _, error in results if error is not None)
+            self.last_batch_size = len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self.last_commit_ms = (time.perf_counter() - started) * 1000
+        return True
+
+    def stats(self):
+        """Snapshot of writer counters"""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'max_batch': self.max_batch,
+                'batches': self.batches,
+                'jobs': self.jobs,
+                'failed_jobs': self.failed_jobs,
+                'reconnects': self.reconnects,
+                'last_batch_size': self.last_batch_size,
+                'max_batch_seen': self.max_batch_seen,
+                'avg_batch_size': (self.jobs / self.batches) if self.batches else 0.0,
+                'last_commit_ms': round(self.last_commit_ms, 3)
+            }
+
+
+_pool = None
+_writer = None
+
+
+def init_app(app, database):
+    """Configure the read pool and writer once and register teardown"""
+    global _pool, _writer
+    size = int(app.config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+    profile = app.config.get('DB_PROFILE')
+    max_batch = int(app.config.get('DB_WRITE_BATCH', DEFAULT_WRITE_BATCH))
+    query_stats.configure(
+        enabled=app.config.get('SQL_STATS_ENABLED', True),
+        slow_query_ms=app.config.get('SLOW_QUERY_MS', query_stats.DEFAULT_SLOW_QUERY_MS)
+    )
+    _pool = ConnectionPool(database, size=size, profile=profile)
+    _writer = WriteQueue(database, profile=profile, max_batch=max_batch)
+    app.extensions['db_pool'] = _pool
+    app.extensions['db_writer'] = _writer
+    app.teardown_appcontext(close_db)
+    return _pool
+
+
+def get_db():
+    """Get the read-only connection bound to the current app context"""
+    if 'db' not in g:
+        g.db = _pool.acquire()
+    return g.db
+
+
+def close_db(exception=None):
+    """Release the app context connection back to the pool"""
+    db = g.pop('db', None)
+    if db is not None:
+        _pool.release(db)
+
+
+def execute_write(job, timeout=DEFAULT_WRITE_TIMEOUT):
+    """Run a write job on the single writer and return its result"""
+    return _writer.run(job, timeout)
+
+
+def submit_write(job):
+    """Queue a write job without waiting; returns a Future for its result"""
+    return _writer.submit(job)
+
+
+def pool_stats():
+    """Counters for the current process pool"""
+    if _pool is None:
+        return {}
+    return _pool.stats()
+
+
+def writer_stats():
+    """Counters for the current process writer"""
+    if _writer is None:
+        return {}
+    return _writer.stats()
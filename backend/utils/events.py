@@ -0,0 +1,216 @@
+# utils/events.py - Per-process change feed behind the streaming endpoints
+#
+# Streams subscribe to a (resource, user) pair from resource_versions, the
+# trigger-maintained counters that already back the ETags. One watcher
+# thread per process polls PRAGMA data_version on its own connection; that
+# value only moves when another connection commits (this worker's writer,
+# another worker, a CLI import), so a quiet database costs one PRAGMA per
+# poll however many streams are open. After a commit the watcher reads the
+# versions of the subscribed users in chunks and calls back the
+# subscriptions whose version moved. With no subscribers the thread parks.
+#
+# Writers in this process can call publish() after their commit to wake
+# the matching subscriptions at once instead of on the next poll; commits
+# from elsewhere are still picked up by polling.
+#
+# Callbacks run on the watcher thread and must not block: hand the version
+# to a queue.Queue or, from asyncio, loop.call_soon_threadsafe().
+
+import os
+import threading
+
+from utils.db import connect
+
+DEFAULT_POLL_SECONDS = 0.25
+MAX_IDS_PER_QUERY = 500
+
+
+class Subscription:
+    """One open stream waiting for a (resource, user) version change"""
+
+    __slots__ = ('resource', 'user_id', 'version', 'callback')
+
+    def __init__(self, resource, user_id, version, callback):
+        self.resource = resource
+        self.user_id = user_id
+        self.version = version
+        self.callback = callback
+
+
+class ChangeFeed:
+    """Watches resource_versions for the users with open streams"""
+
+    def __init__(self, database, profile=None, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.database = database
+        self.profile = profile
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Condition()
+        self._subscriptions = {}
+        self._dirty = set()
+        self._pid = None
+        self._thread = None
+        self.polls = 0
+        self.commits_seen = 0
+        self.version_reads = 0
+        self.notifications = 0
+        self.publishes = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        # Lazily (re)start the watcher thread in the current process
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._subscriptions = {}
+            self._dirty = set()
+            self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def subscribe(self, resource, user_id, version, callback):
+        """Call callback(new_version) whenever the resource moves past version"""
+        self._ensure_started()
+        subscription = Subscription(resource, user_id, version, callback)
+        key = (resource, user_id)
+        with self._lock:
+            self._subscriptions.setdefault(key, set()).add(subscription)
+            # Re-read this key on the next poll in case a commit landed
+            # between the caller reading version and subscribing
+            self._dirty.add(key)
+            self._lock.notify()
+        return subscription
+
+    def publish(self, resource, user_id):
+        """Re-read (resource, user_id) now; call after committing a change to it"""
+        key = (resource, user_id)
+        with self._lock:
+            self.publishes += 1
+            if key in self._subscriptions:
+                self._dirty.add(key)
+                self._lock.notify()
+
+    def unsubscribe(self, subscription):
+        key = (subscription.resource, subscription.user_id)
+        with self._lock:
+            subscriptions = self._subscriptions.get(key)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[key]
+
+    def _run(self):
+        conn = connect(self.database, self.profile)
+        data_version = None
+
+        while True:
+            with self._lock:
+                while not self._subscriptions:
+                    self._lock.wait()
+                dirty = self._dirty
+                self._dirty = set()
+
+            try:
+                self.polls += 1
+                current = conn.execute('PRAGMA data_version').fetchone()[0]
+                if current != data_version:
+                    data_version = current
+                    self.commits_seen += 1
+                    with self._lock:
+                        keys = list(self._subscriptions)
+                else:
+                    keys = list(dirty)
+                if keys:
+                    self._check(conn, keys)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Change feed error: {str(e)}")
+
+            with self._lock:
+                # publish() cuts the wait short
+                if not self._dirty:
+                    self._lock.wait(self.poll_seconds)
+
+    def _check(self, conn, keys):
+        by_resource = {}
+        for resource, user_id in keys:
+            by_resource.setdefault(resource, []).append(user_id)
+
+        versions = {}
+        for resource, user_ids in by_resource.items():
+            for start in range(0, len(user_ids), MAX_IDS_PER_QUERY):
+                chunk = user_ids[start:start + MAX_IDS_PER_QUERY]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'''SELECT user_id, version FROM resource_versions
+                        WHERE resource = ? AND user_id IN ({placeholders})''',
+                    [resource, *chunk]
+                ).fetchall()
+                self.version_reads += 1
+                found = {row['user_id']: row['version'] for row in rows}
+                for user_id in chunk:
+                    # No row yet means nothing was ever written: version 0
+                    versions[(resource, user_id)] = found.get(user_id, 0)
+
+        wake = []
+        with self._lock:
+            for key, version in versions.items():
+                for subscription in self._subscriptions.get(key, ()):
+                    if subscription.version != version:
+                        subscription.version = version
+                        wake.append((subscription.callback, version))
+
+        for callback, version in wake:
+            self.notifications += 1
+            callback(version)
+
+    def stats(self):
+        """Snapshot of watcher counters"""
+        with self._lock:
+            return {
+                'poll_seconds': self.poll_seconds,
+                'subscriptions': sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+                'watched_keys': len(self._subscriptions),
+                'polls': self.polls,
+                'commits_seen': self.commits_seen,
+                'version_reads': self.version_reads,
+                'notifications': self.notifications,
+                'publishes': self.publishes,
+                'errors': self.errors
+            }
+
+
+_feed = None
+
+
+def init_app(app, database):
+    """Configure the feed from DB_PROFILE / STREAM_POLL_SECONDS"""
+    global _feed
+    _feed = ChangeFeed(
+        database,
+        profile=app.config.get('DB_PROFILE'),
+        poll_seconds=float(app.config.get('STREAM_POLL_SECONDS', DEFAULT_POLL_SECONDS))
+    )
+    app.extensions['change_feed'] = _feed
+    return _feed
+
+
+def subscribe(resource, user_id, version, callback):
+    return _feed.subscribe(resource, user_id, version, callback)
+
+
+def unsubscribe(subscription):
+    _feed.unsubscribe(subscription)
+
+
+def publish(resource, user_id):
+    if _feed is not None:
+        _feed.publish(resource, user_id)
+
+
+def feed_stats():
+    """Counters for the current process feed"""
+    if _feed is None:
+        return {}
+    return _feed.stats()
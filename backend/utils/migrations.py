@@ -0,0 +1,73 @@
+# utils/migrations.py - Versioned schema migrations keyed on PRAGMA user_version
+#
+# Each file in backend/migrations is named NNNN_description.sql and is
+# applied once, in order, inside its own transaction. The database records
+# the last applied number in PRAGMA user_version, so checking whether a
+# database is current is a single integer read.
+
+import os
+import re
+import time
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """List (version, name, path) for every migration file, in order"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+
+    versions = [version for version, _, _ in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration numbers must be contiguous from 0001, found {versions}")
+    return migrations
+
+
+MIGRATIONS = load_migrations()
+LATEST_VERSION = MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def schema_version(conn):
+    """Version of the last migration applied to this database"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def is_current(conn):
+    """True when no migrations are pending"""
+    return schema_version(conn) >= LATEST_VERSION
+
+
+def migrate(conn, target=LATEST_VERSION, verbose=True):
+    """Apply pending migrations and return [(version, name, milliseconds)]"""
+    current = schema_version(conn)
+    applied = []
+
+    for version, name, path in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+
+        with open(path) as f:
+            sql = f.read()
+
+        started = time.perf_counter()
+        try:
+            conn.executescript(
+                f"BEGIN IMMEDIATE;\n{sql}\nPRAGMA user_version = {version};\nCOMMIT;"
+            )
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if verbose:
+            print(f"   ✓ {version:04d}_{name} ({elapsed_ms:.1f} ms)")
+        applied.append((version, name, elapsed_ms))
+
+    return applied
@@ -0,0 +1,262 @@
+# utils/notification_queue.py - Durable out-of-band notification fan-out
+#
+# A request handler enqueues one notification_jobs row (migration 0013) in
+# its own write job, so the request commits once however many recipients
+# the notification has, and the job exists exactly when the change that
+# caused it does. Worker threads claim due jobs in batches through the
+# single writer and insert each job's notifications with one executemany;
+# marking the job done happens in the same transaction.
+#
+# Delivery is at least once: a job whose delivery fails is retried with
+# exponential backoff until NOTIFICATION_MAX_ATTEMPTS, and any redelivery
+# is harmless because every notification carries the job's idempotency
+# key and (user_id, idempotency_key) is unique. Enqueueing an existing key
+# is a no-op, so retried requests do not fan out twice either.
+
+import json
+import os
+import threading
+import time
+
+from utils import events
+from utils.db import execute_write
+
+DEFAULT_WORKERS = 1
+DEFAULT_BATCH = 200
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_SECONDS = 5.0
+DEFAULT_RETENTION_DAYS = 7
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def enqueue(conn, key, user_ids, type, message, sender_name=None, project_title=None, created_at=None):
+    """Queue a notification for user_ids inside a write job; False when key was already queued"""
+    now = time.time()
+    payload = {
+        'user_ids': sorted(set(int(user_id) for user_id in user_ids)),
+        'type': type,
+        'message': message,
+        'sender_name': sender_name,
+        'project_title': project_title,
+        'created_at': created_at
+    }
+    cursor = conn.execute(
+        '''INSERT INTO notification_jobs (idempotency_key, payload, status, attempts, enqueued_at, available_at)
+           VALUES (?, ?, 'pending', 0, ?, ?)
+           ON CONFLICT(idempotency_key) DO NOTHING''',
+        (key, json.dumps(payload, separators=(',', ':')), now, now)
+    )
+    return cursor.rowcount == 1
+
+
+def deliver(conn, key, payload):
+    """Insert one job's notifications; recipients that already have it or no longer exist are skipped"""
+    cursor = conn.executemany(
+        '''INSERT INTO notifications
+               (user_id, type, message, sender_name, project_title, is_read, created_at, idempotency_key)
+           SELECT id, ?, ?, ?, ?, 0, ?, ? FROM users WHERE id = ?
+           ON CONFLICT(user_id, idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING''',
+        [(payload['type'], payload['message'], payload['sender_name'], payload['project_title'],
+          payload['created_at'], key, user_id)
+         for user_id in payload['user_ids']]
+    )
+    return cursor.rowcount
+
+
+def process_job(conn, batch_size=DEFAULT_BATCH, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                retry_seconds=DEFAULT_RETRY_SECONDS):
+    """Writer job: deliver up to batch_size due jobs
+
+    Returns {'jobs', 'notifications', 'failed', 'recipients'}; recipients
+    are the users who got a notification, to wake their streams once the
+    transaction has committed.
+    """
+    now = time.time()
+    jobs = conn.execute(
+        '''SELECT id, idempotency_key, payload, attempts FROM notification_jobs
+           WHERE status = 'pending' AND available_at <= ?
+           ORDER BY available_at, id
+           LIMIT ?''',
+        (now, batch_size)
+    ).fetchall()
+
+    result = {'jobs': len(jobs), 'notifications': 0, 'failed': 0, 'recipients': set()}
+    for job in jobs:
+        # A bad job must not roll back the rest of the batch
+        conn.execute('SAVEPOINT notification_job')
+        try:
+            payload = json.loads(job['payload'])
+            result['notifications'] += deliver(conn, job['idempotency_key'], payload)
+            conn.execute(
+                '''UPDATE notification_jobs SET status = 'done', attempts = attempts + 1, completed_at = ?
+                   WHERE id = ?''',
+                (now, job['id'])
+            )
+            conn.execute('RELEASE notification_job')
+            result['recipients'].update(payload['user_ids'])
+        except Exception as e:
+            conn.execute('ROLLBACK TO notification_job')
+            conn.execute('RELEASE notification_job')
+            attempts = job['attempts'] + 1
+            failed = attempts >= max_attempts
+            conn.execute(
+                '''UPDATE notification_jobs SET status = ?, attempts = ?, available_at = ?, last_error = ?
+                   WHERE id = ?''',
+                ('failed' if failed else 'pending', attempts,
+                 now + retry_seconds * 2 ** (attempts - 1), str(e)[:500], job['id'])
+            )
+            result['failed'] += failed
+            print(f"❌ Notification job {job['idempotency_key']} attempt {attempts} failed: {str(e)}")
+    return result
+
+
+def prune_job(conn, retention_days=DEFAULT_RETENTION_DAYS):
+    """Writer job: forget delivered jobs older than the idempotency window"""
+    return conn.execute(
+        "DELETE FROM notification_jobs WHERE status = 'done' AND available_at < ?",
+        (time.time() - retention_days * 86400,)
+    ).rowcount
+
+
+def queue_stats(db):
+    """Backlog and lag of the job table, shared by every worker"""
+    now = time.time()
+    pending, oldest = db.execute(
+        "SELECT COUNT(*), MIN(available_at) FROM notification_jobs WHERE status = 'pending'"
+    ).fetchone()
+    due = db.execute(
+        "SELECT COUNT(*) FROM notification_jobs WHERE status = 'pending' AND available_at <= ?",
+        (now,)
+    ).fetchone()[0]
+    failed = db.execute(
+        "SELECT COUNT(*) FROM notification_jobs WHERE status = 'failed'"
+    ).fetchone()[0]
+    return {
+        'pending': pending,
+        'due': due,
+        'failed': failed,
+        # How long the oldest due job has been waiting to be claimed
+        'lag_seconds': round(max(0.0, now - oldest), 3) if oldest is not None else 0.0
+    }
+
+
+class NotificationQueue:
+    """Worker threads that drain notification_jobs through the single writer"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH, poll_seconds=DEFAULT_POLL_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retention_days=DEFAULT_RETENTION_DAYS):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._threads = []
+        self._pruned_at = 0.0
+        self.runs = 0
+        self.jobs = 0
+        self.notifications = 0
+        self.failed = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.last_run_ms = 0.0
+
+    def ensure_started(self):
+        # Lazily (re)start the workers in the current process
+        if self.workers <= 0 or (self._pid == os.getpid() and self._threads):
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._wake = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'notification-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def wake(self):
+        """Deliver now instead of at the next poll; call after enqueueing"""
+        self.ensure_started()
+        self._wake.set()
+
+    def run_once(self):
+        """Deliver one batch; returns the number of jobs claimed"""
+        started = time.perf_counter()
+        result = execute_write(lambda conn: process_job(conn, self.batch_size, self.max_attempts))
+        for user_id in result['recipients']:
+            events.publish('notifications', user_id)
+        with self._lock:
+            self.runs += 1
+            self.jobs += result['jobs']
+            self.notifications += result['notifications']
+            self.failed += result['failed']
+            self.last_batch_size = result['jobs']
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+        return result['jobs']
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+            try:
+                while self.run_once() == self.batch_size:
+                    pass
+                if time.time() - self._pruned_at > PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.time()
+                    execute_write(lambda conn: prune_job(conn, self.retention_days))
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Notification queue error: {str(e)}")
+
+    def stats(self):
+        """Snapshot of worker counters"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'batch_size': self.batch_size,
+                'poll_seconds': self.poll_seconds,
+                'running': bool(self._threads) and self._pid == os.getpid(),
+                'runs': self.runs,
+                'jobs': self.jobs,
+                'notifications': self.notifications,
+                'failed': self.failed,
+                'errors': self.errors,
+                'last_batch_size': self.last_batch_size,
+                'last_run_ms': round(self.last_run_ms, 3)
+            }
+
+
+_queue = None
+
+
+def init_app(app):
+    """Configure the workers and start them with the first request in each process"""
+    global _queue
+    _queue = NotificationQueue(
+        workers=int(app.config.get('NOTIFICATION_WORKERS', DEFAULT_WORKERS)),
+        batch_size=int(app.config.get('NOTIFICATION_BATCH', DEFAULT_BATCH)),
+        poll_seconds=float(app.config.get('NOTIFICATION_POLL_SECONDS', DEFAULT_POLL_SECONDS)),
+        max_attempts=int(app.config.get('NOTIFICATION_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+        retention_days=float(app.config.get('NOTIFICATION_RETENTION_DAYS', DEFAULT_RETENTION_DAYS))
+    )
+    app.extensions['notification_queue'] = _queue
+    app.before_request(_queue.ensure_started)
+    return _queue
+
+
+def wake():
+    if _queue is not None:
+        _queue.wake()
+
+
+def worker_stats():
+    """Counters for the current process workers"""
+    if _queue is None:
+        return {}
+    return _queue.stats()
@@ -0,0 +1,458 @@
+# utils/org_analytics.py - Batch institution / department analytics snapshots
+#
+# Live GROUP BYs over users, projects and reviews for every institution
+# would hold a read transaction for seconds and spike CPU on each admin
+# page load. Instead a batch job reads the tables in id-ordered chunks
+# (keyset pagination, one consistent read transaction), aggregates each
+# chunk, and writes the results once as an immutable snapshot (migration
+# 0011). GET /api/analytics/org serves the latest snapshot from a small
+# per-process cache keyed by snapshot id.
+#
+# Aggregation is vectorized with NumPy/pandas when they are installed
+# (engine 'pandas') and done with plain dicts otherwise (engine 'python');
+# both produce identical rows. build_org_snapshot.py --compare checks that.
+
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = pd = None
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_ACTIVE_DAYS = 30
+DEFAULT_KEEP = 30
+DEFAULT_CACHE_ENTRIES = 256
+TOP_SKILLS = 10
+# Engines add ratings in different orders; rounding hides the float noise
+RATING_DIGITS = 6
+UNKNOWN = 'Unknown'
+ENGINES = ('auto', 'pandas', 'python')
+
+# Chunk queries walk the primary key: (last id, chunk size) -> the next rows.
+# Labels are normalized here so both engines group identically.
+USERS_SQL = f'''
+    SELECT id, coalesce(nullif(trim(institution), ''), '{UNKNOWN}'),
+           coalesce(nullif(trim(department), ''), '{UNKNOWN}'), skills
+    FROM users WHERE id > ? ORDER BY id LIMIT ?'''
+PROJECTS_SQL = '''
+    SELECT id, user_id, status IS 'completed'
+    FROM projects WHERE id > ? ORDER BY id LIMIT ?'''
+REVIEWS_SQL = '''
+    SELECT id, reviewee_id, rating
+    FROM reviews WHERE id > ? AND rating IS NOT NULL ORDER BY id LIMIT ?'''
+# Buckets in the activity window, read from the (day, user_id) index of
+# migration 0011; owners repeat once per active day and are deduplicated
+# by the caller (DISTINCT would walk the whole table in user order)
+ACTIVE_SQL = 'SELECT user_id FROM project_activity_daily WHERE day >= ?'
+
+
+def available_engines():
+    return ('pandas', 'python') if pd is not None else ('python',)
+
+
+def resolve_engine(engine):
+    """'auto' -> pandas when installed, else python; ValueError for unavailable engines"""
+    if engine == 'auto':
+        return available_engines()[0]
+    if engine not in available_engines():
+        raise ValueError(f'Analytics engine not available: {engine}')
+    return engine
+
+
+def _skills(value):
+    # Each skill counts once per user, however often it is listed
+    return dict.fromkeys(skill.strip() for skill in (value or '').split(',') if skill.strip())
+
+
+class _Groups:
+    """(institution, department) -> dense group id"""
+
+    def __init__(self):
+        self.ids = {}
+        self.keys = []
+
+    def get(self, institution, department):
+        key = (institution, department)
+        gid = self.ids.get(key)
+        if gid is None:
+            gid = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return gid
+
+
+class _PythonAccumulator:
+    """Plain-dict aggregation, used when NumPy/pandas are not installed"""
+
+    def __init__(self):
+        self.groups = _Groups()
+        self.user_group = {}
+        self.users = Counter()
+        self.active = Counter()
+        self.projects = Counter()
+        self.completed = Counter()
+        self.reviews = Counter()
+        self.rating_sum = Counter()
+        self.skills = {}
+
+    def add_users(self, rows):
+        for user_id, institution, department, skills in rows:
+            gid = self.groups.get(institution, department)
+            self.user_group[user_id] = gid
+            self.users[gid] += 1
+            counts = self.skills.setdefault(gid, Counter())
+            for skill in _skills(skills):
+                counts[skill] += 1
+
+    def add_projects(self, rows):
+        for _, user_id, done in rows:
+            gid = self.user_group.get(user_id)
+            if gid is not None:
+                self.projects[gid] += 1
+                self.completed[gid] += done
+
+    def add_reviews(self, rows):
+        for _, user_id, rating in rows:
+            gid = self.user_group.get(user_id)
+            if gid is not None:
+                self.reviews[gid] += 1
+                self.rating_sum[gid] += rating
+
+    def add_active(self, user_ids):
+        for user_id in user_ids:
+            gid = self.user_group.get(user_id)
+            if gid is not None:
+                self.active[gid] += 1
+
+    def totals(self):
+        """[(institution, department, counters, skill Counter)] per group"""
+        return [
+            (institution, department, {
+                'users': self.users[gid],
+                'active_users': self.active[gid],
+                'projects': self.projects[gid],
+                'completed': self.completed[gid],
+                'reviews': self.reviews[gid],
+                'rating_sum': self.rating_sum[gid]
+            }, self.skills.get(gid, Counter()))
+            for gid, (institution, department) in enumerate(self.groups.keys)
+        ]
+
+
+class _PandasAccumulator:
+    """NumPy/pandas aggregation: per chunk, user ids map to group ids via an
+    array lookup and counters are summed with bincount"""
+
+    COUNTERS = ('users', 'active_users', 'projects', 'completed', 'reviews', 'rating_sum')
+    # Ratings may be fractional; everything else is a count
+    FLOAT_COUNTERS = ('rating_sum',)
+
+    def __init__(self):
+        self.groups = _Groups()
+        self.user_group = np.full(1024, -1, dtype=np.int64)
+        self.counts = {name: np.zeros(0, dtype=self._dtype(name)) for name in self.COUNTERS}
+        self.skills = {}
+
+    def _dtype(self, name):
+        return np.float64 if name in self.FLOAT_COUNTERS else np.int64
+
+    def _add(self, name, gids, weights=None):
+        n = len(self.groups.keys)
+        dtype = self._dtype(name)
+        current = self.counts[name]
+        if len(current) < n:
+            current = np.concatenate([current, np.zeros(n - len(current), dtype=dtype)])
+        binned = np.bincount(gids, weights=weights, minlength=n)
+        self.counts[name] = current + binned.astype(dtype)
+
+    def _lookup(self, user_ids):
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        gids = np.full(len(user_ids), -1, dtype=np.int64)
+        known = user_ids < len(self.user_group)
+        gids[known] = self.user_group[user_ids[known]]
+        return gids
+
+    def add_users(self, rows):
+        frame = pd.DataFrame.from_records(rows, columns=['id', 'institution', 'department', 'skills'])
+        codes, uniques = pd.MultiIndex.from_arrays([frame['institution'], frame['department']]).factorize()
+        mapping = np.array([self.groups.get(institution, department) for institution, department in uniques],
+                           dtype=np.int64)
+        gids = mapping[codes]
+
+        ids = frame['id'].to_numpy(dtype=np.int64)
+        if ids.max() >= len(self.user_group):
+            grown = np.full(max(ids.max() + 1, len(self.user_group) * 2), -1, dtype=np.int64)
+            grown[:len(self.user_group)] = self.user_group
+            self.user_group = grown
+        self.user_group[ids] = gids
+        self._add('users', gids)
+
+        listed = frame['skills'].fillna('').str.strip().str.split(r'\s*,\s*', regex=True)
+        skills = pd.DataFrame({'uid': ids, 'gid': gids, 'skill': listed}).explode('skill')
+        skills = skills[skills['skill'] != ''].drop_duplicates(['uid', 'skill'])
+        for (gid, skill), count in skills.groupby(['gid', 'skill']).size().items():
+            self.skills.setdefault(int(gid), Counter())[skill] += int(count)
+
+    def add_projects(self, rows):
+        data = np.asarray(rows, dtype=np.int64).reshape(-1, 3)
+        gids = self._lookup(data[:, 1])
+        known = gids >= 0
+        self._add('projects', gids[known])
+        self._add('completed', gids[known], data[known, 2])
+
+    def add_reviews(self, rows):
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        gids = self._lookup(data[:, 1].astype(np.int64))
+        known = gids >= 0
+        self._add('reviews', gids[known])
+        self._add('rating_sum', gids[known], data[known, 2])
+
+    def add_active(self, user_ids):
+        gids = self._lookup(user_ids)
+        self._add('active_users', gids[gids >= 0])
+
+    def totals(self):
+        for name in self.COUNTERS:
+            self._add(name, np.zeros(0, dtype=np.int64))
+        return [
+            (institution, department,
+             {name: self.counts[name][gid].item() for name in self.COUNTERS},
+             self.skills.get(gid, Counter()))
+            for gid, (institution, department) in enumerate(self.groups.keys)
+        ]
+
+
+def _chunks(conn, sql, chunk_size):
+    # Keyset pagination on the first column (the table's id); tuples, not Rows
+    last_id = 0
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    while True:
+        rows = cursor.execute(sql, (last_id, chunk_size)).fetchall()
+        if rows:
+            yield rows
+            last_id = rows[-1][0]
+        if len(rows) < chunk_size:
+            return
+
+
+def _read(conn, accumulator, chunk_size, active_since):
+    """Stream the source tables into the accumulator; returns row counts"""
+    counts = {'users': 0, 'projects': 0, 'reviews': 0}
+    for rows in _chunks(conn, USERS_SQL, chunk_size):
+        accumulator.add_users(rows)
+        counts['users'] += len(rows)
+    for rows in _chunks(conn, PROJECTS_SQL, chunk_size):
+        accumulator.add_projects(rows)
+        counts['projects'] += len(rows)
+    for rows in _chunks(conn, REVIEWS_SQL, chunk_size):
+        accumulator.add_reviews(rows)
+        counts['reviews'] += len(rows)
+    active = conn.execute(ACTIVE_SQL, (active_since,)).fetchall()
+    accumulator.add_active(sorted({row[0] for row in active}))
+    return counts
+
+
+def _rows(totals):
+    """Department rows plus one summed row per institution, sorted"""
+    institutions = {}
+    rows = []
+    for institution, department, counters, skills in totals:
+        rows.append(('department', institution, department, counters, skills))
+        summed = institutions.setdefault(institution, ({key: 0 for key in counters}, Counter()))
+        for key, value in counters.items():
+            summed[0][key] += value
+        summed[1].update(skills)
+    for institution, (counters, skills) in institutions.items():
+        rows.append(('institution', institution, None, counters, skills))
+    rows.sort(key=lambda row: (row[1], row[0] != 'institution', row[2] or ''))
+    return [
+        {
+            'scope': scope,
+            'institution': institution,
+            'department': department,
+            **counters,
+            'rating_sum': round(float(counters['rating_sum']), RATING_DIGITS),
+            # Ties broken by name so both engines agree
+            'top_skills': sorted(skills.items(), key=lambda item: (-item[1], item[0]))[:TOP_SKILLS]
+        }
+        for scope, institution, department, counters, skills in rows
+    ]
+
+
+def build_snapshot(conn, engine='auto', chunk_size=DEFAULT_CHUNK_SIZE, active_days=DEFAULT_ACTIVE_DAYS, today=None):
+    """Aggregate the whole database; returns (meta, rows) ready for save_snapshot_job"""
+    engine = resolve_engine(engine)
+    active_since = ((today or date.today()) - timedelta(days=active_days)).isoformat()
+    accumulator = _PandasAccumulator() if engine == 'pandas' else _PythonAccumulator()
+
+    started = time.perf_counter()
+    # One read transaction so every chunk sees the same database state
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute('BEGIN')
+    try:
+        counts = _read(conn, accumulator, chunk_size, active_since)
+    finally:
+        if own_transaction:
+            conn.execute('ROLLBACK')
+    rows = _rows(accumulator.totals())
+    build_ms = (time.perf_counter() - started) * 1000
+
+    meta = {
+        'created_at': datetime.now().isoformat(),
+        'engine': engine,
+        'build_ms': round(build_ms, 3),
+        'active_days': active_days,
+        **counts
+    }
+    return meta, rows
+
+
+def save_snapshot_job(meta, rows, keep=DEFAULT_KEEP):
+    """Writer job that stores a snapshot and prunes all but the newest `keep`"""
+    def job(conn):
+        snapshot_id = conn.execute(
+            '''INSERT INTO org_analytics_snapshots
+                   (created_at, engine, build_ms, users, projects, reviews, active_days)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (meta['created_at'], meta['engine'], meta['build_ms'], meta['users'],
+             meta['projects'], meta['reviews'], meta['active_days'])
+        ).lastrowid
+        conn.executemany(
+            '''INSERT INTO org_analytics_rows
+                   (snapshot_id, scope, institution, department, users, active_users,
+                    projects, completed, reviews, rating_sum, top_skills)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            [(snapshot_id, row['scope'], row['institution'], row['department'], row['users'],
+              row['active_users'], row['projects'], row['completed'], row['reviews'],
+              row['rating_sum'], json.dumps(row['top_skills']))
+             for row in rows]
+        )
+        if keep > 0:
+            # AUTOINCREMENT ids only grow, so the newest `keep` are the ids above this
+            conn.execute('DELETE FROM org_analytics_rows WHERE snapshot_id <= ?', (snapshot_id - keep,))
+            conn.execute('DELETE FROM org_analytics_snapshots WHERE id <= ?', (snapshot_id - keep,))
+        return snapshot_id
+    return job
+
+
+def latest_snapshot(db):
+    """Newest snapshot header, or None before the first build"""
+    row = db.execute(
+        '''SELECT id, created_at, engine, build_ms, users, projects, reviews, active_days
+           FROM org_analytics_snapshots
+           WHERE id = (SELECT MAX(id) FROM org_analytics_snapshots)'''
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def _shape(row):
+    users = row['users']
+    return {
+        'institution': row['institution'],
+        'department': row['department'],
+        'users': users,
+        'activeUsers': row['active_users'],
+        'activeRate': round(row['active_users'] / users * 100, 1) if users else 0,
+        'projects': row['projects'],
+        'completed': row['completed'],
+        'completionRate': round(row['completed'] / row['projects'] * 100, 1) if row['projects'] else 0,
+        'reviews': row['reviews'],
+        'avgRating': round(row['rating_sum'] / row['reviews'], 2) if row['reviews'] else None,
+        'topSkills': [{'skill': skill, 'count': count} for skill, count in json.loads(row['top_skills'])]
+    }
+
+
+def load_org(db, snapshot, institution=None):
+    """Payload for GET /api/analytics/org: institutions, or one institution's departments"""
+    if institution is None:
+        rows = db.execute(
+            '''SELECT * FROM org_analytics_rows
+               WHERE snapshot_id = ? AND scope = 'institution'
+               ORDER BY institution''',
+            (snapshot['id'],)
+        ).fetchall()
+        return {'snapshot': snapshot, 'institutions': [_shape(row) for row in rows]}
+
+    summary = db.execute(
+        '''SELECT * FROM org_analytics_rows
+           WHERE snapshot_id = ? AND scope = 'institution' AND institution = ?''',
+        (snapshot['id'], institution)
+    ).fetchone()
+    if summary is None:
+        return None
+    rows = db.execute(
+        '''SELECT * FROM org_analytics_rows
+           WHERE snapshot_id = ? AND scope = 'department' AND institution = ?
+           ORDER BY department''',
+        (snapshot['id'], institution)
+    ).fetchall()
+    return {'snapshot': snapshot, 'institution': _shape(summary), 'departments': [_shape(row) for row in rows]}
+
+
+class SnapshotCache:
+    """Per-process LRU of shaped payloads keyed by (snapshot id, institution)
+
+    Snapshots never change, so entries never go stale; a new snapshot id
+    simply misses.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0
+            }
+
+
+_cache = SnapshotCache()
+
+
+def init_app(app):
+    """Check ORG_ANALYTICS_ENGINE is usable and size the snapshot cache"""
+    global _cache
+    resolve_engine(app.config.get('ORG_ANALYTICS_ENGINE', 'auto'))
+    _cache = SnapshotCache(int(app.config.get('ORG_ANALYTICS_CACHE_ENTRIES', DEFAULT_CACHE_ENTRIES)))
+    app.extensions['org_analytics'] = _cache
+    return _cache
+
+
+def cached_org(db, snapshot, institution=None):
+    """load_org through the per-process snapshot cache"""
+    return _cache.get((snapshot['id'], institution), lambda: load_org(db, snapshot, institution))
+
+
+def cache_stats():
+    return _cache.stats()
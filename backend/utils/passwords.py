@@ -0,0 +1,172 @@
+# utils/passwords.py - bcrypt hashing on a bounded process pool
+#
+# Hashing and verification each burn a few hundred milliseconds of CPU, so
+# they run in worker processes instead of the request thread. The number of
+# calls waiting on the pool is capped; past the cap callers get
+# PasswordHasherBusy straight away (the routes turn it into a 503) rather
+# than queueing behind a login storm. Hashes carry their cost factor, so a
+# stored hash made at a different cost than BCRYPT_LOG_ROUNDS can be
+# replaced after the next successful login.
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+DEFAULT_TIMEOUT = 30
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def hash_many(passwords, rounds):
+    """Hash a list of passwords in one worker call (bulk import)"""
+    return [_hash(password, rounds) for password in passwords]
+
+
+def hash_rounds(hashed):
+    """Cost factor stored in a $2b$NN$... hash, or None if unparseable"""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Process pool for bcrypt with a cap on calls in flight
+
+    Workers are started with the spawn method so forked request threads
+    and the SQLite writer never leak into them, and the pool is created
+    lazily per process so forked server workers each get their own.
+    """
+
+    def __init__(self, rounds=DEFAULT_LOG_ROUNDS, workers=None, max_pending=None):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+
+    def _get_executor(self):
+        if self._pid == os.getpid() and self._executor is not None:
+            return self._executor
+        with self._lock:
+            if self._pid != os.getpid() or self._executor is None:
+                self._pid = os.getpid()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self.pending = 0
+            return self._executor
+
+    def submit(self, func, *args):
+        """Queue work on the pool and return a Future, or raise PasswordHasherBusy"""
+        executor = self._get_executor()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy('Password hashing queue is full')
+            self.pending += 1
+        started = time.perf_counter()
+
+        def done(_):
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.total_ms += (time.perf_counter() - started) * 1000
+
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(done)
+        return future
+
+    def hash_async(self, password):
+        """Future for a new hash at the configured cost"""
+        return self.submit(_hash, password, self.rounds)
+
+    def hash(self, password, timeout=DEFAULT_TIMEOUT):
+        return self.hash_async(password).result(timeout)
+
+    def check(self, hashed, password, timeout=DEFAULT_TIMEOUT):
+        return self.submit(_check, hashed, password).result(timeout)
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash was made at a different cost"""
+        return hash_rounds(hashed) != self.rounds
+
+    def stats(self):
+        """Snapshot of hasher counters"""
+        with self._lock:
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_ms': round(self.total_ms / self.completed, 3) if self.completed else 0.0
+            }
+
+
+_hasher = None
+
+
+def init_app(app):
+    """Configure the hasher from BCRYPT_LOG_ROUNDS / PASSWORD_WORKERS / PASSWORD_MAX_PENDING"""
+    global _hasher
+    _hasher = PasswordHasher(
+        rounds=int(app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)),
+        workers=app.config.get('PASSWORD_WORKERS') or None,
+        max_pending=app.config.get('PASSWORD_MAX_PENDING') or None
+    )
+    app.extensions['password_hasher'] = _hasher
+    return _hasher
+
+
+def hash_password(password):
+    """bcrypt hash of a password at the configured cost"""
+    return _hasher.hash(password)
+
+
+def hash_password_async(password):
+    """Future for hash_password(), for work that should not block the request"""
+    return _hasher.hash_async(password)
+
+
+def check_password(hashed, password):
+    """True when the password matches the stored hash"""
+    return _hasher.check(hashed, password)
+
+
+def needs_rehash(hashed):
+    return _hasher.needs_rehash(hashed)
+
+
+def hasher_stats():
+    """Counters for the current process hasher"""
+    if _hasher is None:
+        return {}
+    return _hasher.stats()
@@ -0,0 +1,85 @@
+# utils/project_search.py - Full-text project search backed by projects_fts
+#
+# User input is never passed to FTS5 as query syntax: it is split into
+# words, each word is quoted and the terms are ANDed; the last word is a
+# prefix term, so "machine lear" finds "Machine Learning" while typing. The caller's
+# members:"u<id>" token is ANDed in as well (see migration 0008), so only
+# projects they own or are a member of are matched at all, and those are
+# ranked with bm25, weighting title matches above description matches.
+#
+# highlight() / snippet() mark matches with control characters; the text is
+# HTML-escaped afterwards and the markers become <mark> tags, so project
+# text can never inject markup into the results. bm25 weights are 10 for
+# the title, 1 for the description and 0 for members; snippets are up to 16 tokens.
+
+import html
+import re
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_TERMS = 8
+MIN_PREFIX = 2
+
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+SEARCH_SQL = '''
+    SELECT p.id, p.title, p.description, p.status, p.assignee, p.created_at, up.role,
+           highlight(projects_fts, 0, char(2), char(3)) AS title_highlight,
+           snippet(projects_fts, 1, char(2), char(3), '…', 16) AS snippet,
+           bm25(projects_fts, 10.0, 1.0, 0.0) AS rank
+    FROM projects_fts
+    JOIN projects p ON p.id = projects_fts.rowid
+    JOIN user_projects up ON up.user_id = ? AND up.project_id = projects_fts.rowid
+    WHERE projects_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?'''
+
+
+def build_match_query(text):
+    """Turn free text into ANDed FTS5 prefix terms, or None when there are no words"""
+    words = [word.lower() for word in _WORD.findall(text or '')[:MAX_TERMS]]
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    # Only the word being typed is a prefix; one-letter prefixes would match
+    # most of the index
+    if len(words[-1]) >= MIN_PREFIX:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def scoped_match(user_id, terms):
+    """Restrict terms to title/description and to projects the user can see"""
+    return f'members:"u{int(user_id)}" AND {{title description}}: ({terms})'
+
+
+def render_marks(text):
+    """HTML-escape highlighted text and turn the match markers into <mark> tags"""
+    if text is None:
+        return None
+    return html.escape(text).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_projects(db, user_id, text, limit=DEFAULT_LIMIT):
+    """Ranked matches among the projects a user can see"""
+    terms = build_match_query(text)
+    if terms is None:
+        return []
+    rows = db.execute(SEARCH_SQL, (user_id, scoped_match(user_id, terms), limit)).fetchall()
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'status': row['status'],
+            'assignee': row['assignee'],
+            'createdAt': row['created_at'],
+            'role': row['role'],
+            'titleHighlight': render_marks(row['title_highlight']),
+            'snippet': render_marks(row['snippet']),
+            'rank': round(row['rank'], 4)
+        }
+        for row in rows
+    ]
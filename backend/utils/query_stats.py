@@ -0,0 +1,212 @@
+# utils/query_stats.py - Per-statement SQL timing and slow-query log
+#
+# Connections opened by utils.db use InstrumentedConnection, whose cursors
+# time execute() plus every fetch and aggregate the result per (statement
+# fingerprint, calling route). Statements slower than the threshold are
+# printed and kept in a small ring buffer for the internal endpoint.
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+from flask import has_request_context, request
+
+DEFAULT_SLOW_QUERY_MS = 100.0
+SLOW_LOG_SIZE = 200
+
+settings = {
+    'enabled': True,
+    'slow_query_ms': DEFAULT_SLOW_QUERY_MS
+}
+
+_lock = threading.Lock()
+_stats = {}
+_slow_log = deque(maxlen=SLOW_LOG_SIZE)
+_local = threading.local()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def configure(enabled=True, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+    """Turn instrumentation on or off and set the slow-query threshold"""
+    settings['enabled'] = bool(enabled)
+    settings['slow_query_ms'] = float(slow_query_ms)
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Normalize a statement so calls with different literals aggregate together"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return _PLACEHOLDER_LIST.sub('(?...)', sql)
+
+
+@contextmanager
+def route_context(route):
+    """Attribute statements run by this thread to a route (used by the writer)"""
+    previous = getattr(_local, 'route', None)
+    _local.route = route
+    try:
+        yield
+    finally:
+        _local.route = previous
+
+
+def current_route():
+    """Name of the route running the current statement"""
+    route = getattr(_local, 'route', None)
+    if route:
+        return route
+    if has_request_context():
+        return request.endpoint or request.path
+    return threading.current_thread().name
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute(), fetches and iteration and counts returned rows"""
+
+    _entry = None
+    _elapsed_ms = 0.0
+    _logged = False
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._begin(sql, (time.perf_counter() - started) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._begin(sql, (time.perf_counter() - started) * 1000)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add((time.perf_counter() - started) * 1000, 0 if row is None else 1)
+        return row
+
+    def __next__(self):
+        # for row in cursor: counted like fetchone()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add((time.perf_counter() - started) * 1000, 0)
+            raise
+        self._add((time.perf_counter() - started) * 1000, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add((time.perf_counter() - started) * 1000, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add((time.perf_counter() - started) * 1000, len(rows))
+        return rows
+
+    def _begin(self, sql, elapsed_ms):
+        if not settings['enabled']:
+            self._entry = None
+            return
+        key = (fingerprint(sql), current_route())
+        # Writes report affected rows, reads count rows as they are fetched
+        rows = self.rowcount if self.description is None and self.rowcount > 0 else 0
+        with _lock:
+            entry = _stats.get(key)
+            if entry is None:
+                entry = _stats[key] = {
+                    'fingerprint': key[0],
+                    'route': key[1],
+                    'calls': 0,
+                    'rows': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0
+                }
+            entry['calls'] += 1
+            entry['rows'] += rows
+            entry['total_ms'] += elapsed_ms
+        self._entry = entry
+        self._elapsed_ms = elapsed_ms
+        self._logged = False
+        self._finish()
+
+    def _add(self, elapsed_ms, rows):
+        entry = self._entry
+        if entry is None:
+            return
+        self._elapsed_ms += elapsed_ms
+        with _lock:
+            entry['rows'] += rows
+            entry['total_ms'] += elapsed_ms
+        self._finish()
+
+    def _finish(self):
+        entry = self._entry
+        with _lock:
+            entry['max_ms'] = max(entry['max_ms'], self._elapsed_ms)
+        if not self._logged and self._elapsed_ms >= settings['slow_query_ms']:
+            self._logged = True
+            record = {
+                'fingerprint': entry['fingerprint'],
+                'route': entry['route'],
+                'duration_ms': round(self._elapsed_ms, 3),
+                'at': datetime.now().isoformat()
+            }
+            _slow_log.append(record)
+            print(f"🐢 Slow query ({record['duration_ms']} ms) in {record['route']}: {record['fingerprint']}")
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose shortcut execute methods use InstrumentedCursor"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def top_statements(limit=20, sort='total_ms'):
+    """Aggregates for the heaviest statements"""
+    with _lock:
+        entries = [dict(entry) for entry in _stats.values()]
+    for entry in entries:
+        entry['avg_ms'] = round(entry['total_ms'] / entry['calls'], 3) if entry['calls'] else 0.0
+        entry['total_ms'] = round(entry['total_ms'], 3)
+        entry['max_ms'] = round(entry['max_ms'], 3)
+    entries.sort(key=lambda entry: entry.get(sort, 0), reverse=True)
+    return entries[:limit]
+
+
+def slow_queries(limit=50):
+    """Most recent slow statements, newest first"""
+    with _lock:
+        records = list(_slow_log)
+    return records[::-1][:limit]
+
+
+def reset():
+    """Clear all aggregates and the slow-query log"""
+    with _lock:
+        _stats.clear()
+        _slow_log.clear()
@@ -0,0 +1,247 @@
+# utils/revocation.py - JWT revocation with an in-memory Bloom filter
+#
+# Revoked tokens live in the revoked_tokens table. Every worker mirrors the
+# revoked jtis into a Bloom filter, so the per-request check is a hash and
+# a few bit tests; SQLite is only asked to confirm a positive. Per-user
+# cutoffs from password changes are few and are mirrored exactly. Each
+# worker pulls rows added since the last id it saw at most once per
+# sync interval, so a revocation made by one worker reaches the others
+# within REVOCATION_SYNC_SECONDS. The revoking worker adds its keys at once.
+#
+# The JWT iat claim has one-second resolution, too coarse to tell a token
+# issued just before a password change from one issued just after it in
+# the same second. Every token therefore also carries issued_at in
+# fractional seconds, and user cutoffs are stored with the same precision.
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime
+
+from utils.db import get_db
+
+DEFAULT_CAPACITY = 100000
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_SYNC_SECONDS = 1.0
+
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+def user_key(user_id):
+    """Key revoking every token of a user issued before not_before"""
+    return f'user:{user_id}'
+
+
+def issued_at(payload):
+    """When a decoded token was issued, to sub-second precision if it says so"""
+    return payload.get(ISSUED_AT_CLAIM, payload.get('iat', 0))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RevocationList:
+    """Bloom filter (jtis) and cutoff map (users) kept in sync by row id"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE,
+                 sync_seconds=DEFAULT_SYNC_SECONDS, lifetime_seconds=None):
+        self.sync_seconds = sync_seconds
+        # Tokens live this long, so older cutoffs can no longer match
+        self.lifetime_seconds = lifetime_seconds
+        self._filter = BloomFilter(capacity, error_rate)
+        self._cutoffs = {}
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._synced_at = 0.0
+        self.checks = 0
+        self.filter_hits = 0
+        self.confirmed = 0
+        self.cutoff_hits = 0
+        self.rebuilds = 0
+
+    def sync(self, force=False):
+        """Load rows added since the last sync (one indexed range read)"""
+        if not force and time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        if not self._lock.acquire(blocking=force):
+            # Another thread is already syncing; the current filter is fine
+            return
+        try:
+            rows = get_db().execute(
+                'SELECT id, token_key, not_before FROM revoked_tokens WHERE id > ? ORDER BY id',
+                (self._last_id,)
+            ).fetchall()
+            bloom = self._filter
+            cutoffs = self._cutoffs
+            if bloom.count + len(rows) > bloom.capacity:
+                # Full: rebuild from scratch at twice the size (pruned rows drop out)
+                bloom = BloomFilter(bloom.capacity * 2, bloom.error_rate)
+                cutoffs = {}
+                rows = get_db().execute(
+                    'SELECT id, token_key, not_before FROM revoked_tokens WHERE id > 0 ORDER BY id'
+                ).fetchall()
+                self.rebuilds += 1
+            for row in rows:
+                self._add(bloom, cutoffs, row['token_key'], row['not_before'])
+                self._last_id = row['id']
+            if self.lifetime_seconds:
+                # Same horizon as _prune uses for the table
+                horizon = time.time() - self.lifetime_seconds
+                for key in [key for key, not_before in list(cutoffs.items()) if not_before < horizon]:
+                    del cutoffs[key]
+            self._filter = bloom
+            self._cutoffs = cutoffs
+            self._synced_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def _add(bloom, cutoffs, key, not_before):
+        if not_before is None:
+            bloom.add(key)
+        else:
+            cutoffs[key] = max(cutoffs.get(key, 0), not_before)
+
+    def remember(self, key, not_before=None):
+        """Add a key revoked by this worker without waiting for the next sync"""
+        self._add(self._filter, self._cutoffs, key, not_before)
+
+    def is_revoked(self, payload):
+        """True when a decoded token's jti or its user's cutoff is revoked"""
+        self.sync()
+        self.checks += 1
+        bloom = self._filter
+
+        jti = payload.get('jti')
+        if jti and jti in bloom:
+            self.filter_hits += 1
+            row = get_db().execute(
+                'SELECT 1 FROM revoked_tokens WHERE token_key = ? LIMIT 1',
+                (jti,)
+            ).fetchone()
+            if row:
+                self.confirmed += 1
+                return True
+
+        not_before = self._cutoffs.get(user_key(payload.get('sub')))
+        if not_before is not None and issued_at(payload) < not_before:
+            self.cutoff_hits += 1
+            return True
+
+        return False
+
+    def stats(self):
+        """Snapshot of filter and check counters"""
+        bloom = self._filter
+        return {
+            'keys': bloom.count,
+            'user_cutoffs': len(self._cutoffs),
+            'capacity': bloom.capacity,
+            'bits': bloom.size,
+            'hashes': bloom.hashes,
+            'last_id': self._last_id,
+            'checks': self.checks,
+            'filter_hits': self.filter_hits,
+            'confirmed': self.confirmed,
+            'false_positives': self.filter_hits - self.confirmed,
+            'cutoff_hits': self.cutoff_hits,
+            'rebuilds': self.rebuilds
+        }
+
+
+def _prune(conn, now):
+    # Rows whose tokens have expired can never match again
+    conn.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (now,))
+
+
+def revoke_token(conn, payload):
+    """Writer job: revoke one token by jti (logout)"""
+    now = int(time.time())
+    _prune(conn, now)
+    conn.execute(
+        '''INSERT INTO revoked_tokens (token_key, user_id, not_before, expires_at, revoked_at)
+           VALUES (?, ?, NULL, ?, ?)''',
+        (payload['jti'], payload['sub'], payload['exp'], datetime.now().isoformat())
+    )
+    return payload['jti'], None
+
+
+def revoke_user_tokens(conn, user_id, lifetime_seconds):
+    """Writer job: revoke every token of a user issued before now (password change)"""
+    now = time.time()
+    _prune(conn, int(now))
+    conn.execute(
+        '''INSERT INTO revoked_tokens (token_key, user_id, not_before, expires_at, revoked_at)
+           VALUES (?, ?, ?, ?, ?)''',
+        (user_key(user_id), user_id, now, int(now) + lifetime_seconds, datetime.now().isoformat())
+    )
+    return user_key(user_id), now
+
+
+_revocations = None
+
+
+def init_app(app, jwt):
+    """Configure the filter and register it as the JWT blocklist check"""
+    global _revocations
+    lifetime = app.config.get('JWT_ACCESS_TOKEN_EXPIRES')
+    _revocations = RevocationList(
+        capacity=int(app.config.get('REVOCATION_CAPACITY', DEFAULT_CAPACITY)),
+        sync_seconds=float(app.config.get('REVOCATION_SYNC_SECONDS', DEFAULT_SYNC_SECONDS)),
+        lifetime_seconds=lifetime.total_seconds() if lifetime else None
+    )
+    app.extensions['revocations'] = _revocations
+
+    @jwt.additional_claims_loader
+    def add_issued_at(identity):
+        return {ISSUED_AT_CLAIM: time.time()}
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return _revocations.is_revoked(jwt_payload)
+
+    return _revocations
+
+
+def is_revoked(payload):
+    """Check a decoded token outside a @jwt_required route"""
+    return _revocations.is_revoked(payload)
+
+
+def remember(key, not_before=None):
+    _revocations.remember(key, not_before)
+
+
+def revocation_stats():
+    """Counters for the current process filter"""
+    if _revocations is None:
+        return {}
+    return _revocations.stats()
@@ -0,0 +1,144 @@
+# utils/user_cache.py - Per-worker cache of the authenticated user's row
+#
+# Most @jwt_required routes only need the caller's own profile, which
+# changes rarely. Rows are loaded once per JWT identity and kept for a
+# short TTL in a bounded LRU. update_profile invalidates its entry
+# directly; other workers pick up the change when their copy expires, or
+# at once when the caller passes the profile version it just read.
+# The password hash is never cached.
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import get_jwt_identity
+
+from utils.db import get_db
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+USER_COLUMNS = ('id', 'full_name', 'email', 'institution', 'department', 'year',
+                'skills', 'linkedin_url', 'profile_pic', 'created_at')
+
+
+def load_user(user_id):
+    """Read a user's profile columns, or None if the user does not exist"""
+    row = get_db().execute(
+        '''SELECT id, full_name, email, institution, department, year,
+                  skills, linkedin_url, profile_pic, created_at
+           FROM users WHERE id = ?''',
+        (user_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+class UserCache:
+    """TTL + LRU map of user id -> profile dict"""
+
+    def __init__(self, loader=load_user, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id, version=None):
+        """Cached profile for a user, loading it on a miss or a version change"""
+        if self.ttl <= 0:
+            return self.loader(user_id)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires_at, cached_version, user = entry
+                if expires_at > now and (version is None or version == cached_version):
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return user
+                del self._entries[user_id]
+                self.expirations += 1
+            self.misses += 1
+
+        user = self.loader(user_id)
+        if user is None:
+            # Unknown ids are not cached so a later registration is seen at once
+            return None
+
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, version, user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return user
+
+    def invalidate(self, user_id):
+        """Drop a user's entry so the next read reloads it"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+_cache = None
+
+
+def init_app(app):
+    """Configure the cache from USER_CACHE_TTL / USER_CACHE_SIZE"""
+    global _cache
+    _cache = UserCache(
+        ttl=float(app.config.get('USER_CACHE_TTL', DEFAULT_TTL)),
+        max_entries=int(app.config.get('USER_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    )
+    app.extensions['user_cache'] = _cache
+    return _cache
+
+
+def get_user(user_id, version=None):
+    """Profile dict for any user id, through the cache"""
+    return _cache.get(user_id, version)
+
+
+def current_user():
+    """Profile dict for the JWT identity of the current request"""
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None
+    return _cache.get(user_id)
+
+
+def invalidate(user_id):
+    _cache.invalidate(user_id)
+
+
+def cache_stats():
+    """Counters for the current process cache"""
+    if _cache is None:
+        return {}
+    return _cache.stats()
@@ -0,0 +1,221 @@
+# utils/user_import.py - Streaming bulk user import from CSV
+#
+# Reads rows like backend/data/indian_students.csv (Name, Year, Interests,
+# Skills, plus optional Email and Department columns) one chunk at a time,
+# normalizes year and skill values to the forms the app stores, hashes the
+# initial passwords on the password hasher's process pool while the
+# previous chunk is being written, and inserts each chunk with one executemany in its own
+# transaction. Rows whose email already exists are skipped, so re-running
+# an import is harmless.
+#
+# Initial passwords are hashed at IMPORT_LOG_ROUNDS, which is cheap enough
+# for a whole institution; login rehashes them at BCRYPT_LOG_ROUNDS.
+
+import csv
+import re
+import time
+from datetime import datetime
+
+from utils.passwords import hash_many
+
+DEFAULT_CHUNK_SIZE = 1000
+IMPORT_LOG_ROUNDS = 4
+MAX_REPORTED_ERRORS = 20
+
+YEAR_WORDS = {'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5}
+YEAR_SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd'}
+
+# Lower-cased spellings -> the skill names used across the app
+SKILL_ALIASES = {
+    'ml': 'Machine Learning',
+    'ai/ml': 'Machine Learning',
+    'machine learning': 'Machine Learning',
+    'ui/ux': 'UI/UX Design',
+    'ui/ux design': 'UI/UX Design',
+    'ux': 'UI/UX Design',
+    'js': 'JavaScript',
+    'javascript': 'JavaScript',
+    'ts': 'TypeScript',
+    'typescript': 'TypeScript',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'node.js': 'Node.js',
+    'react': 'React',
+    'reactjs': 'React',
+    'python': 'Python',
+    'java': 'Java',
+    'sql': 'SQL',
+    'aws': 'AWS',
+    'iot': 'IoT',
+    'devops': 'DevOps',
+    'data science': 'Data Science',
+    'database': 'Database',
+    'databases': 'Database',
+    'frontend': 'Frontend',
+    'front-end': 'Frontend',
+    'backend': 'Backend',
+    'back-end': 'Backend',
+    'cloud': 'Cloud'
+}
+
+INSERT_USER_SQL = '''INSERT OR IGNORE INTO users
+    (full_name, email, password, institution, department, year, skills, linkedin_url, profile_pic, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, '', '', ?)'''
+
+_WHITESPACE = re.compile(r'\s+')
+_SKILL_SEPARATORS = re.compile(r'[,;|]')
+_YEAR_NUMBER = re.compile(r'(\d+)')
+_EMAIL_LOCAL = re.compile(r'[^a-z0-9]+')
+
+
+class ImportRowError(ValueError):
+    """A CSV row that cannot be imported"""
+
+
+def normalize_year(value):
+    """'4th', '4', 'fourth year', '4th Year' -> '4th Year'"""
+    text = _WHITESPACE.sub(' ', (value or '').strip().lower())
+    match = _YEAR_NUMBER.search(text)
+    if match:
+        number = int(match.group(1))
+    else:
+        number = YEAR_WORDS.get(text.split(' ')[0]) if text else None
+    if not number or number > 5:
+        raise ImportRowError(f'Unrecognized year: {value!r}')
+    return f"{number}{YEAR_SUFFIXES.get(number, 'th')} Year"
+
+
+def normalize_skills(*values):
+    """Split, trim and canonicalize skills; keep first-seen order without duplicates"""
+    skills = []
+    seen = set()
+    for value in values:
+        for raw in _SKILL_SEPARATORS.split(value or ''):
+            skill = _WHITESPACE.sub(' ', raw).strip()
+            if not skill:
+                continue
+            skill = SKILL_ALIASES.get(skill.lower(), skill)
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+    return skills
+
+
+def make_email(name, line_no, domain):
+    """Deterministic address for rows without an Email column"""
+    local = _EMAIL_LOCAL.sub('.', name.lower()).strip('.') or 'student'
+    return f'{local}.{line_no}@{domain}'
+
+
+def parse_rows(lines, institution, department=None, email_domain=None):
+    """Yield (line_no, row tuple without password) or (line_no, ImportRowError)"""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    # Header names are matched case-insensitively
+    columns = {name.strip().lower(): name for name in reader.fieldnames if name}
+    for required in ('name', 'year'):
+        if required not in columns:
+            raise ImportRowError(f'Missing column: {required.title()}')
+    if 'email' not in columns and not email_domain:
+        raise ImportRowError('CSV has no Email column; an email domain is required')
+
+    def get(record, column):
+        name = columns.get(column)
+        return (record.get(name) or '').strip() if name else ''
+
+    created_at = datetime.now().isoformat()
+    for record in reader:
+        line_no = reader.line_num
+        try:
+            name = _WHITESPACE.sub(' ', get(record, 'name'))
+            if not name:
+                raise ImportRowError('Missing name')
+            email = get(record, 'email').lower() or make_email(name, line_no, email_domain)
+            skills = normalize_skills(get(record, 'skills'), get(record, 'interests'))
+            yield line_no, (
+                name,
+                email,
+                institution,
+                get(record, 'department') or department or 'General',
+                normalize_year(get(record, 'year')),
+                ','.join(skills),
+                created_at
+            )
+        except ImportRowError as e:
+            yield line_no, e
+
+
+def _chunks(rows, size, report):
+    chunk = []
+    for line_no, row in rows:
+        if isinstance(row, ImportRowError):
+            report['invalid'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line_no, 'error': str(row)})
+            continue
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _submit_hashes(hasher, password, count, rounds):
+    # One task per worker so each process hashes a contiguous slice
+    per_worker = -(-count // hasher.workers)
+    return [
+        hasher.submit(hash_many, [password] * min(per_worker, count - start), rounds)
+        for start in range(0, count, per_worker)
+    ]
+
+
+def _insert_chunk(conn, chunk, hashes):
+    cursor = conn.executemany(
+        INSERT_USER_SQL,
+        [(name, email, hashed, institution, department, year, skills, created_at)
+         for (name, email, institution, department, year, skills, created_at), hashed in zip(chunk, hashes)]
+    )
+    return cursor.rowcount
+
+
+def _write(run_write, report, chunk, futures, progress=None, started=None):
+    hashes = [hashed for future in futures for hashed in future.result()]
+    inserted = run_write(lambda conn: _insert_chunk(conn, chunk, hashes))
+    report['rows'] += len(chunk)
+    report['inserted'] += inserted
+    report['skipped'] += len(chunk) - inserted
+    if progress is not None:
+        progress(report, time.perf_counter() - started)
+
+
+def import_users(lines, run_write, institution, password, hasher, department=None, email_domain=None,
+                 rounds=IMPORT_LOG_ROUNDS, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Stream CSV lines into users and return a report
+
+    run_write(job) must run job(conn) inside one transaction and return its
+    result (execute_write in the server, a plain connection in the CLI).
+    hasher is the PasswordHasher whose pool does the hashing; at most two
+    chunks are in flight on it, and a full queue raises PasswordHasherBusy
+    (chunks already written stay, and a re-run skips them).
+    """
+    report = {'rows': 0, 'inserted': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+    started = time.perf_counter()
+
+    rows = parse_rows(lines, institution, department, email_domain)
+    pending = None
+    for chunk in _chunks(rows, chunk_size, report):
+        # Hash this chunk while the previous one is written
+        futures = _submit_hashes(hasher, password, len(chunk), rounds)
+        if pending is not None:
+            _write(run_write, report, *pending, progress=progress, started=started)
+        pending = (chunk, futures)
+    if pending is not None:
+        _write(run_write, report, *pending, progress=progress, started=started)
+
+    elapsed = time.perf_counter() - started
+    report['seconds'] = round(elapsed, 3)
+    report['rows_per_second'] = round(report['rows'] / elapsed, 1) if elapsed else 0.0
+    return report
+
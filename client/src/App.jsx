@@ -3,7 +3,7 @@ import { Routes, Route, Navigate, useNavigate } from 'react-router-dom';
 import Home from './pages/Home';
 import Login from './pages/login';
 import Dashboard from './pages/Dashboard';
-import { getUserData, getAuthToken, removeAuthToken } from './utils/api';
+import { getUserData, getAuthToken, authAPI } from './utils/api';
 import './App.css';
 
 
@@ -41,8 +41,11 @@ function App() {
   /**
    * Handle user logout
    */
-  const handleLogout = () => {
-    removeAuthToken();
+  const handleLogout = async () => {
+    const result = await authAPI.logout();
+    if (!result.success) {
+      alert(`Logged out on this device, but the server could not revoke your session: ${result.error}`);
+    }
     setUserData(null);
     setIsAuthenticated(false);
     navigate('/');
@@ -11,14 +11,39 @@ const Analytics = () => {
   const [selectedMetric, setSelectedMetric] = useState('completion_rate');
   const [timeRange, setTimeRange] = useState('all');
 
-  // Fetch analytics data on component mount
+  // Fetch analytics data on component mount, then follow the server's change stream
   useEffect(() => {
     fetchAnalyticsData();
-    // Set up auto-refresh every 30 seconds
-    const interval = setInterval(fetchAnalyticsData, 30000);
-    return () => clearInterval(interval);
+
+    if (typeof EventSource === 'undefined') {
+      // No SSE support: fall back to refreshing every 30 seconds
+      const interval = setInterval(fetchAnalyticsData, 30000);
+      return () => clearInterval(interval);
+    }
+
+    let initial = true;
+    const source = analyticsAPI.stream((analytics) => {
+      setAnalyticsData(analytics);
+      // The first snapshot matches the fetch above; later ones mean projects changed
+      if (!initial) {
+        fetchProjects();
+      }
+      initial = false;
+    });
+    return () => source.close();
   }, []);
 
+  const fetchProjects = async () => {
+    try {
+      const projectsResponse = await projectAPI.getAll();
+      if (projectsResponse.success) {
+        setProjectsData(projectsResponse.projects || []);
+      }
+    } catch (err) {
+      console.error('❌ Projects Fetch Error:', err);
+    }
+  };
+
   const fetchAnalyticsData = async () => {
     try {
       setRefreshing(true);
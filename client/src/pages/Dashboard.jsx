@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Notification from '../components/Notification';
+import { notificationAPI } from '../utils/api';
 import Profile from '../components/Profile';
 import Analytics from './Analytics';
 import FindTeammates from './FindTeammates';
@@ -177,8 +178,35 @@ const Dashboard = ({ userData, onUpdateUserData, onLogout }) => {
     localStorage.setItem('notifications', JSON.stringify(notifications));
   }, [notifications]);
 
+  // Load notifications once, then receive new ones as they are created
+  useEffect(() => {
+    const addNew = (incoming) => {
+      setNotifications(nots => {
+        const known = new Set(nots.map(n => n.id));
+        const fresh = incoming.filter(n => !known.has(n.id));
+        return fresh.length ? [...fresh.reverse(), ...nots] : nots;
+      });
+    };
+
+    notificationAPI.getAll()
+      .then(response => {
+        if (response.success) {
+          addNew([...response.notifications].reverse());
+        }
+      })
+      .catch(err => console.error('❌ Notifications Fetch Error:', err));
+
+    if (typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    const source = notificationAPI.stream((notification) => addNew([notification]));
+    return () => source.close();
+  }, []);
+
   const handleMarkAsRead = (id) => {
     setNotifications(nots => nots.map(n => n.id === id ? { ...n, read: true } : n));
+    notificationAPI.markRead({ ids: [id] })
+      .catch(err => console.error('❌ Mark Read Error:', err));
   };
 
   const handleAccept = (id) => {
@@ -81,6 +81,58 @@ const apiRequest = async (endpoint, options = {}) => {
   }
 };
 
+const STREAM_RETRY_MS = 5000;
+
+/**
+ * Server-Sent Events stream: onMessage(data) for each `eventName` event.
+ * EventSource cannot send an Authorization header, so each connection takes a
+ * short-lived stream token from POST /stream-token. The browser's own retries
+ * resume with Last-Event-ID; once the token has expired and the stream closes,
+ * it reopens with a fresh token and passes the last id as `resumeParam`.
+ * Returns { close } for the caller.
+ */
+const openStream = (path, eventName, onMessage, resumeParam) => {
+  let source = null;
+  let timer = null;
+  let closed = false;
+  let lastEventId = "";
+
+  const connect = async () => {
+    let res;
+    try {
+      res = await apiRequest("/stream-token", { method: "POST" });
+    } catch {
+      res = { success: false };
+    }
+    if (closed) return;
+    if (!res.success) {
+      timer = setTimeout(connect, STREAM_RETRY_MS);
+      return;
+    }
+
+    const params = new URLSearchParams({ stream_token: res.token });
+    if (lastEventId) params.set(resumeParam, lastEventId);
+    source = new EventSource(`${API_BASE_URL}${path}?${params}`);
+    source.addEventListener(eventName, (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+      onMessage(JSON.parse(event.data));
+    });
+    source.onerror = () => {
+      if (source.readyState !== EventSource.CLOSED) return;
+      timer = setTimeout(connect, STREAM_RETRY_MS);
+    };
+  };
+
+  connect();
+  return {
+    close: () => {
+      closed = true;
+      clearTimeout(timer);
+      if (source) source.close();
+    },
+  };
+};
+
 // ==================== AUTH API ====================
 export const authAPI = {
   register: async (userData) => {
@@ -106,14 +158,47 @@ export const authAPI = {
     setUserData({ ...currentData, ...profileData });
     return res;
   },
-  logout: () => removeAuthToken(),
+  changePassword: async (passwordData) => {
+    const res = await apiRequest("/auth/password", { method: "PUT", body: JSON.stringify(passwordData) });
+    // Older tokens are revoked by the change; keep the one issued with it
+    if (res.token) {
+      setAuthToken(res.token);
+    }
+    return res;
+  },
+  logout: async () => {
+    // Revoke the token server-side before forgetting it locally
+    let res = { success: true };
+    if (getAuthToken()) {
+      // apiRequest sends Content-Type: application/json, so send a JSON body too
+      res = await apiRequest("/auth/logout", { method: "POST", body: JSON.stringify({}) })
+        .catch((error) => ({ success: false, error: error.message }));
+      if (!res.success) {
+        console.error("❌ Logout could not revoke the session token:", res.error);
+      }
+    }
+    removeAuthToken();
+    return res;
+  },
 };
 
 // ==================== PROJECT API ====================
 export const projectAPI = {
   getAll: () => apiRequest("/projects", { method: "GET" }),
+  // One keyset page: pass the previous response's nextCursor to continue
+  getPage: ({ limit = 50, cursor, status } = {}) => {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set("cursor", cursor);
+    if (status) params.set("status", status);
+    return apiRequest(`/projects?${params}`, { method: "GET" });
+  },
+  // Ranked full-text search; titleHighlight / snippet are escaped HTML with <mark> tags
+  search: (q, limit = 20) =>
+    apiRequest(`/projects/search?${new URLSearchParams({ q, limit: String(limit) })}`, { method: "GET" }),
   create: (projectData) => apiRequest("/projects", { method: "POST", body: JSON.stringify(projectData) }),
   update: (project_id, updateData) => apiRequest(`/projects/${project_id}`, { method: "PUT", body: JSON.stringify(updateData) }),
+  // Several status changes in one request: [{ id, status }, ...] -> per-item results
+  batchUpdate: (changes) => apiRequest("/projects/batch", { method: "PUT", body: JSON.stringify(changes) }),
   delete: (project_id) => apiRequest(`/projects/${project_id}`, { method: "DELETE" }),
   sendRequest: (requestData) => apiRequest("/requests/send", { method: "POST", body: JSON.stringify(requestData) }),
 };
@@ -182,14 +267,34 @@ export const teammateAPI = {
 export const notificationAPI = {
   getAll: () => apiRequest("/notifications", { method: "GET" }),
   markAsRead: (id) => apiRequest(`/notifications/${id}/read`, { method: "PUT" }),
+  // Either { ids: [...] } or { upTo: id } (everything up to and including that id)
+  markRead: (selection) => apiRequest("/notifications/read", { method: "PUT", body: JSON.stringify(selection) }),
+  getUnreadCount: () => apiRequest("/notifications/unread-count", { method: "GET" }),
   delete: (id) => apiRequest(`/notifications/${id}`, { method: "DELETE" }),
   clearAll: () => apiRequest("/notifications/clear", { method: "DELETE" }),
+  // Server-Sent Events: onNotification(notification) for each one created after the stream opens
+  stream: (onNotification) => openStream("/notifications/stream", "notification", onNotification, "after"),
 };
 
 // ==================== ANALYTICS API ====================
 export const analyticsAPI = {
   getUserAnalytics: () => apiRequest("/analytics", { method: "GET" }),
   getProjectAnalytics: (id) => apiRequest(`/analytics/project/${id}`, { method: "GET" }),
+  // Daily or weekly activity series; from / to are YYYY-MM-DD
+  getTrends: ({ from, to, bucket = "day" } = {}) => {
+    const params = new URLSearchParams({ bucket });
+    if (from) params.set("from", from);
+    if (to) params.set("to", to);
+    return apiRequest(`/analytics/trends?${params}`, { method: "GET" });
+  },
+  // Admin only: latest org snapshot, per institution or one institution's departments
+  getOrg: (institution) => {
+    const query = institution ? `?${new URLSearchParams({ institution })}` : "";
+    return apiRequest(`/analytics/org${query}`, { method: "GET" });
+  },
+  buildOrgSnapshot: () => apiRequest("/admin/analytics/org/snapshot", { method: "POST" }),
+  // Server-Sent Events: onSnapshot(analytics) runs when the user's projects change
+  stream: (onSnapshot) => openStream("/analytics/stream", "analytics", onSnapshot, "lastEventId"),
 };
 
 // ==================== PEER REVIEW API ====================